@@ -0,0 +1,54 @@
+"""
+Benchmark ChangeDetector throughput and state size.
+
+Streams random core-category scores for `--users` tracked users in batches
+of `--batch` posts and reports events per second, alerts raised and the
+per-user state footprint.
+
+Usage::
+
+    python benchmarks/bench_alerting.py --users 300000 --events 2000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from mhai.alerting import ChangeDetector
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=300_000)
+    parser.add_argument('--events', type=int, default=2_000_000)
+    parser.add_argument('--batch', type=int, default=50_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    names = np.asarray([f'user{i}' for i in range(args.users)])
+    detector = ChangeDetector()
+
+    alerts = 0
+    start = time.perf_counter()
+    for done in range(0, args.events, args.batch):
+        n = min(args.batch, args.events - done)
+        users = names[rng.integers(0, args.users, n)].tolist()
+        scores = rng.beta(2, 8, size=(n, len(detector.categories)))
+        alerts += len(detector.update(users, scores))
+    elapsed = time.perf_counter() - start
+
+    print(f'users={len(detector.index)} events={args.events}')
+    print(f'events/s: {args.events / elapsed:,.0f} ({elapsed:.2f}s)')
+    print(f'alerts:   {alerts}')
+    print(
+        f'state:    {detector.nbytes / 2**20:.1f} MiB '
+        f'({detector.nbytes / len(detector.index):.0f} B/user)'
+    )
+
+
+if __name__ == '__main__':
+    main()
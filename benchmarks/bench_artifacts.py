@@ -0,0 +1,105 @@
+"""
+Benchmark cold start and memory of hub vs. local-snapshot model loading.
+
+Spawns N worker processes that each build an evaluator and report the
+load time, RSS and PSS (proportional set size, which splits shared pages
+between the processes mapping them). With memory-mapped safetensors the
+PSS per worker drops as N grows, while RSS stays roughly flat.
+
+Usage::
+
+    python benchmarks/bench_artifacts.py --workers 4
+    python benchmarks/bench_artifacts.py --workers 4 --snapshot
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import tempfile
+import time
+
+from pathlib import Path
+from typing import Any
+
+
+def _memory_kb() -> dict[str, int]:
+    """Return Rss and Pss of the current process, in kB (Linux only)."""
+    values: dict[str, int] = {}
+    path = Path('/proc/self/smaps_rollup')
+    if not path.exists():
+        return values
+    for line in path.read_text().splitlines():
+        key, _, rest = line.partition(':')
+        if key in ('Rss', 'Pss'):
+            values[key] = int(rest.split()[0])
+    return values
+
+
+def _worker(
+    root: str, use_store: bool, barrier: Any, out: Any
+) -> None:  # pragma: no cover - runs in a subprocess
+    from mhai.evaluations import ArtifactStore, SentimentEvaluator
+
+    store = ArtifactStore(root=root if use_store else Path(root) / 'none')
+    start = time.perf_counter()
+    evaluator = SentimentEvaluator(artifacts=store)
+    evaluator.evaluate('warm up')
+    elapsed = time.perf_counter() - start
+    # keep every worker alive until all of them have loaded the model, so
+    # PSS reflects the pages actually shared between them
+    barrier.wait()
+    out.put({'seconds': elapsed, **_memory_kb()})
+    barrier.wait()
+
+
+def run(workers: int, root: str, use_store: bool) -> list[dict[str, Any]]:
+    """Load the model in `workers` processes and collect their metrics."""
+    ctx = mp.get_context('spawn')
+    barrier = ctx.Barrier(workers)
+    out = ctx.Queue()
+    procs = [
+        ctx.Process(target=_worker, args=(root, use_store, barrier, out))
+        for _ in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    results = [out.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+    return results
+
+
+def main() -> None:
+    """Run the benchmark and print a summary table."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument(
+        '--snapshot',
+        action='store_true',
+        help='snapshot the model into a temporary store first',
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        if args.snapshot:
+            from mhai.evaluations import ArtifactStore, SentimentEvaluator
+
+            ArtifactStore(root=root).snapshot(
+                SentimentEvaluator.default_model_name
+            )
+        results = run(args.workers, root, use_store=args.snapshot)
+
+    source = 'local snapshot' if args.snapshot else 'hub cache'
+    print(f'source={source} workers={args.workers}')
+    print(f'{"worker":>6} {"load_s":>8} {"rss_mb":>8} {"pss_mb":>8}')
+    for i, res in enumerate(results):
+        print(
+            f'{i:>6} {res["seconds"]:>8.2f} '
+            f'{res.get("Rss", 0) / 1024:>8.1f} '
+            f'{res.get("Pss", 0) / 1024:>8.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+Benchmark the gate → experts cascade on a synthetic timeline.
+
+Builds `--posts` posts of which `--risky` carry distress keywords and the
+rest are everyday chatter; a few distress posts are phrased positively so
+the gate misses them. The gate costs `--gate-ms` per text and each of the
+two experts `--expert-ms`, mirroring a distilled SST-2 model in front of
+two larger BERT classifiers. The benchmark prints the forwarded share,
+the time of the full run and of the cascade, and the agreement report.
+
+Usage::
+
+    python benchmarks/bench_cascade.py --posts 5000 --risky 0.15
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+
+from collections.abc import Sequence
+from typing import Any, Optional
+
+import numpy as np
+
+from mhai.evaluations.artifacts import ArtifactStore
+from mhai.evaluations.base import ModelBase
+from mhai.evaluations.cascade import CascadeEvaluator
+
+CALM = ['lovely walk', 'great coffee', 'new phone', 'watching the match']
+DISTRESS = ['so sad', 'feel hopeless', 'scared of everything', 'cannot cope']
+MASKED = ['smiling but hopeless', 'great day, still scared']
+
+
+def corpus(n: int, risky: float, seed: int = 0) -> list[str]:
+    """Return `n` posts, a `risky` share with distress keywords."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        roll = rng.random()
+        if roll < risky * 0.9:
+            phrase = rng.choice(DISTRESS)
+        elif roll < risky:
+            phrase = rng.choice(MASKED)
+        else:
+            phrase = rng.choice(CALM)
+        out.append(f'{phrase} #{i}')
+    return out
+
+
+class CostModel(ModelBase):
+    """Keyword classifier costing a fixed time per text."""
+
+    default_model_name = 'bench/cost'
+
+    def __init__(
+        self,
+        labels: Sequence[str],
+        keywords: dict[str, int],
+        seconds: float,
+        **kwargs: Any,
+    ) -> None:
+        self.labels = list(labels)
+        self.keywords = keywords
+        self.seconds = seconds
+        self.texts = 0
+        super().__init__(**kwargs)
+
+    def _load_model(self) -> Any:
+        return None
+
+    def predict_proba(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> tuple[list[str], np.ndarray]:
+        """Return one-hot-ish probabilities after the simulated inference."""
+        self.texts += len(texts)
+        time.sleep(self.seconds * len(texts))
+        probs = np.full((len(texts), len(self.labels)), 0.05)
+        for i, text in enumerate(texts):
+            j = next((j for k, j in self.keywords.items() if k in text), 0)
+            probs[i, j] = 1.0
+        return self.labels, probs / probs.sum(axis=1, keepdims=True)
+
+    def evaluate(self, text: str) -> Any:
+        """Score a single text."""
+        return self.evaluate_batch([text])[0]
+
+    def evaluate_batch(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> list[Any]:
+        """Return label→probability dicts."""
+        labels, probs = self.predict_proba(texts, batch_size)
+        return [dict(zip(labels, row.tolist())) for row in probs]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--risky', type=float, default=0.15)
+    parser.add_argument('--gate-ms', type=float, default=0.05)
+    parser.add_argument('--expert-ms', type=float, default=0.5)
+    args = parser.parse_args()
+
+    texts = corpus(args.posts, args.risky)
+    gate_s, expert_s = args.gate_ms / 1000, args.expert_ms / 1000
+    with tempfile.TemporaryDirectory() as root:
+        store = ArtifactStore(root=root)
+        gate = CostModel(
+            ['POSITIVE', 'NEGATIVE'],
+            # positive phrasing wins: masked distress slips past the gate
+            {
+                'smiling': 0,
+                'great day': 0,
+                'sad': 1,
+                'hopeless': 1,
+                'scared': 1,
+                'cope': 1,
+            },
+            gate_s,
+            artifacts=store,
+        )
+        experts = [
+            CostModel(
+                ['None', 'depression', 'anxiety'],
+                {'sad': 1, 'hopeless': 1, 'cope': 1, 'scared': 2},
+                expert_s,
+                artifacts=store,
+            ),
+            CostModel(
+                ['neutral', 'sadness', 'fear'],
+                {'sad': 1, 'hopeless': 1, 'scared': 2, 'cope': 2},
+                expert_s,
+                artifacts=store,
+            ),
+        ]
+        cascade = CascadeEvaluator(
+            gate, experts, skipped_labels=['None', 'neutral']
+        )
+
+        start = time.perf_counter()
+        for expert in experts:
+            expert.evaluate_batch(texts)
+        full = time.perf_counter() - start
+        start = time.perf_counter()
+        cascade.evaluate_batch(texts)
+        cascaded = time.perf_counter() - start
+        report = cascade.agreement(texts)
+
+    print(
+        f'forwarded:  {cascade.stats.forwarded}/{cascade.stats.texts} '
+        f'({cascade.stats.forwarded_fraction:.1%})'
+    )
+    print(f'full run:   {full:6.2f}s')
+    print(f'cascade:    {cascaded:6.2f}s  ({full / cascaded:.2f}x faster)')
+    for entry in report['experts']:
+        print(
+            f'{entry["skipped_label"]:>8}: agreement {entry["agreement"]:.3f}'
+            f', recall {entry["recall"]:.3f} ({entry["missed"]} missed)'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark IVF similarity search over a memory-mapped embedding store.
+
+Writes `--rows` synthetic unit vectors of `--dim` dimensions (clustered
+like sentence embeddings of a topical corpus) to a float16 store in
+chunks, indexes them, and times queries at several `n_probe` values
+against an exact scan. Reports latency, recall@10 and the memory the
+index holds compared with the vector file.
+
+Usage::
+
+    python benchmarks/bench_embeddings.py --rows 1000000 --dim 384
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from mhai.embeddings import EmbeddingStore, IVFIndex
+
+_CHUNK = 100_000
+
+
+def synthetic(
+    rng: np.random.Generator, means: np.ndarray, n: int
+) -> np.ndarray:
+    """Return `n` unit vectors scattered around unit topic means."""
+    data = means[rng.integers(len(means), size=n)]
+    noise = rng.normal(size=data.shape) / np.sqrt(data.shape[1])
+    data = data + noise
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--lists', type=int, default=1024)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    means = rng.normal(size=(2000, args.dim))
+    means /= np.linalg.norm(means, axis=1, keepdims=True)
+    with tempfile.TemporaryDirectory() as root:
+        store = EmbeddingStore(root, dim=args.dim)
+        start = time.perf_counter()
+        for lo in range(0, args.rows, _CHUNK):
+            store.append(synthetic(rng, means, min(_CHUNK, args.rows - lo)))
+        write_s = time.perf_counter() - start
+
+        index = IVFIndex(store, n_lists=args.lists)
+        start = time.perf_counter()
+        index.sync()
+        index_s = time.perf_counter() - start
+        print(
+            f'store:  {len(store):,} rows, '
+            f'{store.path.stat().st_size / 2**20:,.0f} MiB on disk, '
+            f'written in {write_s:.1f}s'
+        )
+        print(
+            f'index:  {index.n_lists} lists, '
+            f'{index.nbytes / 2**20:,.1f} MiB in RAM, built in {index_s:.1f}s'
+        )
+
+        queries = synthetic(rng, means, args.queries).astype(np.float32)
+        exact, _ = index.exact_search(queries, k=10)
+        # one query at a time, like the IVF searches below
+        start = time.perf_counter()
+        for query in queries[:5]:
+            index.exact_search(query, k=10)
+        exact_ms = (time.perf_counter() - start) * 1000 / 5
+        print(f'exact:     {exact_ms:8.2f} ms/query (full scan)')
+        for probe in (4, 16, 64):
+            start = time.perf_counter()
+            ids = np.concatenate(
+                [index.search(q, k=10, n_probe=probe)[0] for q in queries]
+            )
+            ms = (time.perf_counter() - start) * 1000 / len(queries)
+            recall = np.mean(
+                [len(set(a) & set(b)) / 10 for a, b in zip(ids, exact)]
+            )
+            print(
+                f'probe {probe:3d}: {ms:8.2f} ms/query, recall@10 {recall:.3f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark repeated SNS API reads with and without the HTTP cache.
+
+A local stand-in server answers every GET after `--latency-ms` with a JSON
+body and an ETag. The workload replays `--rounds` passes over `--urls`
+distinct endpoints (as repeated harvest jobs do); the last pass runs after
+the TTL expired, so its reads are revalidated with a 304.
+
+Usage::
+
+    python benchmarks/bench_http_cache.py --urls 50 --rounds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Optional
+
+import requests
+
+from mhai.sns.cache import CachePolicy, HTTPCache, install_cache
+
+
+def make_handler(latency: float) -> type[BaseHTTPRequestHandler]:
+    """Return a handler class sleeping `latency` seconds per request."""
+
+    class Handler(BaseHTTPRequestHandler):
+        served = 0
+        not_modified = 0
+
+        def do_GET(self) -> None:
+            time.sleep(latency)
+            type(self).served += 1
+            if self.headers.get('If-None-Match') == '"v1"':
+                type(self).not_modified += 1
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = json.dumps(
+                [{'id': i, 'path': self.path} for i in range(40)]
+            ).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', '"v1"')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def run(
+    base: str, urls: int, rounds: int, cache: Optional[HTTPCache]
+) -> float:
+    """Replay the workload and return the elapsed seconds."""
+    session = requests.Session()
+    policy = CachePolicy([(r'^/api/', 3600)])
+    adapter_cache = (
+        install_cache(session, cache, policy) if cache is not None else None
+    )
+    start = time.perf_counter()
+    for r in range(rounds):
+        if adapter_cache is not None and r == rounds - 1:
+            # the last pass happens after the TTL expired
+            with adapter_cache._lock, adapter_cache._db:
+                adapter_cache._db.execute('UPDATE responses SET stored_at = 0')
+        for i in range(urls):
+            session.get(f'{base}/api/v1/accounts/{i}/statuses').json()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--urls', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    args = parser.parse_args()
+
+    handler = make_handler(args.latency_ms / 1000)
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{httpd.server_address[1]}'
+    total = args.urls * args.rounds
+
+    plain = run(base, args.urls, args.rounds, None)
+    plain_served = handler.served  # type: ignore[attr-defined]
+
+    handler.served = handler.not_modified = 0  # type: ignore[attr-defined]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HTTPCache(Path(tmp) / 'http.sqlite')
+        cached = run(base, args.urls, args.rounds, cache)
+        stats = cache.stats()
+        cache.close()
+    httpd.shutdown()
+
+    print(f'{total} GETs, {args.latency_ms:.0f} ms server latency')
+    print(
+        f'no cache : {plain_served:5d} requests  {plain:6.2f}s  '
+        f'{1000 * plain / total:6.2f} ms/GET'
+    )
+    print(
+        f'cache    : {handler.served:5d} requests  {cached:6.2f}s  '  # type: ignore[attr-defined]
+        f'{1000 * cached / total:6.2f} ms/GET  '
+        f'(hits={stats["hits"]} revalidated={stats["revalidated"]} '
+        f'misses={stats["misses"]})'
+    )
+    print(
+        f'saved    : {plain_served - handler.served} requests, '  # type: ignore[attr-defined]
+        f'{plain / cached:.1f}x faster'
+    )
+
+
+if __name__ == '__main__':
+    main()
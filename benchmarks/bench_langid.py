@@ -0,0 +1,240 @@
+"""
+Benchmark language routing on independent text samples.
+
+The samples are Article 1 of the Universal Declaration of Human Rights in
+12 supported languages and 7 other Latin-script languages (public domain
+translations, not written with the detector's word lists in mind). Each
+sentence is used whole and cut to its first 3 and 6 words, to mimic
+short posts. The benchmark reports the detector's accuracy on supported
+languages, how many English posts and how many posts in other Latin
+languages are routed to English-only evaluators (``en``/``und``), and
+its throughput.
+
+It then samples `--posts` posts, `--english` of them English, plus a few
+emoji-only replies, and runs three English-only evaluators simulated at
+`--ms-per-text` of inference per text with and without routing. The
+small default keeps the run short; real CPU models cost more, so the
+savings only grow.
+
+Usage::
+
+    python benchmarks/bench_langid.py --posts 20000 --english 0.4
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import tempfile
+import time
+
+from collections.abc import Sequence
+from typing import Any, Optional
+
+from mhai.evaluations.artifacts import ArtifactStore
+from mhai.evaluations.base import ModelBase
+from mhai.langid import LanguageDetector, language_stage
+from mhai.pipeline import ListSink, Pipeline, evaluator_stage
+
+# UDHR Article 1; the Cyrillic, CJK and Turkish letters are meant
+# ruff: noqa: RUF001
+SAMPLES = {
+    'en': 'All human beings are born free and equal in dignity and rights. '
+    'They are endowed with reason and conscience and should act towards '
+    'one another in a spirit of brotherhood.',
+    'es': 'Todos los seres humanos nacen libres e iguales en dignidad y '
+    'derechos y, dotados como están de razón y conciencia, deben '
+    'comportarse fraternalmente los unos con los otros.',
+    'pt': 'Todos os seres humanos nascem livres e iguais em dignidade e em '
+    'direitos. Dotados de razão e de consciência, devem agir uns para com '
+    'os outros em espírito de fraternidade.',
+    'fr': 'Tous les êtres humains naissent libres et égaux en dignité et en '
+    'droits. Ils sont doués de raison et de conscience et doivent agir les '
+    'uns envers les autres dans un esprit de fraternité.',
+    'de': 'Alle Menschen sind frei und gleich an Würde und Rechten geboren. '
+    'Sie sind mit Vernunft und Gewissen begabt und sollen einander im '
+    'Geist der Brüderlichkeit begegnen.',
+    'it': 'Tutti gli esseri umani nascono liberi ed eguali in dignità e '
+    'diritti. Essi sono dotati di ragione e di coscienza e devono agire '
+    'gli uni verso gli altri in spirito di fratellanza.',
+    'nl': 'Alle mensen worden vrij en gelijk in waardigheid en rechten '
+    'geboren. Zij zijn begiftigd met verstand en geweten, en behoren zich '
+    'jegens elkander in een geest van broederschap te gedragen.',
+    'ru': 'Все люди рождаются свободными и равными в своем достоинстве и '
+    'правах. Они наделены разумом и совестью и должны поступать в '
+    'отношении друг друга в духе братства.',
+    'ja': 'すべての人間は、生まれながらにして自由であり、かつ、尊厳と権利と'
+    'について平等である。人間は、理性と良心とを授けられており、互いに同胞の'
+    '精神をもって行動しなければならない。',
+    'zh': '人人生而自由，在尊严和权利上一律平等。他们赋有理性和良心，'
+    '并应以兄弟关系的精神相对待。',
+    'ko': '모든 인간은 태어날 때부터 자유로우며 그 존엄과 권리에 있어 '
+    '동등하다. 인간은 천부적으로 이성과 양심을 부여받았으며 서로 형제애의 '
+    '정신으로 행동하여야 한다.',
+    'ar': 'يولد جميع الناس أحرارًا متساوين في الكرامة والحقوق. وقد وهبوا '
+    'عقلاً وضميرًا وعليهم أن يعامل بعضهم بعضًا بروح الإخاء.',
+}
+# Latin-script languages the detector does not know
+OTHER_LATIN = {
+    'sw': 'Watu wote wamezaliwa huru, hadhi na haki zao ni sawa. Wote '
+    'wamejaliwa akili na dhamiri, hivyo yapasa watendeane kindugu.',
+    'id': 'Semua orang dilahirkan merdeka dan mempunyai martabat dan '
+    'hak-hak yang sama. Mereka dikaruniai akal dan hati nurani dan '
+    'hendaknya bergaul satu sama lain dalam semangat persaudaraan.',
+    'tr': 'Bütün insanlar hür, haysiyet ve haklar bakımından eşit '
+    'doğarlar. Akıl ve vicdana sahiptirler ve birbirlerine karşı '
+    'kardeşlik zihniyeti ile hareket etmelidirler.',
+    'pl': 'Wszyscy ludzie rodzą się wolni i równi pod względem swej '
+    'godności i swych praw. Są oni obdarzeni rozumem i sumieniem i '
+    'powinni postępować wobec innych w duchu braterstwa.',
+    'vi': 'Tất cả mọi người sinh ra đều được tự do và bình đẳng về nhân '
+    'phẩm và quyền. Mọi con người đều được tạo hóa ban cho lý trí và '
+    'lương tâm và cần phải đối xử với nhau trong tình bằng hữu.',
+    'fi': 'Kaikki ihmiset syntyvät vapaina ja tasavertaisina arvoltaan ja '
+    'oikeuksiltaan. Heille on annettu järki ja omatunto, ja heidän on '
+    'toimittava toisiaan kohtaan veljeyden hengessä.',
+    'tl': "Ang lahat ng tao'y isinilang na malaya at pantay-pantay sa "
+    "karangalan at mga karapatan. Sila'y pinagkalooban ng katwiran at "
+    "budhi at dapat magturingan sa isa't isa sa diwa ng pagkakapatiran.",
+}
+NOISE = ['👍', '❤️❤️', 'lol', '+1', '😭😭😭', '#mentalhealth']
+ENGLISH_ROUTE = ('en', 'und')
+
+
+def posts_of(text: str) -> list[str]:
+    """Return the sentences of `text` and their 3- and 6-word prefixes."""
+    out = []
+    for sentence in re.split(r'(?<=[.。])\s*', text):
+        if not sentence:
+            continue
+        words = sentence.split()
+        out.append(sentence)
+        if len(words) > 6:
+            out += [' '.join(words[:3]), ' '.join(words[:6])]
+    return out
+
+
+def labeled_posts() -> list[tuple[str, str]]:
+    """Return every (post, language) pair of the samples."""
+    return [
+        (post, lang)
+        for table in (SAMPLES, OTHER_LATIN)
+        for lang, text in table.items()
+        for post in posts_of(text)
+    ]
+
+
+def corpus(n: int, english: float, seed: int = 0) -> list[tuple[str, str]]:
+    """Return `n` (text, language) pairs; noise posts are 'und'."""
+    rng = random.Random(seed)
+    pool: dict[str, list[str]] = {}
+    for post, lang in labeled_posts():
+        pool.setdefault(lang, []).append(post)
+    others = [lang for lang in pool if lang != 'en']
+    out = []
+    for _ in range(n):
+        roll = rng.random()
+        if roll < 0.05:
+            out.append((rng.choice(NOISE), 'und'))
+            continue
+        lang = 'en' if roll < 0.05 + english else rng.choice(others)
+        out.append((rng.choice(pool[lang]), lang))
+    return out
+
+
+class CostEvaluator(ModelBase):
+    """English-only evaluator costing a fixed time per text."""
+
+    default_model_name = 'bench/cost'
+
+    def __init__(self, prefix: str, seconds: float, **kwargs: Any) -> None:
+        self.column_prefix = prefix
+        self.seconds = seconds
+        self.texts = 0
+        super().__init__(**kwargs)
+
+    def _load_model(self) -> Any:
+        return None
+
+    def evaluate(self, text: str) -> Any:
+        """Score a single text."""
+        return self.evaluate_batch([text])[0]
+
+    def evaluate_batch(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> list[Any]:
+        """Sleep for the simulated inference and return a constant."""
+        self.texts += len(texts)
+        time.sleep(self.seconds * len(texts))
+        return [{'label': 'x', 'score': 0.5} for _ in texts]
+
+
+def run(
+    posts: list[tuple[str, str]], seconds: float, route: bool, root: str
+) -> tuple[float, int]:
+    """Return the wall time and texts scored for one pipeline run."""
+    evaluators = [
+        CostEvaluator(name, seconds, artifacts=ArtifactStore(root=root))
+        for name in ('sentiment', 'emotion', 'mental')
+    ]
+    stages = [language_stage()] if route else []
+    stages += [
+        evaluator_stage(ev, languages=ev.languages if route else None)
+        for ev in evaluators
+    ]
+    start = time.perf_counter()
+    Pipeline(
+        ({'text': text} for text, _ in posts),
+        stages,
+        ListSink(),
+        batch_size=64,
+    ).run()
+    return time.perf_counter() - start, sum(ev.texts for ev in evaluators)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=20000)
+    parser.add_argument('--english', type=float, default=0.4)
+    parser.add_argument('--ms-per-text', type=float, default=0.2)
+    args = parser.parse_args()
+
+    detector = LanguageDetector()
+    samples = labeled_posts()
+    langs, _ = detector.detect([post for post, _ in samples])
+    known = [(p, t) for p, (_, t) in zip(langs, samples) if t in SAMPLES]
+    other = [p for p, (_, t) in zip(langs, samples) if t in OTHER_LATIN]
+    english = [p for p, (_, t) in zip(langs, samples) if t == 'en']
+    accuracy = sum(p == t for p, t in known) / len(known)
+    print(f'accuracy:   {accuracy:.3f} on {len(known)} supported posts')
+    print(
+        'to English: '
+        f'{sum(p in ENGLISH_ROUTE for p in english)}/{len(english)} '
+        'English posts, '
+        f'{sum(p in ENGLISH_ROUTE for p in other)}/{len(other)} posts '
+        'in other Latin languages'
+    )
+
+    posts = corpus(args.posts, args.english)
+    texts = [text for text, _ in posts]
+    start = time.perf_counter()
+    detector.detect(texts)
+    detect_s = time.perf_counter() - start
+    print(f'detector:   {len(posts) / detect_s:,.0f} texts/s')
+
+    seconds = args.ms_per_text / 1000
+    with tempfile.TemporaryDirectory() as root:
+        plain, plain_texts = run(posts, seconds, route=False, root=root)
+        routed, routed_texts = run(posts, seconds, route=True, root=root)
+    print(f'no routing: {plain_texts:7d} texts scored  {plain:6.2f}s')
+    print(f'routing:    {routed_texts:7d} texts scored  {routed:6.2f}s')
+    print(
+        f'saved:      {1 - routed_texts / plain_texts:.1%} of inference, '
+        f'{plain / routed:.2f}x faster'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark sequential vs. streaming harvest → clean → score → sink.
+
+The extractor and the evaluator are simulated: fetching a page sleeps for
+`--fetch-ms` (network wait) and scoring a batch sleeps for `--score-ms`
+(inference, which releases the GIL like torch kernels do). The sequential
+run fetches everything, then scores everything; the pipeline overlaps both.
+
+Usage::
+
+    python benchmarks/bench_pipeline.py --pages 40 --page-size 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+
+from collections.abc import Iterator, Sequence
+from typing import Any, Optional
+
+from mhai.evaluations.artifacts import ArtifactStore
+from mhai.evaluations.base import ModelBase
+from mhai.pipeline import (
+    ListSink,
+    Pipeline,
+    clean_stage,
+    evaluator_stage,
+)
+from mhai.utils import clean_text
+
+
+class SleepEvaluator(ModelBase):
+    """Evaluator whose batched inference costs a fixed time per batch."""
+
+    default_model_name = 'bench/sleep'
+    column_prefix = 'sleep'
+
+    def __init__(self, seconds: float, **kwargs: Any) -> None:
+        self.seconds = seconds
+        super().__init__(**kwargs)
+
+    def _load_model(self) -> Any:
+        return None
+
+    def evaluate(self, text: str) -> Any:
+        """Score a single text."""
+        return self.evaluate_batch([text])[0]
+
+    def evaluate_batch(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> list[Any]:
+        """Sleep once per batch and return a constant score."""
+        time.sleep(self.seconds)
+        return [{'label': 'x', 'score': 0.5} for _ in texts]
+
+
+def pages(n: int, size: int, fetch_s: float) -> Iterator[list[dict[str, Any]]]:
+    """Yield `n` pages of fake statuses, sleeping `fetch_s` per page."""
+    for page in range(n):
+        time.sleep(fetch_s)
+        yield [
+            {'id': page * size + i, 'content': f'<p>post {page}-{i}</p>'}
+            for i in range(size)
+        ]
+
+
+def main() -> None:
+    """Run both variants and print wall times and stage metrics."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=40)
+    parser.add_argument('--page-size', type=int, default=40)
+    parser.add_argument('--batch-size', type=int, default=40)
+    parser.add_argument('--fetch-ms', type=float, default=50.0)
+    parser.add_argument('--score-ms', type=float, default=40.0)
+    args = parser.parse_args()
+
+    fetch_s = args.fetch_ms / 1000
+    with tempfile.TemporaryDirectory() as root:
+        evaluator = SleepEvaluator(
+            args.score_ms / 1000, artifacts=ArtifactStore(root=root)
+        )
+
+        start = time.perf_counter()
+        records = [
+            r
+            for page in pages(args.pages, args.page_size, fetch_s)
+            for r in page
+        ]
+        for i in range(0, len(records), args.batch_size):
+            batch = records[i : i + args.batch_size]
+            texts = [clean_text(r['content']) for r in batch]
+            evaluator.evaluate_batch(texts)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        metrics = Pipeline(
+            pages(args.pages, args.page_size, fetch_s),
+            [clean_stage(source='content'), evaluator_stage(evaluator)],
+            ListSink(),
+            batch_size=args.batch_size,
+        ).run()
+        streamed = time.perf_counter() - start
+
+    print(f'records={len(records)}')
+    print(f'sequential: {sequential:.2f}s')
+    print(f'pipeline:   {streamed:.2f}s ({sequential / streamed:.2f}x)')
+    for stage in metrics.values():
+        print(stage.as_dict())
+
+
+if __name__ == '__main__':
+    main()
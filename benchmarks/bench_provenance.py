@@ -0,0 +1,103 @@
+"""
+Benchmark incremental rescoring against re-running every evaluator.
+
+Scores `--posts` posts with three evaluators costing `--ms` per text
+each, then changes the temperature of one of them (a new provenance) and
+calls ``rescore``: only that evaluator's rows are evaluated again. A
+second ``rescore`` with nothing changed does no work. Prints the time
+and rows evaluated for the full run, the incremental one and the no-op.
+
+Usage::
+
+    python benchmarks/bench_provenance.py --posts 5000 --ms 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+
+from collections.abc import Sequence
+from typing import Any, Optional
+
+import pandas as pd
+
+from mhai.evaluations.artifacts import ArtifactStore
+from mhai.evaluations.base import ModelBase
+from mhai.provenance import RunTable, rescore
+
+
+class CostModel(ModelBase):
+    """Evaluator costing a fixed time per text."""
+
+    def __init__(self, name: str, seconds: float, **kwargs: Any) -> None:
+        self.column_prefix = name
+        self.seconds = seconds
+        self.texts = 0
+        super().__init__(model_name=f'bench/{name}', **kwargs)
+
+    def _load_model(self) -> Any:
+        return None
+
+    def evaluate(self, text: str) -> Any:
+        """Score a single text."""
+        return self.evaluate_batch([text])[0]
+
+    def evaluate_batch(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> list[Any]:
+        """Return a label/score after the simulated inference."""
+        self.texts += len(texts)
+        time.sleep(self.seconds * len(texts))
+        return [{'label': 'x', 'score': len(t) % 7 / 7} for t in texts]
+
+
+def _timed(
+    frame: pd.DataFrame, evaluators: dict[str, CostModel], runs: RunTable
+) -> tuple[pd.DataFrame, float, int]:
+    """Rescore `frame`; return it, the seconds taken and texts evaluated."""
+    before = sum(ev.texts for ev in evaluators.values())
+    start = time.perf_counter()
+    frame, _ = rescore(frame, evaluators, runs, batch_size=256)
+    elapsed = time.perf_counter() - start
+    return frame, elapsed, sum(ev.texts for ev in evaluators.values()) - before
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--ms', type=float, default=0.2)
+    args = parser.parse_args()
+
+    frame = pd.DataFrame(
+        {'text': [f'post number {i}' for i in range(args.posts)]}
+    )
+    seconds = args.ms / 1000
+    with tempfile.TemporaryDirectory() as root:
+        store = ArtifactStore(root=root)
+        evaluators = {
+            name: CostModel(name, seconds, artifacts=store)
+            for name in ('sentiment', 'emotion', 'mental')
+        }
+        runs = RunTable(f'{root}/out.csv.runs.json')
+
+        frame, full, full_n = _timed(frame, evaluators, runs)
+        evaluators['emotion'] = CostModel(
+            'emotion', seconds, artifacts=store, temperature=1.5
+        )
+        frame, partial, partial_n = _timed(frame, evaluators, runs)
+        frame, noop, noop_n = _timed(frame, evaluators, runs)
+
+    print(f'runs:         {len(runs)}')
+    print(f'full score:   {full:6.2f}s  {full_n} texts evaluated')
+    print(
+        f'one changed:  {partial:6.2f}s  {partial_n} texts evaluated '
+        f'({full / partial:.2f}x faster)'
+    )
+    print(f'unchanged:    {noop:6.2f}s  {noop_n} texts evaluated')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark CPU throughput across torch thread settings.
+
+Runs `--evaluators` copies of SentimentEvaluator (DistilBERT SST-2) on
+the CPU as concurrent pipeline stages, the way ``mhai score`` does, for
+every thread budget in `--threads` (``0`` is torch's default of one
+thread per core for every evaluator, i.e. oversubscribed) with and
+without ``torch.inference_mode``. Add `--compile` to include
+``torch.compile``. Prints one row per setting with texts/s across all
+evaluators.
+
+Requires torch and the model (downloaded on first use). Without hub
+access, `--random-weights` uses a randomly initialized model of the same
+DistilBERT architecture from a temporary artifact store: scores are
+meaningless but the cost per text is the same.
+
+Usage::
+
+    python benchmarks/bench_runtime.py --evaluators 1,2,3 --threads 0,1,2,4
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import tempfile
+import time
+
+from pathlib import Path
+from typing import Optional
+
+import torch
+
+from mhai.evaluations.artifacts import ArtifactStore
+from mhai.evaluations.runtime import RuntimeConfig, split_threads
+from mhai.evaluations.sentiment import SentimentEvaluator
+from mhai.pipeline import ListSink, Pipeline, evaluator_stage
+
+TEXTS = [
+    'I have not slept properly in weeks and everything feels heavy',
+    'great run this morning, feeling strong',
+    'not sure why I even bother anymore',
+    'my therapist said something today that really helped',
+]
+
+
+def _ints(value: str) -> list[int]:
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def random_store(root: Path) -> ArtifactStore:
+    """Register a randomly initialized DistilBERT as the sentiment model."""
+    from transformers import (
+        DistilBertConfig,
+        DistilBertForSequenceClassification,
+        DistilBertTokenizerFast,
+    )
+
+    saved = root / 'saved'
+    saved.mkdir()
+    words = sorted({w.strip(',') for t in TEXTS for w in t.lower().split()})
+    config = DistilBertConfig(id2label={0: 'NEGATIVE', 1: 'POSITIVE'})
+    special = ['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]']
+    filler = config.vocab_size - len(special) - len(words)
+    vocab = saved / 'vocab.txt'
+    vocab.write_text(
+        '\n'.join([*special, *words, *(f'[unused{i}]' for i in range(filler))])
+    )
+    DistilBertTokenizerFast(vocab_file=str(vocab)).save_pretrained(saved)
+    torch.manual_seed(0)
+    DistilBertForSequenceClassification(config).save_pretrained(saved)
+    store = ArtifactStore(root=root / 'artifacts')
+    store.register(SentimentEvaluator.default_model_name, saved)
+    return store
+
+
+def run(
+    count: int,
+    threads: Optional[int],
+    inference_mode: bool,
+    compile: bool,
+    texts: list[str],
+    batch_size: int,
+    artifacts: Optional[ArtifactStore] = None,
+) -> float:
+    """Return texts/s of `count` concurrent evaluators over `texts`."""
+    config = RuntimeConfig(
+        device='cpu', inference_mode=inference_mode, compile=compile
+    )
+    evaluators = [
+        SentimentEvaluator(runtime=config, artifacts=artifacts)
+        for _ in range(count)
+    ]
+    for evaluator in evaluators:
+        evaluator.set_threads(threads or None)
+    stages = [
+        evaluator_stage(ev, name=f'sentiment-{i}')
+        for i, ev in enumerate(evaluators)
+    ]
+    # warm-up: first calls pay for allocation (and compilation)
+    for evaluator in evaluators:
+        evaluator.evaluate_batch(texts[:batch_size])
+    start = time.perf_counter()
+    Pipeline(
+        ({'text': t} for t in texts), stages, ListSink(), batch_size=batch_size
+    ).run()
+    return count * len(texts) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--evaluators', type=_ints, default=[1, 2])
+    parser.add_argument('--threads', type=_ints, default=[0, 1, 2, 4])
+    parser.add_argument('--texts', type=int, default=512)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--compile', action='store_true')
+    parser.add_argument('--random-weights', action='store_true')
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory() if args.random_weights else None
+    artifacts = random_store(Path(tmp.name)) if tmp else None
+
+    texts = [TEXTS[i % len(TEXTS)] for i in range(args.texts)]
+    cores = os.cpu_count() or 1
+    # budgets are not restored after a run: pass torch's default explicitly
+    default = torch.get_num_threads()
+    compiles = [False, True] if args.compile else [False]
+    print(f'{cores} cores, {args.texts} texts per evaluator')
+    print('evals  threads  inference_mode  compile     texts/s')
+    for count, threads, mode, compiled in itertools.product(
+        args.evaluators, args.threads, [False, True], compiles
+    ):
+        rate = run(
+            count,
+            threads or default,
+            mode,
+            compiled,
+            texts,
+            args.batch_size,
+            artifacts,
+        )
+        label = str(threads) if threads else 'default'
+        print(
+            f'{count:5d}  {label:>7}  {mode!s:>14}  {compiled!s:>7}  '
+            f'{rate:10.1f}'
+        )
+    split = split_threads(max(args.evaluators))
+    print(f'mhai score splits {cores} cores as {split} by default')
+    if tmp:
+        tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
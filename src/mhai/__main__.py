@@ -0,0 +1,5 @@
+"""Run the command line with ``python -m mhai``."""
+
+from mhai.cli import main
+
+raise SystemExit(main())
@@ -0,0 +1,354 @@
+"""
+Per-user longitudinal aggregation module.
+
+Turns scored posts into per-user features over time, updating a compact
+array-backed state incrementally: each call to ``update`` costs O(new
+posts), never a recomputation of the history.
+
+Defines:
+- UserIndex: map user identifiers to dense array rows
+- UserAggregator: rolling, exponentially weighted and frequency features
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from mhai.utils import grow
+
+DEFAULT_SCORE_COLUMNS = ('core_anxiety', 'core_depression')
+
+_NO_BUCKET = np.iinfo(np.int64).min
+
+
+class UserIndex:
+    """Map user identifiers to dense, stable array rows."""
+
+    def __init__(self, users: Iterable[Any] = ()) -> None:
+        self._rows: dict[str, int] = {}
+        self.users: list[str] = []
+        self.rows(users)
+
+    def __len__(self) -> int:
+        """Return the number of known users."""
+        return len(self.users)
+
+    def __contains__(self, user: Any) -> bool:
+        """Return True if `user` has a row."""
+        return str(user) in self._rows
+
+    def rows(self, users: Iterable[Any]) -> npt.NDArray[np.int64]:
+        """Return the rows of `users`, assigning new rows to unseen ones."""
+        out = []
+        rows = self._rows
+        for user in users:
+            key = str(user)
+            row = rows.get(key)
+            if row is None:
+                row = len(self.users)
+                rows[key] = row
+                self.users.append(key)
+            out.append(row)
+        return np.asarray(out, dtype=np.int64)
+
+    def get(self, users: Iterable[Any]) -> npt.NDArray[np.int64]:
+        """Return the rows of `users`, or -1 for unknown users."""
+        rows = self._rows
+        return np.asarray(
+            [rows.get(str(user), -1) for user in users], dtype=np.int64
+        )
+
+    def to_array(self) -> npt.NDArray[np.str_]:
+        """Return the user identifiers ordered by row."""
+        return np.asarray(self.users, dtype=np.str_)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the approximate size of the dict, list and ids in bytes."""
+        # the keys are shared by the dict and the list: count them once
+        return (
+            sys.getsizeof(self._rows)
+            + sys.getsizeof(self.users)
+            + sum(map(sys.getsizeof, self.users))
+            + sum(map(sys.getsizeof, self._rows.values()))
+        )
+
+
+def _to_ns(values: Any) -> npt.NDArray[np.int64]:
+    """Convert timestamps to int64 nanoseconds since the epoch (UTC)."""
+    stamps = pd.to_datetime(pd.Series(values), utc=True).dt.as_unit('ns')
+    return stamps.astype('int64').to_numpy()
+
+
+class UserAggregator:
+    """
+    Incremental per-user features over scored posts.
+
+    For every user and score column the state keeps:
+
+    - a ring buffer of per-bucket sums and counts over the last `window`
+      time buckets (rolling means and posting frequency);
+    - exponentially weighted means with a fast and a slow `alpha`, applied
+      per post in time order (``ewm``, ``trend`` = fast - slow);
+    - an exponentially weighted mean of squares (``volatility``, the EW
+      standard deviation around the fast mean).
+
+    Rows in an ``update`` batch are sorted by time per user before being
+    folded in; posts older than the rolling window of their user are only
+    counted in the exponentially weighted features.
+    """
+
+    def __init__(
+        self,
+        score_columns: Sequence[str] = DEFAULT_SCORE_COLUMNS,
+        user_column: str = 'user',
+        time_column: str = 'created_at',
+        freq: Union[str, pd.Timedelta] = '1D',
+        window: int = 7,
+        fast_alpha: float = 0.3,
+        slow_alpha: float = 0.05,
+    ) -> None:
+        if window < 2:
+            raise ValueError('window must be >= 2 buckets.')
+        for alpha in (fast_alpha, slow_alpha):
+            if not 0.0 < alpha <= 1.0:
+                raise ValueError('alpha values must be in (0, 1].')
+
+        self.score_columns = list(score_columns)
+        self.user_column = user_column
+        self.time_column = time_column
+        self.freq = pd.Timedelta(freq)
+        self.window = window
+        self.fast_alpha = fast_alpha
+        self.slow_alpha = slow_alpha
+
+        self.index = UserIndex()
+        ncol = len(self.score_columns)
+        self.ring_sum = np.zeros((0, window, ncol), dtype=np.float32)
+        self.ring_count = np.zeros((0, window), dtype=np.int32)
+        self.last_bucket = np.zeros(0, dtype=np.int64)
+        self.ew_fast = np.zeros((0, ncol), dtype=np.float32)
+        self.ew_slow = np.zeros((0, ncol), dtype=np.float32)
+        self.ew_square = np.zeros((0, ncol), dtype=np.float32)
+        self.n_posts = np.zeros(0, dtype=np.int64)
+        self.last_seen = np.zeros(0, dtype=np.int64)
+
+    @property
+    def _freq_ns(self) -> int:
+        return int(self.freq.value)
+
+    def _ensure_capacity(self, size: int) -> None:
+        self.ring_sum = grow(self.ring_sum, size, 0.0)
+        self.ring_count = grow(self.ring_count, size, 0)
+        self.last_bucket = grow(self.last_bucket, size, _NO_BUCKET)
+        self.ew_fast = grow(self.ew_fast, size, 0.0)
+        self.ew_slow = grow(self.ew_slow, size, 0.0)
+        self.ew_square = grow(self.ew_square, size, 0.0)
+        self.n_posts = grow(self.n_posts, size, 0)
+        self.last_seen = grow(self.last_seen, size, _NO_BUCKET)
+
+    def update(self, posts: pd.DataFrame) -> int:
+        """
+        Fold new scored posts into the state.
+
+        `posts` needs the user, time and score columns; rows with a missing
+        value in any of them are skipped. Returns the number of posts used.
+        """
+        columns = [self.user_column, self.time_column, *self.score_columns]
+        frame = posts[columns].dropna()
+        if frame.empty:
+            return 0
+
+        rows = self.index.rows(frame[self.user_column].to_numpy())
+        self._ensure_capacity(len(self.index))
+        ts = _to_ns(frame[self.time_column].to_numpy())
+        values = frame[self.score_columns].to_numpy(dtype=np.float64)
+
+        order = np.lexsort((ts, rows))
+        rows, ts, values = rows[order], ts[order], values[order]
+
+        # group boundaries of each user inside the sorted batch
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        users = rows[starts]
+        counts = np.diff(np.r_[starts, rows.size])
+        group = np.repeat(np.arange(users.size), counts)
+        # steps until the end of the group: 0 for the newest post
+        age = np.repeat(starts + counts, counts) - np.arange(rows.size) - 1
+
+        fresh = self.n_posts[users] == 0
+
+        def fold(
+            prior: npt.NDArray[Any], x: npt.NDArray[np.float64], alpha: float
+        ) -> npt.NDArray[np.float64]:
+            # k sequential EW updates per user in closed form:
+            #   m_k = (1 - a)^k m_0 + sum_i a (1 - a)^(k - 1 - i) x_i
+            # new users start from their first value, which matches
+            # pandas' ewm(alpha=a, adjust=False)
+            start = np.where(fresh[:, None], x[starts], prior)
+            acc = np.zeros_like(start)
+            np.add.at(acc, group, (alpha * (1.0 - alpha) ** age)[:, None] * x)
+            return ((1.0 - alpha) ** counts)[:, None] * start + acc
+
+        self.ew_fast[users] = fold(
+            self.ew_fast[users], values, self.fast_alpha
+        )
+        self.ew_slow[users] = fold(
+            self.ew_slow[users], values, self.slow_alpha
+        )
+        self.ew_square[users] = fold(
+            self.ew_square[users], values**2, self.fast_alpha
+        )
+
+        self._update_rings(users, rows, ts, values)
+        self.n_posts[users] += counts
+        self.last_seen[users] = np.maximum(
+            self.last_seen[users], ts[starts + counts - 1]
+        )
+        return int(rows.size)
+
+    def _update_rings(
+        self,
+        users: npt.NDArray[np.int64],
+        rows: npt.NDArray[np.int64],
+        ts: npt.NDArray[np.int64],
+        values: npt.NDArray[np.float64],
+    ) -> None:
+        window = self.window
+        bucket = ts // self._freq_ns
+        newest = np.full(len(self.index), _NO_BUCKET, dtype=np.int64)
+        np.maximum.at(newest, rows, bucket)
+
+        last = self.last_bucket[users]
+        head = np.maximum(last, newest[users])
+        # bucket each slot will hold once the head moves forward; slots that
+        # still hold an older bucket are recycled
+        slots = np.arange(window)
+        slot_bucket = head[:, None] - ((head[:, None] - slots) % window)
+        stale = (slot_bucket > last[:, None]) & (head > last)[:, None]
+        ring_sum = self.ring_sum[users]
+        ring_count = self.ring_count[users]
+        ring_sum[stale] = 0.0
+        ring_count[stale] = 0
+        self.ring_sum[users] = ring_sum
+        self.ring_count[users] = ring_count
+        self.last_bucket[users] = head
+
+        keep = bucket > self.last_bucket[rows] - window
+        slot = bucket[keep] % window
+        np.add.at(self.ring_sum, (rows[keep], slot), values[keep])
+        np.add.at(self.ring_count, (rows[keep], slot), 1)
+
+    def features(
+        self,
+        as_of: Optional[Any] = None,
+        users: Optional[Iterable[Any]] = None,
+    ) -> pd.DataFrame:
+        """
+        Return one row of features per user.
+
+        Rolling features cover the `window` buckets ending at the bucket of
+        `as_of` (default: the newest post seen across all users), so users
+        who stopped posting see their rolling means fade out.
+        """
+        n = len(self.index)
+        rows = np.arange(n) if users is None else self.index.get(users)
+        rows = rows[rows >= 0]
+        if n == 0 or rows.size == 0:
+            return pd.DataFrame(index=pd.Index([], name=self.user_column))
+
+        window = self.window
+        if as_of is None:
+            head = int(self.last_bucket[:n].max())
+        else:
+            head = int(_to_ns([as_of])[0] // self._freq_ns)
+
+        last = self.last_bucket[rows]
+        slots = np.arange(window)
+        slot_bucket = last[:, None] - ((last[:, None] - slots) % window)
+        live = (slot_bucket > head - window) & (slot_bucket <= head)
+        ring_sum = np.where(live[:, :, None], self.ring_sum[rows], 0.0)
+        ring_count = np.where(live, self.ring_count[rows], 0)
+
+        total = ring_count.sum(axis=1)
+        current = np.where(slot_bucket == head, ring_count, 0).sum(axis=1)
+        previous = (total - current) / (window - 1)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rolling = ring_sum.sum(axis=1) / total[:, None]
+            freq_change = current / previous - 1.0
+
+        fast = self.ew_fast[rows].astype(np.float64)
+        slow = self.ew_slow[rows].astype(np.float64)
+        square = self.ew_square[rows].astype(np.float64)
+        volatility = np.sqrt(np.maximum(square - fast**2, 0.0))
+
+        data: dict[str, Any] = {}
+        for i, col in enumerate(self.score_columns):
+            data[f'rolling_mean_{col}'] = rolling[:, i]
+            data[f'ewm_{col}'] = fast[:, i]
+            data[f'trend_{col}'] = fast[:, i] - slow[:, i]
+            data[f'volatility_{col}'] = volatility[:, i]
+        data['posts_in_window'] = total
+        data['posts_in_bucket'] = current
+        data['frequency_change'] = freq_change
+        data['n_posts'] = self.n_posts[rows]
+        data['last_post'] = pd.to_datetime(self.last_seen[rows], utc=True)
+
+        index = pd.Index(
+            [self.index.users[row] for row in rows], name=self.user_column
+        )
+        return pd.DataFrame(data, index=index)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Persist the configuration and state as a compressed ``.npz``."""
+        n = len(self.index)
+        config = {
+            'score_columns': self.score_columns,
+            'user_column': self.user_column,
+            'time_column': self.time_column,
+            'freq': str(self.freq),
+            'window': self.window,
+            'fast_alpha': self.fast_alpha,
+            'slow_alpha': self.slow_alpha,
+        }
+        np.savez_compressed(
+            path,
+            config=np.asarray(json.dumps(config)),
+            users=self.index.to_array(),
+            ring_sum=self.ring_sum[:n],
+            ring_count=self.ring_count[:n],
+            last_bucket=self.last_bucket[:n],
+            ew_fast=self.ew_fast[:n],
+            ew_slow=self.ew_slow[:n],
+            ew_square=self.ew_square[:n],
+            n_posts=self.n_posts[:n],
+            last_seen=self.last_seen[:n],
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'UserAggregator':
+        """Restore an aggregator written by ``save``."""
+        with np.load(path) as data:
+            agg = cls(**json.loads(str(data['config'])))
+            agg.index = UserIndex(data['users'].tolist())
+            for name in (
+                'ring_sum',
+                'ring_count',
+                'last_bucket',
+                'ew_fast',
+                'ew_slow',
+                'ew_square',
+                'n_posts',
+                'last_seen',
+            ):
+                setattr(agg, name, data[name].copy())
+        return agg
@@ -0,0 +1,309 @@
+"""
+Incremental alerting module.
+
+Flags users whose core mental-health category scores shift sharply, from
+scored posts as they arrive. Every tracked user costs a fixed handful of
+float32 cells per category, so hundreds of thousands of users fit in a
+few tens of megabytes.
+
+Defines:
+- Alert: one detected change for a user and category
+- ChangeDetector: per-user, per-category EWMA + two-sided CUSUM detector
+"""
+
+from __future__ import annotations
+
+import json
+
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from mhai.aggregation import UserIndex
+from mhai.utils import grow
+
+DEFAULT_CATEGORIES = ('anxiety', 'depression', 'psychosis')
+
+
+@dataclass(frozen=True)
+class Alert:
+    """A sharp change of one user's score in one category."""
+
+    user: str
+    category: str
+    direction: str
+    statistic: float
+    score: float
+    baseline: float
+    timestamp: Optional[Any] = None
+
+
+class ChangeDetector:
+    """
+    Streaming change-point detector over core category scores.
+
+    For every user and category the detector keeps an exponentially
+    weighted baseline (mean and variance) and two CUSUM statistics over the
+    standardized residual ``z = (score - mean) / std``::
+
+        up   = max(0, up + z - drift)
+        down = max(0, down - z - drift)
+
+    An alert is emitted when either statistic exceeds `threshold`, after
+    which it restarts from zero. No alerts are raised during the first
+    `warmup` posts of a user, while the baseline settles.
+    """
+
+    def __init__(
+        self,
+        categories: Sequence[str] = DEFAULT_CATEGORIES,
+        alpha: float = 0.1,
+        drift: float = 0.5,
+        threshold: float = 5.0,
+        warmup: int = 5,
+        min_std: float = 0.05,
+    ) -> None:
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError('alpha must be in (0, 1].')
+        if threshold <= 0 or min_std <= 0:
+            raise ValueError('threshold and min_std must be positive.')
+
+        self.categories = list(categories)
+        self.alpha = alpha
+        self.drift = drift
+        self.threshold = threshold
+        self.warmup = warmup
+        self.min_std = min_std
+
+        self.index = UserIndex()
+        ncat = len(self.categories)
+        self.mean = np.zeros((0, ncat), dtype=np.float32)
+        self.var = np.zeros((0, ncat), dtype=np.float32)
+        self.up = np.zeros((0, ncat), dtype=np.float32)
+        self.down = np.zeros((0, ncat), dtype=np.float32)
+        self.count = np.zeros(0, dtype=np.int32)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Return the memory held by the detector state, in bytes.
+
+        Counts the allocated (grown) capacity of the state arrays, not
+        only the rows in use, plus the user index.
+        """
+        arrays = (self.mean, self.var, self.up, self.down, self.count)
+        return sum(a.nbytes for a in arrays) + self.index.nbytes
+
+    def _ensure_capacity(self, size: int) -> None:
+        self.mean = grow(self.mean, size, 0.0)
+        self.var = grow(self.var, size, 0.0)
+        self.up = grow(self.up, size, 0.0)
+        self.down = grow(self.down, size, 0.0)
+        self.count = grow(self.count, size, 0)
+
+    def update(
+        self,
+        users: Sequence[Any],
+        scores: npt.ArrayLike,
+        timestamps: Optional[Sequence[Any]] = None,
+    ) -> list[Alert]:
+        """
+        Consume a batch of scored posts and return the alerts it raised.
+
+        `scores` has one row per post and one column per category, in
+        ``self.categories`` order. Posts of the same user are applied in
+        batch order, so pass them sorted by time.
+        """
+        values = np.asarray(scores, dtype=np.float32)
+        if values.ndim != 2 or values.shape[1] != len(self.categories):
+            raise ValueError('scores must have shape (n_posts, n_categories).')
+        if len(users) != values.shape[0]:
+            raise ValueError(
+                f'Got {len(users)} users for {values.shape[0]} score rows.'
+            )
+        if timestamps is not None and len(timestamps) != values.shape[0]:
+            raise ValueError(
+                f'Got {len(timestamps)} timestamps for {values.shape[0]} '
+                'score rows.'
+            )
+        rows = self.index.rows(users)
+        self._ensure_capacity(len(self.index))
+        if rows.size == 0:
+            return []
+
+        # rank of each post among the posts of its user in this batch; one
+        # vectorized step per rank keeps per-user updates sequential
+        order = np.argsort(rows, kind='stable')
+        sorted_rows = rows[order]
+        starts = np.flatnonzero(
+            np.r_[True, sorted_rows[1:] != sorted_rows[:-1]]
+        )
+        counts = np.diff(np.r_[starts, sorted_rows.size])
+        rank = np.empty_like(rows)
+        rank[order] = np.arange(rows.size) - np.repeat(starts, counts)
+        # posts grouped by rank (batch order within a rank), so every step
+        # is a contiguous slice instead of a scan of the whole batch
+        by_rank = np.argsort(rank, kind='stable')
+        bounds = np.r_[0, np.cumsum(np.bincount(rank))]
+
+        alerts: list[Alert] = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            idx = by_rank[start:stop]
+            alerts.extend(self._step(rows[idx], values[idx], idx, timestamps))
+        return alerts
+
+    def _step(
+        self,
+        rows: npt.NDArray[np.int64],
+        x: npt.NDArray[np.float32],
+        idx: npt.NDArray[np.int64],
+        timestamps: Optional[Sequence[Any]],
+    ) -> list[Alert]:
+        """Apply one post per user (`rows` are unique)."""
+        count = self.count[rows]
+        fresh = (count == 0)[:, None]
+        mean = np.where(fresh, x, self.mean[rows])
+        var = np.where(fresh, 0.0, self.var[rows]).astype(np.float32)
+
+        std = np.maximum(np.sqrt(var), self.min_std)
+        z = (x - mean) / std
+        armed = (count >= self.warmup)[:, None]
+        up = np.where(
+            armed, np.maximum(0.0, self.up[rows] + z - self.drift), 0
+        )
+        down = np.where(
+            armed, np.maximum(0.0, self.down[rows] - z - self.drift), 0
+        )
+
+        fired_up = up > self.threshold
+        fired_down = down > self.threshold
+        alerts = self._alerts(
+            rows, x, mean, up, fired_up, 'up', idx, timestamps
+        ) + self._alerts(
+            rows, x, mean, down, fired_down, 'down', idx, timestamps
+        )
+
+        diff = x - mean
+        self.mean[rows] = mean + self.alpha * diff
+        self.var[rows] = (1.0 - self.alpha) * (var + self.alpha * diff**2)
+        self.up[rows] = np.where(fired_up, 0.0, up)
+        self.down[rows] = np.where(fired_down, 0.0, down)
+        self.count[rows] = count + 1
+        return alerts
+
+    def _alerts(
+        self,
+        rows: npt.NDArray[np.int64],
+        x: npt.NDArray[np.float32],
+        mean: npt.NDArray[np.float32],
+        stat: npt.NDArray[np.float32],
+        fired: npt.NDArray[np.bool_],
+        direction: str,
+        idx: npt.NDArray[np.int64],
+        timestamps: Optional[Sequence[Any]],
+    ) -> list[Alert]:
+        users = self.index.users
+        return [
+            Alert(
+                user=users[rows[i]],
+                category=self.categories[j],
+                direction=direction,
+                statistic=float(stat[i, j]),
+                score=float(x[i, j]),
+                baseline=float(mean[i, j]),
+                timestamp=(
+                    timestamps[int(idx[i])] if timestamps is not None else None
+                ),
+            )
+            for i, j in zip(*np.nonzero(fired))
+        ]
+
+    def update_one(
+        self,
+        user: Any,
+        core_scores: Mapping[str, float],
+        timestamp: Optional[Any] = None,
+    ) -> list[Alert]:
+        """
+        Consume one post scored by ``map_to_core_categories``.
+
+        Categories missing from `core_scores` count as a score of 0.
+        """
+        row = [[core_scores.get(cat, 0.0) for cat in self.categories]]
+        stamps = [timestamp] if timestamp is not None else None
+        return self.update([user], row, stamps)
+
+    def update_frame(
+        self,
+        frame: pd.DataFrame,
+        user_column: str = 'user',
+        time_column: Optional[str] = 'created_at',
+        prefix: str = 'core_',
+    ) -> list[Alert]:
+        """
+        Consume scored posts with ``<prefix><category>`` columns.
+
+        Rows are applied in time order when `time_column` is present;
+        missing category scores count as 0.
+        """
+        if time_column and time_column in frame:
+            frame = frame.sort_values(time_column, kind='stable')
+        columns = [f'{prefix}{cat}' for cat in self.categories]
+        scores = frame.reindex(columns=columns).fillna(0.0).to_numpy()
+        stamps = (
+            frame[time_column].tolist()
+            if time_column and time_column in frame
+            else None
+        )
+        return self.update(frame[user_column].tolist(), scores, stamps)
+
+    def state(self, users: Optional[Iterable[Any]] = None) -> pd.DataFrame:
+        """Return the baseline and CUSUM statistics per user."""
+        n = len(self.index)
+        rows = np.arange(n) if users is None else self.index.get(users)
+        rows = rows[rows >= 0]
+        data: dict[str, Any] = {'posts': self.count[rows]}
+        for j, cat in enumerate(self.categories):
+            data[f'mean_{cat}'] = self.mean[rows, j]
+            data[f'std_{cat}'] = np.sqrt(self.var[rows, j])
+            data[f'up_{cat}'] = self.up[rows, j]
+            data[f'down_{cat}'] = self.down[rows, j]
+        index = pd.Index([self.index.users[r] for r in rows], name='user')
+        return pd.DataFrame(data, index=index)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Persist the configuration and state as a compressed ``.npz``."""
+        n = len(self.index)
+        config = {
+            'categories': self.categories,
+            'alpha': self.alpha,
+            'drift': self.drift,
+            'threshold': self.threshold,
+            'warmup': self.warmup,
+            'min_std': self.min_std,
+        }
+        np.savez_compressed(
+            path,
+            config=np.asarray(json.dumps(config)),
+            users=self.index.to_array(),
+            mean=self.mean[:n],
+            var=self.var[:n],
+            up=self.up[:n],
+            down=self.down[:n],
+            count=self.count[:n],
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'ChangeDetector':
+        """Restore a detector written by ``save``."""
+        with np.load(path) as data:
+            detector = cls(**json.loads(str(data['config'])))
+            detector.index = UserIndex(data['users'].tolist())
+            for name in ('mean', 'var', 'up', 'down', 'count'):
+                setattr(detector, name, data[name].copy())
+        return detector
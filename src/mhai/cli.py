@@ -0,0 +1,780 @@
+"""
+Command-line interface.
+
+Usage::
+
+    mhai score posts.parquet --evaluators sentiment,emotion --out out.csv
+    mhai score posts.csv --evaluators mentbert --workers 2 --out out.jsonl
+    mhai score posts.csv --evaluators sentiment,mental --device cpu --out o.csv
+    mhai rescore out.csv --evaluators sentiment,emotion --model emotion=./v2
+
+Heavy dependencies (pandas, transformers, torch) are imported only when a
+command runs, so ``mhai --help`` starts instantly.
+
+Defines:
+- EVALUATORS: short evaluator names and their import paths
+- load_evaluator: build an evaluator from a short name or ``module:Class``
+- iter_chunks: stream a csv, jsonl or parquet file as DataFrame chunks
+- scored_rows: row ids already written to a partial output
+- FileSink: append scored records to a csv, jsonl or parquet output
+- Progress: throughput and ETA reporter
+- read_output / write_output: load and atomically replace a whole output
+- main: ``mhai`` entry point
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, TextIO, Union
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+    import pandas as pd
+
+    from mhai.evaluations.base import Evaluator
+    from mhai.evaluations.runtime import RuntimeConfig
+
+EVALUATORS: dict[str, str] = {
+    'cascade': 'mhai.evaluations.cascade:default_cascade',
+    'emotion': 'mhai.evaluations.emotion:EmotionEvaluator',
+    'mental': 'mhai.evaluations.mental:MentalEvaluator',
+    'mentbert': 'mhai.evaluations.mapping_membert:MentBERTClassifier',
+    'sentiment': 'mhai.evaluations.sentiment:SentimentEvaluator',
+}
+
+ROW_COLUMN = 'row_id'
+
+_FORMATS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+}
+_CSV_CHUNK = 100_000
+# only empty cells are missing: posts reading "None", "NA" or "null" are text
+_CSV_NA: dict[str, Any] = {'keep_default_na': False, 'na_values': ['']}
+
+
+def file_format(path: Union[str, Path]) -> str:
+    """Return ``csv``, ``jsonl`` or ``parquet`` from the file extension."""
+    suffix = Path(path).suffix.lower()
+    if suffix not in _FORMATS:
+        raise ValueError(
+            f"Unsupported file type '{suffix}': use .csv, .jsonl or .parquet."
+        )
+    return _FORMATS[suffix]
+
+
+def _pyarrow_parquet() -> Any:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError('Parquet files require pyarrow.') from exc
+    return pq
+
+
+def load_evaluator(
+    spec: str,
+    model_name: Optional[str] = None,
+    runtime: Optional[RuntimeConfig] = None,
+) -> Evaluator:
+    """
+    Return an evaluator from a short name or a ``module:Class`` path.
+
+    Short names are the keys of EVALUATORS; the path may also name a
+    factory function. `model_name` overrides the evaluator's default model
+    (e.g. a local directory) and `runtime` its device and threads.
+    """
+    path = EVALUATORS.get(spec, spec)
+    module_name, sep, class_name = path.partition(':')
+    if not sep:
+        raise ValueError(
+            f"Unknown evaluator '{spec}': use one of "
+            f"{', '.join(EVALUATORS)} or 'module:Class'."
+        )
+    cls = getattr(importlib.import_module(module_name), class_name)
+    kwargs: dict[str, Any] = {'model_name': model_name} if model_name else {}
+    if runtime is not None:
+        kwargs['runtime'] = runtime
+    evaluator: Evaluator = cls(**kwargs)
+    return evaluator
+
+
+def count_rows(path: Union[str, Path]) -> Optional[int]:
+    """
+    Return the number of rows in `path`, cheaply.
+
+    Parquet files read it from the footer; text files count newlines, so
+    csv fields with embedded line breaks make the count an estimate.
+    """
+    fmt = file_format(path)
+    if fmt == 'parquet':
+        return int(_pyarrow_parquet().ParquetFile(path).metadata.num_rows)
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(1 << 20), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(lines - 1, 0) if fmt == 'csv' else lines
+
+
+def iter_chunks(
+    path: Union[str, Path], chunk_size: int = 1024
+) -> Iterator[pd.DataFrame]:
+    """Yield the rows of a csv, jsonl or parquet file in chunks."""
+    import pandas as pd
+
+    fmt = file_format(path)
+    if fmt == 'csv':
+        yield from pd.read_csv(path, chunksize=chunk_size, **_CSV_NA)
+    elif fmt == 'jsonl':
+        # dtype=False keeps strings such as "007" as they are
+        with pd.read_json(
+            path, lines=True, chunksize=chunk_size, dtype=False
+        ) as reader:
+            yield from reader
+    else:
+        parquet = _pyarrow_parquet().ParquetFile(path)
+        for batch in parquet.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+
+def _drop_partial_line(path: Path) -> None:
+    """Truncate a text output after its last complete line."""
+    with open(path, 'rb+') as fh:
+        size = fh.seek(0, os.SEEK_END)
+        if not size:
+            return
+        fh.seek(size - 1)
+        if fh.read(1) == b'\n':
+            return
+        pos = size
+        while pos > 0:
+            step = min(pos, 1 << 16)
+            fh.seek(pos - step)
+            block = fh.read(step)
+            cut = block.rfind(b'\n')
+            if cut >= 0:
+                fh.truncate(pos - step + cut + 1)
+                return
+            pos -= step
+        fh.truncate(0)
+
+
+def _next_part(path: Path) -> int:
+    """Return the number of the next ``part-NNNNN.parquet`` in `path`."""
+    numbers = [
+        int(part.stem.partition('-')[2])
+        for part in path.glob('part-*.parquet')
+    ]
+    return max(numbers, default=-1) + 1
+
+
+def scored_rows(path: Union[str, Path]) -> npt.NDArray[Any]:
+    """
+    Return the sorted row ids already written to output `path`.
+
+    A line left incomplete by an interrupted run is removed first, so the
+    output can be appended to safely.
+    """
+    import numpy as np
+    import pandas as pd
+
+    path = Path(path)
+    fmt = file_format(path)
+    if not path.exists():
+        return np.empty(0, dtype=np.int64)
+    if fmt == 'parquet':
+        pq = _pyarrow_parquet()
+        parts = [
+            pq.read_table(part, columns=[ROW_COLUMN])[ROW_COLUMN].to_numpy()
+            for part in sorted(path.glob('part-*.parquet'))
+        ]
+        rows: Any = np.concatenate(parts) if parts else np.empty(0)
+    else:
+        _drop_partial_line(path)
+        if not path.stat().st_size:
+            return np.empty(0, dtype=np.int64)
+        if fmt == 'csv':
+            rows = pd.read_csv(path, usecols=[ROW_COLUMN])[ROW_COLUMN]
+        else:
+            with open(path, encoding='utf-8') as fh:
+                rows = [
+                    json.loads(line)[ROW_COLUMN] for line in fh if line.strip()
+                ]
+    return np.unique(np.asarray(rows, dtype=np.int64))
+
+
+class FileSink:
+    """
+    Pipeline sink appending records to a csv, jsonl or parquet output.
+
+    Text outputs are appended and flushed batch by batch, so an interrupted
+    run loses at most the batches in flight. Parquet output is a directory
+    of ``part-NNNNN.parquet`` files written every `flush_rows` records.
+    """
+
+    def __init__(self, path: Union[str, Path], flush_rows: int = 4096):
+        self.path = Path(path)
+        self.format = file_format(self.path)
+        self.flush_rows = flush_rows
+        self.columns: Optional[list[str]] = None
+        self.rows = 0
+        self._pending: list[dict[str, Any]] = []
+        if self.format == 'parquet':
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._part = _next_part(self.path)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.format == 'csv' and self.path.exists():
+                import pandas as pd
+
+                if self.path.stat().st_size:
+                    header = pd.read_csv(self.path, nrows=0)
+                    self.columns = list(header.columns)
+
+    def __call__(self, batch: list[dict[str, Any]]) -> None:
+        """Write one batch of records."""
+        self.rows += len(batch)
+        if self.format == 'parquet':
+            self._pending.extend(batch)
+            if len(self._pending) >= self.flush_rows:
+                self._write_part()
+            return
+
+        import pandas as pd
+
+        frame = pd.DataFrame(batch)
+        if self.format == 'csv':
+            header = self.columns is None
+            if self.columns is None:
+                self.columns = list(frame.columns)
+            extra = [c for c in frame.columns if c not in self.columns]
+            if extra:
+                # e.g. the first batches were all skipped by a routed
+                # evaluator; rewrite the file once with the wider header
+                self.columns += extra
+                self._widen_csv()
+            frame = frame.reindex(columns=self.columns)
+            frame.to_csv(self.path, mode='a', header=header, index=False)
+        else:
+            text = frame.to_json(
+                orient='records', lines=True, date_format='iso'
+            )
+            with open(self.path, 'a', encoding='utf-8') as fh:
+                fh.write(text if text.endswith('\n') else text + '\n')
+
+    def _widen_csv(self) -> None:
+        """
+        Rewrite the csv output with the current, wider header.
+
+        The rows are copied to a temporary file that then replaces the
+        output, so an interruption leaves the rows already written intact.
+        """
+        import pandas as pd
+
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as fh:
+                pd.DataFrame(columns=self.columns).to_csv(fh, index=False)
+                for chunk in pd.read_csv(
+                    self.path, chunksize=_CSV_CHUNK, **_CSV_NA
+                ):
+                    chunk.reindex(columns=self.columns).to_csv(
+                        fh, header=False, index=False
+                    )
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _write_part(self) -> None:
+        import pandas as pd
+
+        if not self._pending:
+            return
+        target = self.path / f'part-{self._part:05d}.parquet'
+        tmp = target.with_suffix('.tmp')
+        pd.DataFrame(self._pending).to_parquet(tmp, index=False)
+        tmp.replace(target)
+        self._part += 1
+        self._pending = []
+
+    def close(self) -> None:
+        """Write any buffered records."""
+        if self.format == 'parquet':
+            self._write_part()
+
+
+def read_output(path: Union[str, Path]) -> pd.DataFrame:
+    """
+    Return a whole csv, jsonl or parquet output as one DataFrame.
+
+    Parquet rows found in several parts (a rewrite interrupted before the
+    old parts were removed, see ``write_output``) are taken from the
+    newest part.
+    """
+    import pandas as pd
+
+    path = Path(path)
+    fmt = file_format(path)
+    if fmt == 'parquet':
+        parts = sorted(path.glob('part-*.parquet'))
+        if not parts:
+            return pd.DataFrame()
+        frame = pd.concat(
+            [pd.read_parquet(part) for part in parts], ignore_index=True
+        )
+        if ROW_COLUMN in frame:
+            frame = frame.drop_duplicates(
+                ROW_COLUMN, keep='last', ignore_index=True
+            )
+        return frame
+    _drop_partial_line(path)
+    if not path.stat().st_size:
+        return pd.DataFrame()
+    if fmt == 'csv':
+        return pd.read_csv(path, **_CSV_NA)
+    return pd.read_json(path, lines=True, dtype=False)
+
+
+def write_output(frame: pd.DataFrame, path: Union[str, Path]) -> None:
+    """
+    Replace output `path` with `frame`.
+
+    The new content is written to a temporary file first, so an
+    interrupted write leaves the previous output in place. Parquet
+    outputs get the new content as one new part, and the old parts are
+    removed only after it is in place. If that is interrupted,
+    ``read_output`` takes the duplicated rows from the new part.
+    """
+    path = Path(path)
+    fmt = file_format(path)
+    if fmt == 'parquet':
+        path.mkdir(parents=True, exist_ok=True)
+        old = list(path.glob('part-*.parquet'))
+        target = path / f'part-{_next_part(path):05d}.parquet'
+        tmp = target.with_suffix('.tmp')
+        frame.to_parquet(tmp, index=False)
+        tmp.replace(target)
+        for part in old:
+            part.unlink()
+        return
+    tmp = path.with_name(path.name + '.tmp')
+    if fmt == 'csv':
+        frame.to_csv(tmp, index=False)
+    else:
+        frame.to_json(tmp, orient='records', lines=True, date_format='iso')
+    tmp.replace(path)
+
+
+def _format_seconds(seconds: float) -> str:
+    minutes, sec = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours:d}:{minutes:02d}:{sec:02d}'
+
+
+class Progress:
+    """Print rows done, throughput and ETA at most every `interval` s."""
+
+    def __init__(
+        self,
+        total: Optional[int] = None,
+        done: int = 0,
+        interval: float = 1.0,
+        stream: Optional[TextIO] = None,
+    ) -> None:
+        self.total = total
+        self.done = done
+        self.new = 0
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.started = time.perf_counter()
+        self._last = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Return the rows scored per second in this run."""
+        elapsed = time.perf_counter() - self.started
+        return self.new / elapsed if elapsed > 0 else 0.0
+
+    def line(self) -> str:
+        """Return the current progress line."""
+        rate = self.rate
+        text = f'{self.done}'
+        if self.total:
+            text += f'/{self.total} rows ({100 * self.done / self.total:.1f}%)'
+        else:
+            text += ' rows'
+        text += f'  {rate:.1f} rows/s'
+        if self.total and rate > 0:
+            left = max(self.total - self.done, 0) / rate
+            text += f'  ETA {_format_seconds(left)}'
+        return text
+
+    def update(self, rows: int) -> None:
+        """Count `rows` more scored rows and report if due."""
+        self.done += rows
+        self.new += rows
+        now = time.perf_counter()
+        if now - self._last >= self.interval:
+            self._last = now
+            print(self.line(), file=self.stream, flush=True)
+
+    def close(self) -> None:
+        """Print the final line."""
+        elapsed = _format_seconds(time.perf_counter() - self.started)
+        print(f'{self.line()}  done in {elapsed}', file=self.stream)
+
+
+def _parse_pairs(values: Sequence[str], option: str) -> dict[str, str]:
+    pairs = {}
+    for value in values:
+        name, sep, setting = value.partition('=')
+        if not sep or not name or not setting:
+            raise ValueError(f"{option} expects NAME=VALUE, got '{value}'.")
+        pairs[name] = setting
+    return pairs
+
+
+def _pending_chunks(
+    path: Path, chunk_size: int, text_column: str, done: npt.NDArray[Any]
+) -> Iterator[pd.DataFrame]:
+    """Yield input chunks with row ids, skipping rows already scored."""
+    import numpy as np
+
+    offset = 0
+    for chunk in iter_chunks(path, chunk_size):
+        if text_column not in chunk.columns:
+            raise ValueError(f"Input has no '{text_column}' column.")
+        rows = np.arange(offset, offset + len(chunk), dtype=np.int64)
+        offset += len(chunk)
+        chunk = chunk.reset_index(drop=True)
+        chunk.insert(0, ROW_COLUMN, rows)
+        chunk[text_column] = chunk[text_column].fillna('').astype(str)
+        if done.size:
+            chunk = chunk[~np.isin(rows, done, assume_unique=True)]
+        if len(chunk):
+            yield chunk
+
+
+def _evaluator_names(args: argparse.Namespace) -> list[str]:
+    return [n.strip() for n in args.evaluators.split(',') if n.strip()]
+
+
+def _load_evaluators(
+    args: argparse.Namespace,
+) -> tuple[list[str], list[Evaluator]]:
+    """Return the stage names and evaluators selected by `args`."""
+    from dataclasses import replace
+
+    from mhai.evaluations.runtime import RuntimeConfig, split_threads
+
+    models = _parse_pairs(args.model, '--model')
+    names = _evaluator_names(args)
+    if not names:
+        raise ValueError('No evaluators given.')
+    runtime = RuntimeConfig.from_env()
+    if args.device:
+        runtime = replace(runtime, device=args.device)
+    evaluators = [
+        load_evaluator(name, models.get(name), runtime) for name in names
+    ]
+    # concurrent evaluator stages share the cores instead of each
+    # starting one torch thread per core; torch's count is process-wide,
+    # so the shares are close to each other (see mhai.evaluations.runtime)
+    if args.threads:
+        budgets = [args.threads] * len(evaluators)
+    elif runtime.threads is None:
+        cores = max((os.cpu_count() or 1) // args.workers, 1)
+        budgets = split_threads(len(evaluators), cores)
+    else:
+        budgets = [runtime.threads] * len(evaluators)
+    for evaluator, threads in zip(evaluators, budgets):
+        evaluator.set_threads(threads)
+
+    stage_names: list[str] = []
+    for i, (name, evaluator) in enumerate(zip(names, evaluators)):
+        stage_name = evaluator.column_prefix or name
+        if stage_name in stage_names:
+            stage_name = f'{stage_name}-{i}'
+        stage_names.append(stage_name)
+    return stage_names, evaluators
+
+
+def _routes(
+    args: argparse.Namespace, names: Sequence[str], evaluators: list[Evaluator]
+) -> list[Optional[tuple[str, ...]]]:
+    """Return the languages routed to each evaluator (None: all)."""
+    if not args.route_languages:
+        return [None] * len(evaluators)
+    routes = _parse_pairs(args.languages, '--languages')
+    out = []
+    for name, evaluator in zip(names, evaluators):
+        languages = evaluator.languages
+        if name in routes:
+            codes = routes[name].split(',')
+            languages = None if '*' in codes else tuple(codes)
+        out.append(languages)
+    return out
+
+
+def score(args: argparse.Namespace) -> int:
+    """Run the ``score`` command."""
+    from mhai.pipeline import Pipeline, Stage, evaluator_stage
+    from mhai.provenance import RunTable
+
+    stage_names, evaluators = _load_evaluators(args)
+    routes = _routes(args, _evaluator_names(args), evaluators)
+    out = Path(args.out)
+    runs = RunTable.for_output(out)
+
+    stages: list[Stage] = []
+    if args.route_languages:
+        from mhai.langid import language_stage
+
+        stages.append(language_stage(column=args.text_column))
+    for stage_name, evaluator, languages in zip(
+        stage_names, evaluators, routes
+    ):
+        stages.append(
+            evaluator_stage(
+                evaluator,
+                column=args.text_column,
+                batch_size=args.batch_size,
+                name=stage_name,
+                workers=args.workers,
+                languages=languages,
+                run_id=runs.register(evaluator.provenance()),
+            )
+        )
+
+    if args.overwrite and out.exists():
+        if out.is_dir():
+            for part in out.glob('part-*.parquet'):
+                part.unlink()
+        else:
+            out.unlink()
+    done = scored_rows(out)
+    total = count_rows(args.input)
+    if done.size:
+        print(f'resuming: {done.size} rows already scored', file=sys.stderr)
+
+    sink = FileSink(out)
+    progress = Progress(total, done=int(done.size), interval=args.interval)
+
+    def write(batch: list[dict[str, Any]]) -> None:
+        sink(batch)
+        progress.update(len(batch))
+
+    pipeline = Pipeline(
+        _pending_chunks(
+            Path(args.input), args.chunk_size, args.text_column, done
+        ),
+        stages,
+        write,
+        batch_size=args.batch_size,
+        max_queue=max(4, 2 * args.workers),
+    )
+    try:
+        metrics = pipeline.run()
+    finally:
+        sink.close()
+    progress.close()
+    for name, evaluator in zip(stage_names, evaluators):
+        stats = getattr(evaluator, 'stats', None)
+        if stats is not None:
+            print(f'  {name}: {stats.as_dict()}', file=sys.stderr)
+    for stage in metrics.values():
+        stats = stage.as_dict()
+        print(
+            f'  {stats["stage"]:<16} {stats["records"]:>8} rows  '
+            f'{stats["records_per_second"]:>10.1f} rows/s busy',
+            file=sys.stderr,
+        )
+    return 0
+
+
+def _add_evaluator_options(cmd: argparse.ArgumentParser) -> None:
+    """Add the options selecting and configuring evaluators."""
+    cmd.add_argument(
+        '--evaluators',
+        default='sentiment',
+        help=(
+            f'comma-separated names ({", ".join(EVALUATORS)}) or '
+            "'module:Class' paths (default: sentiment)"
+        ),
+    )
+    cmd.add_argument(
+        '--model',
+        action='append',
+        default=[],
+        metavar='NAME=MODEL',
+        help='override the model of an evaluator (hub id or local path)',
+    )
+    cmd.add_argument(
+        '--text-column', default='text', help='column to score (default: text)'
+    )
+    cmd.add_argument(
+        '--route-languages',
+        action='store_true',
+        help=(
+            'detect the language of each text and score it only with the '
+            'evaluators meant for it (adds lang, lang_score and routed)'
+        ),
+    )
+    cmd.add_argument(
+        '--languages',
+        action='append',
+        default=[],
+        metavar='NAME=CODES',
+        help=(
+            "languages routed to an evaluator, e.g. 'sentiment=en,und' or "
+            "'sentiment=*' for all (default: the evaluator's languages)"
+        ),
+    )
+    cmd.add_argument(
+        '--batch-size', type=int, default=32, help='inference batch size'
+    )
+    cmd.add_argument(
+        '--device',
+        help=(
+            "torch device, e.g. 'cpu' or 'cuda:1' "
+            '(default: MHAI_DEVICE, else auto)'
+        ),
+    )
+    cmd.add_argument(
+        '--threads',
+        type=int,
+        help=(
+            'torch intra-op threads, a process-wide setting '
+            '(default: MHAI_THREADS, else the cores split between '
+            'evaluators and workers)'
+        ),
+    )
+
+
+def rescore_output(args: argparse.Namespace) -> int:
+    """Run the ``rescore`` command."""
+    from mhai.provenance import RunTable, rescore
+
+    out = Path(args.output)
+    if not out.exists():
+        raise FileNotFoundError(f'No output at {out}.')
+    stage_names, evaluators = _load_evaluators(args)
+    routes = _routes(args, _evaluator_names(args), evaluators)
+    frame = read_output(out)
+    frame, counts = rescore(
+        frame,
+        dict(zip(stage_names, evaluators)),
+        RunTable.for_output(out),
+        column=args.text_column,
+        batch_size=args.batch_size,
+        languages=dict(zip(stage_names, routes)),
+    )
+    if any(counts.values()):
+        write_output(frame, out)
+    for name, count in counts.items():
+        print(
+            f'  {name:<16} {count:>8} of {len(frame)} rows re-scored',
+            file=sys.stderr,
+        )
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the ``mhai`` argument parser."""
+    from mhai import __version__
+
+    parser = argparse.ArgumentParser(
+        prog='mhai', description='Mental health text analysis tools.'
+    )
+    parser.add_argument(
+        '--version', action='version', version=f'%(prog)s {__version__}'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    cmd = commands.add_parser(
+        'score',
+        help='score a csv, jsonl or parquet file',
+        description=(
+            'Stream INPUT in chunks through the evaluators and append the '
+            'scores to --out. Rows already present in --out are skipped, '
+            'so an interrupted run resumes where it stopped.'
+        ),
+    )
+    cmd.add_argument('input', help='input .csv, .jsonl or .parquet file')
+    cmd.add_argument(
+        '--out',
+        required=True,
+        help='output .csv, .jsonl or .parquet (a directory of parts)',
+    )
+    _add_evaluator_options(cmd)
+    cmd.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='batches scored concurrently per evaluator (default: 1)',
+    )
+    cmd.add_argument(
+        '--chunk-size',
+        type=int,
+        default=1024,
+        help='rows read from the input at a time (default: 1024)',
+    )
+    cmd.add_argument(
+        '--overwrite',
+        action='store_true',
+        help='discard an existing output instead of resuming',
+    )
+    cmd.add_argument(
+        '--interval',
+        type=float,
+        default=1.0,
+        help='seconds between progress lines (default: 1)',
+    )
+    cmd.set_defaults(handler=score)
+
+    cmd = commands.add_parser(
+        'rescore',
+        help='re-score the stale rows of an output',
+        description=(
+            'Re-score only the rows of OUTPUT whose provenance (evaluator, '
+            'model, revision and parameters, recorded in OUTPUT.runs.json) '
+            'differs from the current evaluators, and replace OUTPUT. '
+            'Routing uses the lang column written by score.'
+        ),
+    )
+    cmd.add_argument('output', help='output written by mhai score')
+    _add_evaluator_options(cmd)
+    cmd.set_defaults(handler=rescore_output, workers=1)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the ``mhai`` command line and return its exit code."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    for name in ('batch_size', 'workers', 'chunk_size', 'threads'):
+        value = getattr(args, name, None)
+        if value is not None and value < 1:
+            parser.error(f'--{name.replace("_", "-")} must be >= 1.')
+    try:
+        code: int = args.handler(args)
+    except (ValueError, RuntimeError, OSError) as exc:
+        print(f'mhai: error: {exc}', file=sys.stderr)
+        return 2
+    return code
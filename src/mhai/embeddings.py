@@ -0,0 +1,453 @@
+"""
+Embedding storage and similarity search module.
+
+Embeddings of harvested posts (see ``ModelBase.embed``) are appended to a
+float16 file that is memory-mapped for reading, so the corpus never has to
+fit in RAM. An inverted-file (IVF) index partitions the rows around
+k-means centroids and keeps only their int64 row ids in memory; a query
+scores the centroids, then reads just the rows of the `n_probe` closest
+lists from the memmap.
+
+Vectors are compared by inner product, which is the cosine similarity for
+the unit-length embeddings ``embed`` returns by default.
+
+Defines:
+- EmbeddingStore: append-only float16 embedding file
+- IVFIndex: approximate nearest-neighbor index over an EmbeddingStore
+- embedding_stage: pipeline stage embedding texts into a store
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from mhai.evaluations.base import ModelBase
+from mhai.pipeline import Batch, Stage
+from mhai.utils import grow
+
+IdArray = npt.NDArray[np.int64]
+FloatArray = npt.NDArray[np.float32]
+
+_CHUNK_ROWS = 1 << 16
+
+try:
+    import fcntl as _fcntl
+except ImportError:  # pragma: no cover - Windows
+    _fcntl = None  # type: ignore[assignment]
+
+
+class EmbeddingStore:
+    """
+    Append-only float16 embedding matrix on disk.
+
+    Layout::
+
+        <root>/vectors.f16    # row-major (rows, dim) float16
+        <root>/meta.json      # dim and the model that wrote the vectors
+
+    Row ids are positions in the file and never change. Appends go to the
+    end of the file under a lock (a file lock where the OS provides one),
+    so several stores or processes on the same root do not overwrite each
+    other's rows. The row count is read from the file size on every
+    append and read; readers get a read-only memmap of the rows written
+    so far.
+    """
+
+    VECTORS_NAME = 'vectors.f16'
+    META_NAME = 'meta.json'
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        dim: Optional[int] = None,
+        model_name: Optional[str] = None,
+    ) -> None:
+        self.root = Path(root)
+        meta_path = self.root / self.META_NAME
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            if dim is not None and dim != meta['dim']:
+                raise ValueError(
+                    f'Store {self.root} holds dim {meta["dim"]}, not {dim}.'
+                )
+            if model_name and meta.get('model_name') not in (None, model_name):
+                raise ValueError(
+                    f'Store {self.root} holds embeddings of '
+                    f'{meta["model_name"]}, not {model_name}.'
+                )
+            dim, model_name = meta['dim'], meta.get('model_name')
+        elif dim is None:
+            raise ValueError('dim is required to create a new store.')
+        else:
+            self.root.mkdir(parents=True, exist_ok=True)
+            meta_path.write_text(
+                json.dumps({'dim': dim, 'model_name': model_name})
+            )
+            self.path.touch()
+        self.dim = int(dim)
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self._memmap: Optional[npt.NDArray[np.float16]] = None
+
+    @property
+    def path(self) -> Path:
+        """Return the path of the vector file."""
+        return self.root / self.VECTORS_NAME
+
+    @property
+    def row_bytes(self) -> int:
+        """Return the size of one stored row."""
+        return self.dim * np.dtype(np.float16).itemsize
+
+    def __len__(self) -> int:
+        """Return the number of stored rows."""
+        return self._count_rows()
+
+    def _count_rows(self) -> int:
+        # a partially written trailing row is ignored
+        return self.path.stat().st_size // self.row_bytes
+
+    def append(self, vectors: npt.ArrayLike) -> IdArray:
+        """Append ``(n, dim)`` vectors as float16 and return their row ids."""
+        data = np.ascontiguousarray(vectors, dtype=np.float16)
+        if data.ndim != 2 or data.shape[1] != self.dim:
+            raise ValueError(
+                f'Expected (n, {self.dim}) vectors, got {data.shape}.'
+            )
+        with self._lock:
+            # unbuffered: one O_APPEND write lands whole at the current EOF
+            with self.path.open('ab', buffering=0) as fh:
+                if _fcntl is not None:
+                    # other processes appending to the store wait here
+                    _fcntl.flock(fh.fileno(), _fcntl.LOCK_EX)
+                size = fh.seek(0, 2)
+                if size % self.row_bytes:
+                    # drop a row torn by an interrupted append
+                    fh.truncate(size - size % self.row_bytes)
+                fh.write(data.tobytes())
+                end = fh.tell()
+        stop = end // self.row_bytes
+        return np.arange(stop - data.shape[0], stop, dtype=np.int64)
+
+    @property
+    def vectors(self) -> npt.NDArray[np.float16]:
+        """Return a read-only ``(rows, dim)`` memmap of the stored rows."""
+        rows = self._count_rows()
+        if self._memmap is None or self._memmap.shape[0] != rows:
+            if not rows:
+                return np.zeros((0, self.dim), dtype=np.float16)
+            self._memmap = np.memmap(
+                self.path, dtype=np.float16, mode='r', shape=(rows, self.dim)
+            )
+        return self._memmap
+
+    def read(self, ids: npt.ArrayLike) -> FloatArray:
+        """Return the rows `ids` as float32, touching only their pages."""
+        return np.asarray(
+            self.vectors[np.asarray(ids, dtype=np.int64)], dtype=np.float32
+        )
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbor index.
+
+    Rows of `store` are assigned to the closest of `n_lists` k-means
+    centroids. ``search`` probes the `n_probe` lists whose centroids are
+    closest to the query and ranks only their rows, so its cost grows
+    with ``n_probe / n_lists`` of the corpus; ``n_probe == n_lists`` is an
+    exact search.
+
+    The index covers a prefix of the append-only store: ``add`` appends
+    and indexes new vectors, ``sync`` indexes rows other writers (e.g.
+    ``embedding_stage``) appended. Until the store holds
+    ``n_lists * train_per_list`` rows, the index stays flat and ``search``
+    scans every row, which is cheap at that size. Once it reaches that
+    size, the centroids are trained (or retrained, if they were trained
+    on fewer rows than `n_lists`) and every row is indexed again.
+    """
+
+    def __init__(
+        self,
+        store: EmbeddingStore,
+        n_lists: int = 1024,
+        n_probe: int = 16,
+        train_per_list: int = 64,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> None:
+        if n_lists < 1 or n_probe < 1:
+            raise ValueError('n_lists and n_probe must be positive.')
+        self.store = store
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_per_list = train_per_list
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids: Optional[FloatArray] = None
+        self.indexed = 0
+        self._lists: list[IdArray] = []
+        self._sizes: IdArray = np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        """Return the number of indexed rows."""
+        return self.indexed
+
+    @property
+    def trained(self) -> bool:
+        """Return True once the centroids exist."""
+        return self.centroids is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory held by the centroids and the lists."""
+        lists = sum(ids.nbytes for ids in self._lists)
+        return int(
+            lists + (0 if self.centroids is None else self.centroids.nbytes)
+        )
+
+    def train(self, vectors: Optional[npt.ArrayLike] = None) -> None:
+        """
+        Fit the centroids with spherical k-means.
+
+        Without `vectors`, up to ``n_lists * train_per_list`` stored rows
+        are sampled. Fewer training rows than `n_lists` give one centroid
+        per row; ``sync`` retrains once the store is large enough. Training
+        empties the lists; the next ``sync`` indexes every stored row again.
+        """
+        rng = np.random.default_rng(self.seed)
+        if vectors is None:
+            rows = len(self.store)
+            size = min(rows, self.n_lists * self.train_per_list)
+            sample = np.sort(rng.choice(rows, size, replace=False))
+            data = self.store.read(sample)
+        else:
+            data = np.asarray(vectors, dtype=np.float32)
+        if not len(data):
+            raise ValueError('Cannot train an index without vectors.')
+        n_lists = min(self.n_lists, len(data))
+        centroids = data[rng.choice(len(data), n_lists, replace=False)]
+        for _ in range(self.iterations):
+            assign = self._assign(data, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, data)
+            counts = np.bincount(assign, minlength=n_lists)
+            # re-seed empty lists with random training rows
+            empty = np.flatnonzero(counts == 0)
+            sums[empty] = data[rng.choice(len(data), empty.size)]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.maximum(norms, 1e-12)
+        self.centroids = centroids.astype(np.float32)
+        self._lists = [np.empty(0, dtype=np.int64)] * n_lists
+        self._sizes = np.zeros(n_lists, dtype=np.int64)
+        self.indexed = 0
+
+    def _needs_training(self, rows: int) -> bool:
+        """Return True when `rows` rows call for (re)training."""
+        if rows < self.n_lists * self.train_per_list:
+            return False
+        return self.centroids is None or len(self.centroids) < self.n_lists
+
+    @staticmethod
+    def _assign(data: FloatArray, centroids: FloatArray) -> IdArray:
+        """Return the closest centroid of every row, in bounded chunks."""
+        out = np.empty(len(data), dtype=np.int64)
+        for start in range(0, len(data), _CHUNK_ROWS):
+            chunk = data[start : start + _CHUNK_ROWS]
+            out[start : start + len(chunk)] = (chunk @ centroids.T).argmax(1)
+        return out
+
+    def add(self, vectors: npt.ArrayLike) -> IdArray:
+        """Append `vectors` to the store, index them and return their ids."""
+        self.sync()
+        ids = self.store.append(vectors)
+        self.sync()
+        return ids
+
+    def sync(self) -> int:
+        """Index store rows appended since the last call; return how many."""
+        rows = len(self.store)
+        if rows == self.indexed:
+            return 0
+        new = rows - self.indexed
+        if self._needs_training(rows):
+            self.train()
+        if self.centroids is None:
+            # flat: searches scan every indexed row
+            self.indexed = rows
+            return new
+        centroids = self.centroids
+        for lo in range(self.indexed, rows, _CHUNK_ROWS):
+            hi = min(lo + _CHUNK_ROWS, rows)
+            ids = np.arange(lo, hi, dtype=np.int64)
+            assign = self._assign(self.store.read(ids), centroids)
+            order = np.argsort(assign, kind='stable')
+            lists, first = np.unique(assign[order], return_index=True)
+            for j, chunk in zip(
+                lists.tolist(), np.split(ids[order], first[1:])
+            ):
+                size = self._sizes[j]
+                self._lists[j] = grow(self._lists[j], size + chunk.size, -1)
+                self._lists[j][size : size + chunk.size] = chunk
+                self._sizes[j] = size + chunk.size
+        self.indexed = rows
+        return new
+
+    def list_ids(self, j: int) -> IdArray:
+        """Return the row ids of list `j`."""
+        return self._lists[j][: self._sizes[j]]
+
+    def search(
+        self,
+        queries: npt.ArrayLike,
+        k: int = 10,
+        n_probe: Optional[int] = None,
+    ) -> tuple[IdArray, FloatArray]:
+        """
+        Return the ids and scores of the `k` best rows per query.
+
+        Results are ``(n_queries, k)`` arrays, best first; missing results
+        are padded with id -1 and score ``-inf``. A flat index (see the
+        class docstring) is searched exactly.
+        """
+        if not self.indexed:
+            raise ValueError('The index is empty; add vectors first.')
+        if self.centroids is None:
+            return self.exact_search(queries, k)
+        q = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        probe = min(n_probe or self.n_probe, len(self.centroids))
+        coarse = q @ self.centroids.T
+        probed = np.argpartition(-coarse, probe - 1, axis=1)[:, :probe]
+        ids = np.full((len(q), k), -1, dtype=np.int64)
+        scores = np.full((len(q), k), -np.inf, dtype=np.float32)
+        for i, lists in enumerate(probed):
+            # sorted ids turn the gather into one forward pass over the file
+            candidates = np.sort(
+                np.concatenate([self.list_ids(j) for j in lists.tolist()])
+            )
+            if not candidates.size:
+                continue
+            found = self.store.read(candidates) @ q[i]
+            top = _top_k(found, k)
+            ids[i, : top.size] = candidates[top]
+            scores[i, : top.size] = found[top]
+        return ids, scores
+
+    def exact_search(
+        self, queries: npt.ArrayLike, k: int = 10
+    ) -> tuple[IdArray, FloatArray]:
+        """Return the exact `k` best indexed rows per query, scanning all."""
+        q = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        ids = np.full((len(q), k), -1, dtype=np.int64)
+        scores = np.full((len(q), k), -np.inf, dtype=np.float32)
+        for lo in range(0, self.indexed, _CHUNK_ROWS):
+            hi = min(lo + _CHUNK_ROWS, self.indexed)
+            chunk = self.store.read(np.arange(lo, hi)) @ q.T
+            merged_ids = np.concatenate(
+                [ids, np.broadcast_to(np.arange(lo, hi), (len(q), hi - lo))],
+                axis=1,
+            )
+            merged = np.concatenate([scores, chunk.T], axis=1)
+            top = np.stack([_top_k(row, k) for row in merged])
+            ids = np.take_along_axis(merged_ids, top, axis=1)
+            scores = np.take_along_axis(merged, top, axis=1)
+        return ids, scores
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Persist the centroids and lists as a compressed ``.npz``."""
+        centroids = self.centroids
+        if centroids is None:
+            centroids = np.empty((0, self.store.dim), dtype=np.float32)
+        params = [
+            self.indexed,
+            self.n_lists,
+            self.n_probe,
+            self.train_per_list,
+            self.iterations,
+            self.seed,
+        ]
+        np.savez_compressed(
+            path,
+            centroids=centroids,
+            sizes=self._sizes,
+            ids=np.concatenate(
+                [self.list_ids(j) for j in range(len(self._lists))]
+                or [np.empty(0, dtype=np.int64)]
+            ),
+            params=np.asarray(params, dtype=np.int64),
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, Path], store: EmbeddingStore) -> IVFIndex:
+        """Restore an index written by ``save`` over `store`."""
+        with np.load(path) as data:
+            centroids = data['centroids'].astype(np.float32)
+            sizes = data['sizes'].astype(np.int64)
+            ids = data['ids'].astype(np.int64)
+            indexed, n_lists, n_probe, per_list, iterations, seed = data[
+                'params'
+            ].tolist()
+        if indexed > len(store):
+            raise ValueError(f'Index covers {indexed} rows; store has fewer.')
+        index = cls(
+            store,
+            n_lists=n_lists,
+            n_probe=n_probe,
+            train_per_list=per_list,
+            iterations=iterations,
+            seed=seed,
+        )
+        if len(centroids):
+            index.centroids = centroids
+            index._sizes = sizes
+            index._lists = np.split(ids, np.cumsum(sizes)[:-1])
+        index.indexed = indexed
+        return index
+
+
+def _top_k(scores: npt.NDArray[Any], k: int) -> IdArray:
+    """Return the positions of the `k` highest scores, best first."""
+    if scores.size > k:
+        part = np.argpartition(-scores, k - 1)[:k]
+    else:
+        part = np.arange(scores.size)
+    return part[np.argsort(-scores[part], kind='stable')]
+
+
+def embedding_stage(
+    evaluator: ModelBase,
+    store: EmbeddingStore,
+    column: str = 'text',
+    target: str = 'embedding_id',
+    batch_size: Optional[int] = None,
+    workers: int = 1,
+) -> Stage:
+    """
+    Return a stage appending embeddings of `column` to `store`.
+
+    The row id of each record's embedding is written to `target`; call
+    ``IVFIndex.sync`` afterwards to index the new rows.
+    """
+    if store.model_name and store.model_name != evaluator.model_name:
+        raise ValueError(
+            f'Store holds embeddings of {store.model_name}, '
+            f'not {evaluator.model_name}.'
+        )
+
+    def _embed(batch: Batch) -> Batch:
+        if not batch:
+            return batch
+        texts = [str(record[column]) for record in batch]
+        ids = store.append(evaluator.embed(texts, batch_size=batch_size))
+        return [
+            {**record, target: row} for record, row in zip(batch, ids.tolist())
+        ]
+
+    return Stage(name='embedding', fn=_embed, workers=workers)
@@ -2,17 +2,26 @@
 Text analysis evaluation package.
 
 Exports:
+- ArtifactStore
+- CascadeEvaluator
 - EmotionEvaluator
 - MentalEvaluator
+- RuntimeConfig
 - SentimentEvaluator
 """
 
+from .artifacts import ArtifactStore
+from .cascade import CascadeEvaluator
 from .emotion import EmotionEvaluator
 from .mental import MentalEvaluator
+from .runtime import RuntimeConfig
 from .sentiment import SentimentEvaluator
 
 __all__ = [
+    'ArtifactStore',
+    'CascadeEvaluator',
     'EmotionEvaluator',
     'MentalEvaluator',
+    'RuntimeConfig',
     'SentimentEvaluator',
 ]
@@ -0,0 +1,327 @@
+"""
+Local model artifact store.
+
+Defines:
+- ArtifactError: raised when a snapshot is missing or corrupted
+- ArtifactStore: versioned on-disk snapshots of evaluator models
+- hash_files: sha256 and size of every file of a model directory
+
+Snapshots are written with safetensors weights, so loading them through
+``transformers`` memory-maps the weight file: processes that load the same
+snapshot share the underlying page-cache pages instead of each holding a
+private copy of the weights.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from mhai.utils import env_flag
+
+DEFAULT_ARTIFACTS_DIR = Path.home() / '.cache' / 'mhai' / 'artifacts'
+MANIFEST_NAME = 'manifest.json'
+VERIFIED_NAME = '.verified.json'
+CURRENT_NAME = 'current'
+DEFAULT_REVISION = 'main'
+
+_CHUNK_SIZE = 1 << 20
+
+
+class ArtifactError(RuntimeError):
+    """Raised when a model snapshot is missing or fails verification."""
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open('rb') as fh:
+        for chunk in iter(lambda: fh.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stamp(path: Path) -> list[int]:
+    """Return the size and modification time of `path`."""
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def hash_files(directory: Union[str, Path]) -> dict[str, dict[str, Any]]:
+    """
+    Return the sha256 and size of every file under `directory`.
+
+    The result is the ``files`` table of a snapshot manifest; the store's
+    own manifest and verification files are left out.
+    """
+    directory = Path(directory)
+    return {
+        path.relative_to(directory).as_posix(): {
+            'sha256': _sha256(path),
+            'size': path.stat().st_size,
+        }
+        for path in sorted(directory.rglob('*'))
+        if path.is_file() and path.name not in (MANIFEST_NAME, VERIFIED_NAME)
+    }
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """Write `text` to `path` through a temporary file and a rename."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+            fh.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class ArtifactStore:
+    """
+    Versioned local store of model and tokenizer snapshots.
+
+    Layout::
+
+        <root>/<org>--<name>/current            # latest registered revision
+        <root>/<org>--<name>/<revision>/...     # model + tokenizer files
+        <root>/<org>--<name>/<revision>/manifest.json
+
+    The manifest records a sha256 checksum and size for every file of the
+    snapshot. ``verify_snapshot`` hashes every file; ``resolve`` only
+    re-hashes files whose size or modification time differ from the
+    stamp recorded when they were last hashed (``.verified.json``), so
+    starting an evaluator does not read the whole weight file.
+    """
+
+    def __init__(
+        self,
+        root: Optional[Union[str, Path]] = None,
+        verify: bool = True,
+        offline: bool = False,
+    ) -> None:
+        self.root = Path(root) if root is not None else DEFAULT_ARTIFACTS_DIR
+        self.verify = verify
+        self.offline = offline
+
+    @classmethod
+    def from_env(cls) -> 'ArtifactStore':
+        """
+        Build a store from environment-based configuration.
+
+        Reads ``MHAI_ARTIFACTS_DIR`` (store location),
+        ``MHAI_ARTIFACTS_VERIFY`` (checksum verification, on by default) and
+        ``MHAI_OFFLINE`` (forbid falling back to the Hugging Face hub).
+        """
+        return cls(
+            root=os.getenv('MHAI_ARTIFACTS_DIR') or None,
+            verify=env_flag('MHAI_ARTIFACTS_VERIFY', True),
+            offline=env_flag('MHAI_OFFLINE', False),
+        )
+
+    def model_root(self, model_name: str) -> Path:
+        """Return the directory holding every revision of `model_name`."""
+        return self.root / model_name.replace('/', '--')
+
+    def model_dir(
+        self, model_name: str, revision: Optional[str] = None
+    ) -> Path:
+        """Return the snapshot directory for `model_name` at `revision`."""
+        revision = revision or self.current_revision(model_name)
+        return self.model_root(model_name) / (revision or DEFAULT_REVISION)
+
+    def current_revision(self, model_name: str) -> Optional[str]:
+        """Return the latest registered revision of `model_name`, if any."""
+        pointer = self.model_root(model_name) / CURRENT_NAME
+        if not pointer.is_file():
+            return None
+        return pointer.read_text().strip() or None
+
+    def manifest(
+        self, model_name: str, revision: Optional[str] = None
+    ) -> Optional[dict[str, Any]]:
+        """Return the manifest of a snapshot, or None if it is missing."""
+        path = self.model_dir(model_name, revision) / MANIFEST_NAME
+        if not path.is_file():
+            return None
+        manifest: dict[str, Any] = json.loads(path.read_text())
+        return manifest
+
+    def register(
+        self,
+        model_name: str,
+        source: Union[str, Path],
+        revision: Optional[str] = None,
+    ) -> Path:
+        """
+        Copy a saved model directory into the store.
+
+        The copy is staged in a temporary directory next to its final
+        location and renamed into place once the manifest is written, so a
+        crashed snapshot never leaves a half-written revision behind. An
+        existing revision is renamed aside, not deleted, until the new one
+        is in place, and the ``current`` pointer is replaced atomically.
+        """
+        source = Path(source)
+        if not source.is_dir():
+            raise ArtifactError(f"Snapshot source '{source}' is not a dir.")
+
+        revision = revision or DEFAULT_REVISION
+        model_root = self.model_root(model_name)
+        model_root.mkdir(parents=True, exist_ok=True)
+        target = model_root / revision
+
+        staging = Path(tempfile.mkdtemp(prefix='.staging-', dir=model_root))
+        old: Optional[Path] = None
+        try:
+            stamps: dict[str, list[int]] = {}
+            for path in sorted(source.rglob('*')):
+                if not path.is_file() or path.name in (
+                    MANIFEST_NAME,
+                    VERIFIED_NAME,
+                ):
+                    continue
+                rel = path.relative_to(source).as_posix()
+                dest = staging / rel
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(path, dest)
+                stamps[rel] = _stamp(dest)
+            files = hash_files(staging)
+
+            manifest = {
+                'model_name': model_name,
+                'revision': revision,
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'files': files,
+            }
+            (staging / MANIFEST_NAME).write_text(
+                json.dumps(manifest, indent=2, sort_keys=True)
+            )
+            (staging / VERIFIED_NAME).write_text(json.dumps(stamps))
+
+            if target.exists():
+                old = Path(tempfile.mkdtemp(prefix='.old-', dir=model_root))
+                target.rename(old / revision)
+            staging.rename(target)
+        except BaseException:
+            if old is not None and not target.exists():
+                (old / revision).rename(target)
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)
+
+        _write_atomic(model_root / CURRENT_NAME, revision)
+        return target
+
+    def snapshot(
+        self,
+        model_name: str,
+        revision: Optional[str] = None,
+        token: Optional[str] = None,
+    ) -> Path:
+        """
+        Download `model_name` from the hub and register it in the store.
+
+        Weights are re-serialized as safetensors so later loads can be
+        memory-mapped. The resolved hub commit hash is used as the revision
+        when none is given.
+        """
+        if self.offline:
+            raise ArtifactError(
+                f"Cannot snapshot '{model_name}' while offline."
+            )
+
+        from transformers import (  # type: ignore[attr-defined]
+            AutoModelForSequenceClassification,
+            AutoTokenizer,
+        )
+
+        params: dict[str, Any] = {'revision': revision, 'token': token}
+        model = AutoModelForSequenceClassification.from_pretrained(
+            model_name, **params
+        )
+        tokenizer = AutoTokenizer.from_pretrained(model_name, **params)
+        resolved = revision or getattr(model.config, '_commit_hash', None)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model.save_pretrained(tmp, safe_serialization=True)
+            tokenizer.save_pretrained(tmp)
+            return self.register(model_name, tmp, revision=resolved)
+
+    def verify_snapshot(
+        self,
+        model_name: str,
+        revision: Optional[str] = None,
+        full: bool = True,
+    ) -> list[str]:
+        """
+        Check a snapshot against its manifest.
+
+        With `full` every file is hashed; otherwise only files whose size
+        and modification time no longer match their verified stamp are.
+        Files that pass are stamped. Returns the relative paths of missing
+        or corrupted files; an empty list means the snapshot is intact.
+        """
+        manifest = self.manifest(model_name, revision)
+        if manifest is None:
+            raise ArtifactError(f"No local snapshot for '{model_name}'.")
+
+        base = self.model_dir(model_name, revision)
+        stamp_path = base / VERIFIED_NAME
+        stamps: dict[str, list[int]] = {}
+        if stamp_path.is_file():
+            with contextlib.suppress(ValueError):
+                stamps = json.loads(stamp_path.read_text())
+        verified: dict[str, list[int]] = {}
+        bad: list[str] = []
+        for rel, meta in manifest['files'].items():
+            path = base / rel
+            if not path.is_file() or path.stat().st_size != meta['size']:
+                bad.append(rel)
+                continue
+            stamp = _stamp(path)
+            if full or stamps.get(rel) != stamp:
+                if _sha256(path) != meta['sha256']:
+                    bad.append(rel)
+                    continue
+            verified[rel] = stamp
+        if verified != stamps:
+            # a read-only store still verifies, it just cannot cache it
+            with contextlib.suppress(OSError):
+                _write_atomic(stamp_path, json.dumps(verified))
+        return bad
+
+    def resolve(
+        self, model_name: str, revision: Optional[str] = None
+    ) -> Optional[Path]:
+        """
+        Return the local snapshot directory for `model_name`, if available.
+
+        Returns None when there is no snapshot and the store is online, so
+        callers fall back to the hub. Raises ArtifactError when the snapshot
+        fails verification, or when it is missing and the store is offline.
+        """
+        if self.manifest(model_name, revision) is None:
+            if self.offline:
+                raise ArtifactError(
+                    f"No local snapshot for '{model_name}' and "
+                    'MHAI_OFFLINE is set.'
+                )
+            return None
+
+        if self.verify:
+            bad = self.verify_snapshot(model_name, revision, full=False)
+            if bad:
+                raise ArtifactError(
+                    f"Snapshot of '{model_name}' failed verification: "
+                    + ', '.join(bad)
+                )
+        return self.model_dir(model_name, revision)
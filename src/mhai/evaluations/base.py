@@ -1,7 +1,86 @@
-"""Base class for text evaluators."""
+"""Base class and protocol for text evaluators."""
+
+import hashlib
+import json
 
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+from collections.abc import Sequence
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Optional, Protocol
+
+import numpy as np
+import numpy.typing as npt
+
+from .artifacts import MANIFEST_NAME, ArtifactStore, hash_files
+from .calibration import apply_temperature
+from .runtime import RuntimeConfig
+
+POOLING_MODES = ('mean', 'cls')
+
+# pipeline parameters that change where or how fast a model runs, not
+# its scores
+_RUNTIME_PARAMS = frozenset({'device', 'device_map', 'token', 'batch_size'})
+
+
+def digest(value: Any) -> str:
+    """Return a short, stable hash of a JSON-serializable value."""
+    text = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def pool_hidden_states(
+    hidden: npt.ArrayLike, mask: npt.ArrayLike, pooling: str = 'mean'
+) -> npt.NDArray[np.float32]:
+    """
+    Pool ``(batch, tokens, dim)`` hidden states into one vector per text.
+
+    ``mean`` averages the tokens the attention `mask` keeps; ``cls`` takes
+    the first token.
+    """
+    states = np.asarray(hidden, dtype=np.float32)
+    if pooling == 'cls':
+        return np.ascontiguousarray(states[:, 0, :], dtype=np.float32)
+    if pooling != 'mean':
+        raise ValueError(f'pooling must be one of {POOLING_MODES}.')
+    weights = np.asarray(mask, dtype=np.float32)[:, :, None]
+    total = (states * weights).sum(axis=1)
+    counts = np.maximum(weights.sum(axis=1), 1.0)
+    return np.asarray(total / counts, dtype=np.float32)
+
+
+class Evaluator(Protocol):
+    """
+    What pipelines, the CLI and provenance need from an evaluator.
+
+    Every ModelBase satisfies it; composite evaluators that own no model
+    of their own (e.g. ``CascadeEvaluator``) implement it directly.
+    """
+
+    model_name: str
+    column_prefix: str
+    languages: Optional[tuple[str, ...]]
+    default_batch_size: int
+
+    def evaluate(self, text: str) -> Any:
+        """Run inference on `text` and return the result."""
+
+    def evaluate_batch(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> list[Any]:
+        """Run inference on every text, returning one result per text."""
+
+    def to_columns(self, result: Any) -> dict[str, Any]:
+        """Flatten one evaluation result into prefixed output columns."""
+
+    def provenance(self) -> dict[str, Any]:
+        """Return what determines this evaluator's scores."""
+
+    def output_prefixes(self) -> tuple[str, ...]:
+        """Return the prefixes of the columns ``to_columns`` writes."""
+
+    def set_threads(self, threads: Optional[int]) -> None:
+        """Change the intra-op thread budget of later inference calls."""
 
 
 class ModelBase(ABC):
@@ -11,11 +90,41 @@ class ModelBase(ABC):
     Manages default parameters and requires subclasses to implement:
       - _load_model()
       - evaluate(text)
+
+    Subclasses backed by a batched pipeline should also override
+    evaluate_batch(texts); the default falls back to one call per text.
+
+    Scores are calibrated on logits: ``temperature`` divides them and the
+    optional ``label_bias`` is added before the softmax (or the sigmoid for
+    multi-label models). A temperature of 1 with no bias leaves the model's
+    own probabilities unchanged.
+
+    ``languages`` lists the language codes the model is meant for (``und``
+    covers texts too short to tell); routed pipelines skip other texts.
+    ``None`` means the model is multilingual.
+
+    ``runtime`` sets the device (resolved automatically unless given in
+    ``api_params``), the thread budget and the inference mode; by default
+    it is read from ``MHAI_*`` environment variables.
+
+    ``provenance`` describes what determines the scores (class, model,
+    revision and scoring parameters), so stored results can be checked for
+    staleness (see ``mhai.provenance``).
+
+    ``embed`` returns pooled hidden states of the backbone the evaluator
+    already loaded, for similarity search (see ``mhai.embeddings``).
+
+    When the artifact store holds a verified snapshot of the model, it is
+    loaded from there (memory-mapped safetensors, no hub access); otherwise
+    the model is resolved through the Hugging Face hub as usual.
     """
 
     default_model_name: str
-    default_temperature: float = 0.5
+    default_temperature: float = 1.0
     default_output_max_length: int = 500
+    default_batch_size: int = 32
+    column_prefix: str = ''
+    languages: Optional[tuple[str, ...]] = ('en', 'und')
 
     def __init__(
         self,
@@ -24,6 +133,10 @@ class ModelBase(ABC):
         temperature: Optional[float] = None,
         output_max_length: Optional[int] = None,
         api_params: Optional[dict[str, Any]] = None,
+        revision: Optional[str] = None,
+        artifacts: Optional[ArtifactStore] = None,
+        label_bias: Optional[dict[str, float]] = None,
+        runtime: Optional[RuntimeConfig] = None,
     ) -> None:
         self.model_name = model_name or self.default_model_name
         self.token = token
@@ -32,13 +145,115 @@ class ModelBase(ABC):
             if temperature is not None
             else self.default_temperature
         )
+        if self.temperature <= 0:
+            raise ValueError('temperature must be positive.')
+        self.label_bias = label_bias
         self.output_max_length = (
             output_max_length
             if output_max_length is not None
             else self.default_output_max_length
         )
         self.api_params = api_params or {}
-        self._model = self._load_model()
+        self.revision = revision
+        self.artifacts = (
+            artifacts if artifacts is not None else ArtifactStore.from_env()
+        )
+        self.local_path = self.artifacts.resolve(
+            self.model_name, self.revision
+        )
+        self.runtime = runtime or RuntimeConfig.from_env()
+        self._dir_hash: Optional[str] = None
+        self._model = self.runtime.prepare(self._load_model())
+
+    @property
+    def model_source(self) -> str:
+        """Return the local snapshot path if available, else the hub id."""
+        if self.local_path is not None:
+            return str(self.local_path)
+        return self.model_name
+
+    def pipeline_params(self) -> dict[str, Any]:
+        """
+        Return keyword arguments for the underlying pipeline factory.
+
+        The device comes from ``runtime`` unless ``api_params`` sets it.
+        Local snapshots are loaded offline from safetensors; hub models get
+        the configured token and revision.
+        """
+        params = dict(self.api_params)
+        if 'device' not in params and 'device_map' not in params:
+            params['device'] = self.runtime.resolve_device()
+        if self.local_path is not None:
+            model_kwargs = dict(params.get('model_kwargs') or {})
+            model_kwargs.setdefault('use_safetensors', True)
+            model_kwargs.setdefault('local_files_only', True)
+            params['model_kwargs'] = model_kwargs
+            return params
+        if self.token is not None:
+            params.setdefault('token', self.token)
+        if self.revision is not None:
+            params.setdefault('revision', self.revision)
+        return params
+
+    @property
+    def revision_hash(self) -> Optional[str]:
+        """
+        Return the revision the loaded weights come from.
+
+        Local snapshots are identified by a hash of their file checksums,
+        and so are models loaded from a directory outside the store (hashed
+        once, on first use). Hub models are identified by the commit hash
+        transformers resolved, falling back to the requested revision.
+        """
+        if self.local_path is not None:
+            manifest = json.loads(
+                (self.local_path / MANIFEST_NAME).read_text()
+            )
+            return digest(manifest['files'])
+        if Path(self.model_name).is_dir():
+            if self._dir_hash is None:
+                self._dir_hash = digest(hash_files(self.model_name))
+            return self._dir_hash
+        model = getattr(self._model, 'model', None)
+        commit = getattr(getattr(model, 'config', None), '_commit_hash', None)
+        return commit if isinstance(commit, str) else self.revision
+
+    def scoring_params(self) -> dict[str, Any]:
+        """Return the parameters that affect the scores, not the runtime."""
+        return {
+            'temperature': self.temperature,
+            'label_bias': self.label_bias,
+            'output_max_length': self.output_max_length,
+            'api_params': {
+                key: value
+                for key, value in self.api_params.items()
+                if key not in _RUNTIME_PARAMS
+            },
+        }
+
+    def provenance(self) -> dict[str, Any]:
+        """
+        Return what determines this evaluator's scores.
+
+        The evaluator class, the model name, the revision hash and a hash
+        of ``scoring_params``; results stored with a different provenance
+        are stale.
+        """
+        cls = type(self)
+        return {
+            'evaluator': f'{cls.__module__}.{cls.__qualname__}',
+            'model_name': self.model_name,
+            'revision': self.revision_hash,
+            'params_hash': digest(self.scoring_params()),
+        }
+
+    def output_prefixes(self) -> tuple[str, ...]:
+        """Return the prefixes of the columns ``to_columns`` writes."""
+        return (f'{self.column_prefix}_',) if self.column_prefix else ()
+
+    def set_threads(self, threads: Optional[int]) -> None:
+        """Change the intra-op thread budget of later inference calls."""
+        self.runtime = replace(self.runtime, threads=threads)
 
     @abstractmethod
     def _load_model(self) -> Any:
@@ -49,3 +264,142 @@ class ModelBase(ABC):
     def evaluate(self, text: str) -> Any:
         """Run inference on `text` and return the result."""
         ...
+
+    def evaluate_batch(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> list[Any]:
+        """Run inference on every text, returning one result per text."""
+        return [self.evaluate(text) for text in texts]
+
+    def _hidden_states(
+        self, texts: Sequence[str]
+    ) -> tuple[npt.NDArray[np.float32], npt.NDArray[np.bool_]]:
+        """Return the last hidden layer and attention mask of one batch."""
+        tokenizer = self._model.tokenizer
+        model = self._model.model
+        encoded = tokenizer(
+            list(texts), padding=True, truncation=True, return_tensors='pt'
+        ).to(model.device)
+        with self.runtime.session():
+            output = model(**encoded, output_hidden_states=True)
+        hidden = output.hidden_states[-1].float().cpu().numpy()
+        mask = encoded['attention_mask'].cpu().numpy().astype(bool)
+        return hidden, mask
+
+    def embed(
+        self,
+        texts: Sequence[str],
+        batch_size: Optional[int] = None,
+        pooling: str = 'mean',
+        normalize: bool = True,
+    ) -> npt.NDArray[np.float32]:
+        """
+        Return a ``(n_texts, dim)`` matrix of text embeddings.
+
+        Hidden states of the last layer are pooled per text (see
+        ``pool_hidden_states``) and, with `normalize`, scaled to unit
+        length so inner products are cosine similarities.
+        """
+        if pooling not in POOLING_MODES:
+            raise ValueError(f'pooling must be one of {POOLING_MODES}.')
+        size = batch_size or self.default_batch_size
+        chunks = []
+        for start in range(0, len(texts), size):
+            hidden, mask = self._hidden_states(texts[start : start + size])
+            chunks.append(pool_hidden_states(hidden, mask, pooling))
+        if not chunks:
+            dim = self._model.model.config.hidden_size
+            return np.zeros((0, dim), dtype=np.float32)
+        vectors = np.concatenate(chunks)
+        if normalize:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.maximum(norms, 1e-12)
+        return vectors
+
+    @property
+    def multi_label(self) -> bool:
+        """Return True if labels are scored independently (sigmoid)."""
+        config = self._model.model.config
+        return bool(
+            config.problem_type == 'multi_label_classification'
+            or config.num_labels == 1
+        )
+
+    def predict_logits(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> tuple[list[str], npt.NDArray[np.float64]]:
+        """
+        Return the label names and a ``(n_texts, n_labels)`` logit matrix.
+
+        Runs the text-classification pipeline in batches with no output
+        activation; columns follow the model's ``id2label`` order.
+        """
+        id2label = self._model.model.config.id2label
+        labels = [id2label[i] for i in sorted(id2label)]
+        column = {label: i for i, label in enumerate(labels)}
+        logits = np.zeros((len(texts), len(labels)), dtype=np.float64)
+        if not texts:
+            return labels, logits
+
+        with self.runtime.session():
+            raw = self._model(
+                list(texts),
+                batch_size=batch_size or self.default_batch_size,
+                top_k=None,
+                function_to_apply='none',
+            )
+        for row, entries in enumerate(raw):
+            for entry in entries:
+                logits[row, column[entry['label']]] = entry['score']
+        return labels, logits
+
+    def calibrate(
+        self, labels: Sequence[str], logits: npt.ArrayLike
+    ) -> npt.NDArray[np.float64]:
+        """Turn a batch of logits into calibrated probabilities."""
+        bias = None
+        if self.label_bias:
+            bias = [self.label_bias.get(label, 0.0) for label in labels]
+        return apply_temperature(
+            logits, self.temperature, bias, multi_label=self.multi_label
+        )
+
+    def predict_proba(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> tuple[list[str], npt.NDArray[np.float64]]:
+        """Return the label names and calibrated probabilities per text."""
+        labels, logits = self.predict_logits(texts, batch_size=batch_size)
+        return labels, self.calibrate(labels, logits)
+
+    def ranked_scores(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> list[dict[str, float]]:
+        """Return calibrated label→score mappings, highest score first."""
+        labels, probs = self.predict_proba(texts, batch_size=batch_size)
+        order = np.argsort(-probs, axis=1, kind='stable')
+        return [
+            {labels[j]: float(row[j]) for j in idx}
+            for row, idx in zip(probs, order)
+        ]
+
+    def to_columns(self, result: Any) -> dict[str, Any]:
+        """
+        Flatten one evaluation result into prefixed output columns.
+
+        Handles the result shapes evaluators return: a ``label``/``score``
+        dict, a label→score mapping, or a list of label-score dicts.
+        """
+        prefix = f'{self.column_prefix}_' if self.column_prefix else ''
+        if isinstance(result, list) and result and isinstance(result[0], list):
+            result = result[0]
+        if isinstance(result, dict) and set(result) == {'label', 'score'}:
+            return {
+                f'{prefix}label': result['label'],
+                f'{prefix}score': result['score'],
+            }
+        if isinstance(result, list):
+            result = {entry['label']: entry['score'] for entry in result}
+        return {
+            f'{prefix}{label}'.lower(): score
+            for label, score in result.items()
+        }
@@ -0,0 +1,226 @@
+"""
+Score calibration module.
+
+Defines:
+- apply_temperature: calibrated probabilities from a batch of logits
+- fit_temperature: learn a temperature (and optional per-label bias)
+- fit_from_csv: fit and apply calibration for an evaluator from a CSV
+- Calibration: fitted parameters
+
+Calibration divides logits by a temperature and adds a per-label bias
+before the softmax (single-label models) or sigmoid (multi-label models).
+The negative log-likelihood is convex in ``(1 / temperature, bias)``, so a
+plain gradient descent with backtracking line search finds the optimum.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+if TYPE_CHECKING:
+    from .base import ModelBase
+
+FloatArray = npt.NDArray[np.float64]
+
+_EPS = 1e-12
+
+
+def softmax(z: FloatArray) -> FloatArray:
+    """Return the row-wise softmax of `z`."""
+    z = z - z.max(axis=-1, keepdims=True)
+    e = np.exp(z)
+    out: FloatArray = e / e.sum(axis=-1, keepdims=True)
+    return out
+
+
+def sigmoid(z: FloatArray) -> FloatArray:
+    """Return the element-wise logistic sigmoid of `z`."""
+    out: FloatArray = 0.5 * (1.0 + np.tanh(0.5 * z))
+    return out
+
+
+def apply_temperature(
+    logits: npt.ArrayLike,
+    temperature: float = 1.0,
+    bias: Optional[npt.ArrayLike] = None,
+    multi_label: bool = False,
+) -> FloatArray:
+    """
+    Return calibrated probabilities for a ``(n_texts, n_labels)`` batch.
+
+    ``p = softmax(logits / temperature + bias)``, or the sigmoid for
+    multi-label models.
+    """
+    if temperature <= 0:
+        raise ValueError('temperature must be positive.')
+    z = np.asarray(logits, dtype=np.float64) / temperature
+    if bias is not None:
+        z = z + np.asarray(bias, dtype=np.float64)
+    return sigmoid(z) if multi_label else softmax(z)
+
+
+@dataclass
+class Calibration:
+    """Fitted calibration parameters."""
+
+    temperature: float
+    bias: FloatArray
+    labels: list[str] = field(default_factory=list)
+    nll_before: float = float('nan')
+    nll_after: float = float('nan')
+
+    def label_bias(self) -> dict[str, float]:
+        """Return the bias as a label→value mapping."""
+        return {
+            label: float(value) for label, value in zip(self.labels, self.bias)
+        }
+
+
+def _nll(
+    logits: FloatArray,
+    targets: FloatArray,
+    scale: float,
+    bias: FloatArray,
+    multi_label: bool,
+) -> tuple[float, FloatArray]:
+    """Return the mean NLL and its gradient w.r.t. ``z = scale*l + bias``."""
+    z = logits * scale + bias
+    n = logits.shape[0]
+    if multi_label:
+        p = sigmoid(z)
+        loss = -(
+            targets * np.log(p + _EPS) + (1 - targets) * np.log(1 - p + _EPS)
+        ).sum()
+    else:
+        p = softmax(z)
+        loss = -(targets * np.log(p + _EPS)).sum()
+    return float(loss / n), (p - targets) / n
+
+
+def fit_temperature(
+    logits: npt.ArrayLike,
+    labels: npt.ArrayLike,
+    multi_label: bool = False,
+    fit_bias: bool = False,
+    max_iter: int = 500,
+    tol: float = 1e-7,
+) -> Calibration:
+    """
+    Learn a temperature (and optionally a per-label bias) from labels.
+
+    `labels` are class indices of shape ``(n,)`` for single-label models, or
+    a binary matrix of shape ``(n, n_labels)`` for single- or multi-label
+    targets. All computation is vectorized over the whole set.
+    """
+    x = np.asarray(logits, dtype=np.float64)
+    y = np.asarray(labels)
+    if y.ndim == 1:
+        if multi_label:
+            raise ValueError('multi-label targets must be a binary matrix.')
+        targets = np.zeros_like(x)
+        targets[np.arange(x.shape[0]), y.astype(np.int64)] = 1.0
+    else:
+        targets = y.astype(np.float64)
+    if targets.shape != x.shape:
+        raise ValueError('labels do not match the shape of logits.')
+
+    scale = 1.0
+    bias = np.zeros(x.shape[1])
+    loss, grad_z = _nll(x, targets, scale, bias, multi_label)
+    nll_before = loss
+
+    step = 1.0
+    for _ in range(max_iter):
+        grad_scale = float((grad_z * x).sum())
+        grad_bias = grad_z.sum(axis=0) if fit_bias else np.zeros_like(bias)
+        norm = grad_scale**2 + float((grad_bias**2).sum())
+        if norm < tol**2:
+            break
+
+        # backtracking line search, keeping the temperature positive
+        step = min(step * 2.0, 1e3)
+        while step > 1e-12:
+            new_scale = scale - step * grad_scale
+            new_bias = bias - step * grad_bias
+            if new_scale > 0:
+                new_loss, new_grad = _nll(
+                    x, targets, new_scale, new_bias, multi_label
+                )
+                if new_loss <= loss - 0.5 * step * norm:
+                    break
+            step *= 0.5
+        else:
+            break
+
+        improvement = loss - new_loss
+        scale, bias, loss, grad_z = new_scale, new_bias, new_loss, new_grad
+        if improvement < tol:
+            break
+
+    return Calibration(
+        temperature=1.0 / scale,
+        bias=bias,
+        nll_before=nll_before,
+        nll_after=loss,
+    )
+
+
+def fit_from_csv(
+    evaluator: ModelBase,
+    path: Union[str, Path],
+    text_column: str = 'text',
+    label_column: str = 'label',
+    separator: str = ';',
+    fit_bias: bool = False,
+    batch_size: Optional[int] = None,
+) -> Calibration:
+    """
+    Fit calibration for `evaluator` from a labeled CSV and apply it.
+
+    Each row holds a text and its gold label name; for multi-label models
+    the label column lists every gold label joined by `separator`. Rows
+    without a text or a gold label are skipped. The evaluator's
+    ``temperature`` and ``label_bias`` are updated in place.
+    """
+    # no NA parsing: 'None' is a MentBERT label, only empty cells are unset
+    frame = pd.read_csv(
+        path,
+        usecols=[text_column, label_column],
+        dtype=str,
+        keep_default_na=False,
+    )
+    # unlabeled rows would become all-zero targets and bias the fit
+    frame = frame[
+        (frame[text_column] != '') & (frame[label_column].str.strip() != '')
+    ]
+    texts: Sequence[str] = frame[text_column].tolist()
+
+    names, logits = evaluator.predict_logits(texts, batch_size=batch_size)
+    position = {name: i for i, name in enumerate(names)}
+    targets = np.zeros_like(logits)
+    for row, value in enumerate(frame[label_column]):
+        gold: list[Any] = (
+            str(value).split(separator) if evaluator.multi_label else [value]
+        )
+        for label in gold:
+            label = str(label).strip()
+            if not label:
+                continue
+            if label not in position:
+                raise ValueError(f"Unknown label '{label}' in {path}.")
+            targets[row, position[label]] = 1.0
+
+    calibration = fit_temperature(
+        logits, targets, multi_label=evaluator.multi_label, fit_bias=fit_bias
+    )
+    calibration.labels = list(names)
+    evaluator.temperature = calibration.temperature
+    evaluator.label_bias = calibration.label_bias() if fit_bias else None
+    return calibration
@@ -0,0 +1,321 @@
+"""
+Cascade evaluation module.
+
+Runs a cheap gate model on every text and the expensive experts only on
+texts the gate finds risky or is unsure about. On timelines where most
+posts are clearly neutral, most expert calls are skipped.
+
+Defines:
+- top_label: the highest-scoring label of any evaluator result
+- CascadeStats: running counts of gated and forwarded texts
+- CascadeEvaluator: gate → experts evaluator with agreement reporting
+- default_cascade: SentimentEvaluator → MentBERT and GoEmotions
+"""
+
+from __future__ import annotations
+
+import threading
+
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from .base import Evaluator, ModelBase, digest
+from .runtime import RuntimeConfig
+
+
+def top_label(result: Any) -> str:
+    """
+    Return the highest-scoring label of an evaluator result.
+
+    Accepts a ``label``/``score`` dict, a label→score mapping or a list of
+    label-score dicts.
+    """
+    if isinstance(result, list) and result and isinstance(result[0], list):
+        result = result[0]
+    if isinstance(result, dict) and set(result) == {'label', 'score'}:
+        return str(result['label'])
+    if isinstance(result, list):
+        result = {entry['label']: entry['score'] for entry in result}
+    return str(max(result, key=result.get))
+
+
+@dataclass
+class CascadeStats:
+    """Running counts of texts seen by the gate and sent to experts."""
+
+    texts: int = 0
+    forwarded: int = 0
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def add(self, texts: int, forwarded: int) -> None:
+        """Record one gated batch."""
+        with self._lock:
+            self.texts += texts
+            self.forwarded += forwarded
+
+    @property
+    def forwarded_fraction(self) -> float:
+        """Return the share of texts sent to the experts."""
+        return self.forwarded / self.texts if self.texts else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters as a plain dict."""
+        return {
+            'texts': self.texts,
+            'forwarded': self.forwarded,
+            'forwarded_fraction': round(self.forwarded_fraction, 4),
+        }
+
+
+class CascadeEvaluator:
+    """
+    Gate → experts cascade.
+
+    The `gate` scores every text. A text is forwarded to every expert when
+    the gate's probability of `risk_labels` reaches `risk_threshold`, or
+    when the gate is uncertain (``1 - max probability`` reaches
+    `uncertainty_threshold`). Results carry the gate output, the risk,
+    the routing decision and the expert results (``None`` when skipped);
+    ``to_columns`` flattens them with each model's own columns, leaving
+    expert columns empty for skipped texts.
+
+    `skipped_labels` gives, per expert, the label a skipped text is
+    assumed to have (e.g. ``'neutral'``); ``agreement`` uses it to compare
+    the cascade with running every expert on every text.
+
+    The cascade owns no model, so it is not a ModelBase: it implements the
+    ``Evaluator`` protocol by delegating to the gate and the experts.
+    """
+
+    column_prefix = 'cascade'
+    default_batch_size = 32
+
+    def __init__(
+        self,
+        gate: ModelBase,
+        experts: Sequence[Evaluator],
+        risk_labels: Sequence[str] = ('NEGATIVE',),
+        risk_threshold: float = 0.5,
+        uncertainty_threshold: float = 0.35,
+        skipped_labels: Optional[Sequence[Optional[str]]] = None,
+    ) -> None:
+        if not 0.0 <= risk_threshold <= 1.0:
+            raise ValueError('risk_threshold must be in [0, 1].')
+        if not 0.0 <= uncertainty_threshold <= 1.0:
+            raise ValueError('uncertainty_threshold must be in [0, 1].')
+        if skipped_labels is not None and len(skipped_labels) != len(experts):
+            raise ValueError('skipped_labels needs one entry per expert.')
+        self.gate = gate
+        self.experts = list(experts)
+        self.risk_labels = tuple(risk_labels)
+        self.risk_threshold = risk_threshold
+        self.uncertainty_threshold = uncertainty_threshold
+        self.skipped_labels = list(skipped_labels or [None] * len(experts))
+        self.model_name = '>'.join(
+            m.model_name for m in [self.gate, *self.experts]
+        )
+        self.languages = gate.languages
+        self.stats = CascadeStats()
+
+    def provenance(self) -> dict[str, Any]:
+        """Combine the provenance of every model with the thresholds."""
+        models = [m.provenance() for m in [self.gate, *self.experts]]
+        return {
+            'evaluator': f'{type(self).__module__}.{type(self).__qualname__}',
+            'model_name': self.model_name,
+            'revision': '>'.join(str(m['revision']) for m in models),
+            'params_hash': digest(
+                {
+                    'models': models,
+                    'risk_labels': self.risk_labels,
+                    'risk_threshold': self.risk_threshold,
+                    'uncertainty_threshold': self.uncertainty_threshold,
+                    'skipped_labels': self.skipped_labels,
+                }
+            ),
+        }
+
+    def output_prefixes(self) -> tuple[str, ...]:
+        """Return the gate, cascade and expert column prefixes."""
+        prefixes = [*self.gate.output_prefixes(), f'{self.column_prefix}_']
+        for expert in self.experts:
+            prefixes += expert.output_prefixes()
+        return tuple(prefixes)
+
+    def set_threads(self, threads: Optional[int]) -> None:
+        """Give the gate and every expert the thread budget."""
+        for model in [self.gate, *self.experts]:
+            model.set_threads(threads)
+
+    def route(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> tuple[list[dict[str, Any]], npt.NDArray[np.bool_], npt.NDArray[Any]]:
+        """
+        Run the gate and return its results, the forward mask and risks.
+
+        Gate results are ``label``/``score`` dicts of the top label.
+        """
+        labels, probs = self.gate.predict_proba(texts, batch_size=batch_size)
+        risky = [
+            i for i, label in enumerate(labels) if label in self.risk_labels
+        ]
+        if not risky:
+            raise ValueError(
+                f'None of {list(self.risk_labels)} is a gate label: {labels}.'
+            )
+        risk = probs[:, risky].sum(axis=1)
+        top = probs.argmax(axis=1)
+        confidence = probs[np.arange(len(texts)), top]
+        forward = (risk >= self.risk_threshold) | (
+            1.0 - confidence >= self.uncertainty_threshold
+        )
+        gate_results = [
+            {'label': labels[j], 'score': float(p)}
+            for j, p in zip(top, confidence)
+        ]
+        return gate_results, forward, risk
+
+    def evaluate(self, text: str) -> dict[str, Any]:
+        """Run the cascade on `text`."""
+        return self.evaluate_batch([text])[0]
+
+    def evaluate_batch(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> list[dict[str, Any]]:
+        """Run the gate on every text and the experts on forwarded ones."""
+        gate_results, forward, risk = self.route(texts, batch_size)
+        chosen: list[int] = np.flatnonzero(forward).tolist()
+        subset = [texts[i] for i in chosen]
+        outputs: list[list[Any]] = [[None] * len(texts) for _ in self.experts]
+        if subset:
+            for k, expert in enumerate(self.experts):
+                for i, result in zip(
+                    chosen, expert.evaluate_batch(subset, batch_size)
+                ):
+                    outputs[k][i] = result
+        self.stats.add(len(texts), len(chosen))
+        return [
+            {
+                'gate': gate_results[i],
+                'risk': float(risk[i]),
+                'forwarded': bool(forward[i]),
+                'experts': [out[i] for out in outputs],
+            }
+            for i in range(len(texts))
+        ]
+
+    def to_columns(self, result: Any) -> dict[str, Any]:
+        """Flatten a cascade result into gate, routing and expert columns."""
+        columns = self.gate.to_columns(result['gate'])
+        columns['cascade_risk'] = round(result['risk'], 4)
+        columns['cascade_forwarded'] = result['forwarded']
+        for expert, output in zip(self.experts, result['experts']):
+            if output is not None:
+                columns.update(expert.to_columns(output))
+        return columns
+
+    def agreement(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> dict[str, Any]:
+        """
+        Compare the cascade with running every expert on every text.
+
+        For each expert, forwarded texts get the expert's own top label
+        and skipped texts its skipped label (by default the most common
+        top label of the full run). Reports the share of texts where that
+        matches the full run, and the texts the gate skipped although the
+        expert would not have labeled them as skipped (``missed``).
+        Without texts no model runs and every count is zero.
+        """
+        if not texts:
+            return {
+                'texts': 0,
+                'forwarded': 0,
+                'forwarded_fraction': 0.0,
+                'experts': [
+                    {
+                        'expert': type(expert).__name__,
+                        'skipped_label': skipped,
+                        'agreement': 1.0,
+                        'flagged': 0,
+                        'missed': 0,
+                        'recall': 1.0,
+                    }
+                    for expert, skipped in zip(
+                        self.experts, self.skipped_labels
+                    )
+                ],
+            }
+        _, forward, _ = self.route(texts, batch_size)
+        report: dict[str, Any] = {
+            'texts': len(texts),
+            'forwarded': int(forward.sum()),
+            'forwarded_fraction': float(forward.mean()),
+            'experts': [],
+        }
+        for expert, skipped in zip(self.experts, self.skipped_labels):
+            full = np.asarray(
+                [
+                    top_label(r)
+                    for r in expert.evaluate_batch(texts, batch_size)
+                ]
+            )
+            if skipped is None:
+                skipped = Counter(full.tolist()).most_common(1)[0][0]
+            cascade = np.where(forward, full, skipped)
+            flagged = full != skipped
+            missed = int((flagged & ~forward).sum())
+            report['experts'].append(
+                {
+                    'expert': type(expert).__name__,
+                    'skipped_label': skipped,
+                    'agreement': float((cascade == full).mean()),
+                    'flagged': int(flagged.sum()),
+                    'missed': missed,
+                    'recall': (
+                        1.0 - missed / flagged.sum() if flagged.any() else 1.0
+                    ),
+                }
+            )
+        return report
+
+
+def default_cascade(
+    runtime: Optional[RuntimeConfig] = None,
+    model_name: Optional[str] = None,
+    **kwargs: Any,
+) -> CascadeEvaluator:
+    """
+    Return the default cascade.
+
+    SentimentEvaluator gates MentBERTClassifier and MentalEvaluator;
+    skipped texts are taken as ``None`` (mentBERT) and ``neutral``
+    (GoEmotions). Every model gets `runtime`; other keyword arguments go
+    to CascadeEvaluator. The cascade has no single model, so `model_name`
+    is rejected; build a CascadeEvaluator to use other models.
+    """
+    if model_name is not None:
+        raise ValueError(
+            'The cascade combines several models and takes no model name; '
+            'build a CascadeEvaluator from evaluators to change them.'
+        )
+    from .mapping_membert import MentBERTClassifier
+    from .mental import MentalEvaluator
+    from .sentiment import SentimentEvaluator
+
+    kwargs.setdefault('skipped_labels', ['None', 'neutral'])
+    return CascadeEvaluator(
+        SentimentEvaluator(runtime=runtime),
+        [
+            MentBERTClassifier(runtime=runtime),
+            MentalEvaluator(runtime=runtime),
+        ],
+        **kwargs,
+    )
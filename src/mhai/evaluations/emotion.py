@@ -6,7 +6,8 @@ Defines:
 - EmotionEvaluator: wrapper that returns all detected emotions and scores
 """
 
-from typing import Any
+from collections.abc import Sequence
+from typing import Any, Optional
 
 from transformers import pipeline  # type: ignore[attr-defined]
 
@@ -37,13 +38,25 @@ class EmotionEvaluator(ModelBase):
     """
 
     default_model_name = 'j-hartmann/emotion-english-distilroberta-base'
-    default_temperature = 0.0
+    default_temperature = 1.0
     default_output_max_length = 6
+    column_prefix = 'emotion'
 
     def _load_model(self) -> Any:
         """Instantiate the emotion pipeline."""
-        return get_emotion_pipeline(self.model_name, **self.api_params)
+        return get_emotion_pipeline(
+            self.model_source, **self.pipeline_params()
+        )
 
     def evaluate(self, text: str) -> Any:
         """Evaluate text emotions and return list of label-score dicts."""
-        return self._model(text)
+        return self.evaluate_batch([text])[0]
+
+    def evaluate_batch(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> list[Any]:
+        """Evaluate emotions of many texts in batched pipeline calls."""
+        return [
+            [{'label': label, 'score': score} for label, score in row.items()]
+            for row in self.ranked_scores(texts, batch_size=batch_size)
+        ]
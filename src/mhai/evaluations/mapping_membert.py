@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import ClassVar
+from typing import Any, ClassVar
 
 from mhai.evaluations.mental import MentalEvaluator
 
@@ -17,6 +17,8 @@ class MentBERTClassifier(MentalEvaluator):
     health categories.
     """
 
+    default_model_name = 'reab5555/mentBERT'
+
     MENTBERT_TO_CORE: ClassVar[dict[str, str]] = {
         'Anxiety': 'anxiety',  # Classic anxiety symptoms
         'Depression': 'depression',  # Sadness, low energy
@@ -31,11 +33,6 @@ class MentBERTClassifier(MentalEvaluator):
         'None': 'none',  # No apparent mental condition
     }
 
-    def __init__(self) -> None:
-        super().__init__(
-            api_params={'device': 0}, model_name='reab5555/mentBERT'
-        )
-
     def map_to_core_categories(
         self, raw_scores: dict[str, float]
     ) -> dict[str, float]:
@@ -49,3 +46,14 @@ class MentBERTClassifier(MentalEvaluator):
             core = self.MENTBERT_TO_CORE.get(label, 'unknown')
             output[core] = output.get(core, 0.0) + score
         return dict(sorted(output.items(), key=lambda x: x[1], reverse=True))
+
+    def output_prefixes(self) -> tuple[str, ...]:
+        """Return the prefix of the ``core_<category>`` columns."""
+        return ('core_',)
+
+    def to_columns(self, result: Any) -> dict[str, Any]:
+        """Flatten raw mentBERT scores into ``core_<category>`` columns."""
+        return {
+            f'core_{core}': score
+            for core, score in self.map_to_core_categories(result).items()
+        }
@@ -6,7 +6,8 @@ Defines:
 - MentalEvaluator: wrapper that returns all detected emotions and scores
 """
 
-from typing import Any
+from collections.abc import Sequence
+from typing import Any, Optional
 
 from transformers import pipeline  # type: ignore[attr-defined]
 
@@ -29,11 +30,12 @@ class MentalEvaluator(ModelBase):
     """Detects emotions/mental states from text (GoEmotions model)."""
 
     default_model_name = 'SamLowe/roberta-base-go_emotions'
-    default_temperature = 0.0
+    default_temperature = 1.0
     default_output_max_length = 6
+    column_prefix = 'mental'
 
     def _load_model(self) -> Any:
-        return get_mental_pipeline(self.model_name, **self.api_params)
+        return get_mental_pipeline(self.model_source, **self.pipeline_params())
 
     def evaluate(self, text: str) -> dict[str, float]:
         """
@@ -41,11 +43,10 @@ class MentalEvaluator(ModelBase):
 
         Returns a mapping of label→score.
         """
-        raw = self._model(text)
+        return self.evaluate_batch([text])[0]
 
-        if isinstance(raw, list) and raw and isinstance(raw[0], list):
-            raw = raw[0]
-
-        # best = max(raw, key=lambda x: x["score"])
-
-        return {entry['label']: entry['score'] for entry in raw}
+    def evaluate_batch(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> list[dict[str, float]]:
+        """Run mental-state detection on many texts in batched calls."""
+        return self.ranked_scores(texts, batch_size=batch_size)
@@ -6,21 +6,25 @@ Detects mental health conditions from text using MentBERT.
 
 import os
 
-from typing import Any
+from collections.abc import Sequence
+from typing import Any, Optional
 
 from transformers import pipeline  # type: ignore[attr-defined]
 
 from .base import ModelBase
 
-access_token = os.getenv('HUGGINGFACE_TOKEN')
-
 
 def get_mentbert_pipeline(model_name: str, **kwargs: Any) -> Any:
-    """Load a Hugging Face MentBERT pipeline for text classification."""
+    """
+    Load a Hugging Face MentBERT pipeline for text classification.
+
+    The access token falls back to ``HUGGINGFACE_TOKEN``, read at call time
+    so importing this module never touches the environment.
+    """
+    kwargs.setdefault('token', os.getenv('HUGGINGFACE_TOKEN'))
     return pipeline(
         task='text-classification',
         model=model_name,
-        token=access_token,
         top_k=None,  # returns all labels
         **kwargs,
     )
@@ -34,22 +38,24 @@ class MentBERTMentalHealthEvaluator(ModelBase):
     """
 
     default_model_name = 'mental/mental-bert-base-uncased'
-    default_temperature = 0.0
+    default_temperature = 1.0
     default_output_max_length = 8
+    column_prefix = 'mentbert'
 
     def _load_model(self) -> Any:
-        return get_mentbert_pipeline(self.model_name, **self.api_params)
+        return get_mentbert_pipeline(
+            self.model_source, **self.pipeline_params()
+        )
 
     def evaluate(self, text: str) -> dict[str, float]:
         """Run mental health classification on `text`."""
-        raw = self._model(text)
-
-        # Support single-item output format (list of dicts)
-        if (
-            isinstance(raw, list)
-            and len(raw) == 1
-            and isinstance(raw[0], list)
-        ):
-            raw = raw[0]
-
-        return {entry['label']: round(entry['score'], 4) for entry in raw}
+        return self.evaluate_batch([text])[0]
+
+    def evaluate_batch(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> list[dict[str, float]]:
+        """Run mental health classification on many texts in batches."""
+        return [
+            {label: round(score, 4) for label, score in row.items()}
+            for row in self.ranked_scores(texts, batch_size=batch_size)
+        ]
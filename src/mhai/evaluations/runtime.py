@@ -0,0 +1,192 @@
+"""
+Torch runtime configuration for evaluators.
+
+Defines:
+- RuntimeConfig: device, thread budget and inference options of a model
+- split_threads: share the CPU cores between concurrent evaluators
+
+Every evaluator owns a RuntimeConfig (by default read from the
+environment). The device is resolved once, when the pipeline is built;
+``torch.inference_mode`` is applied around each inference call. The
+thread budget is applied once per thread, on its first inference call
+(e.g. when a pipeline stage worker starts), and never restored.
+
+The torch intra-op and BLAS thread budgets are process-wide, not per
+evaluator (OpenMP builds also keep them per calling thread): evaluators
+sharing a process are not isolated from each other and the last budget
+applied wins. ``mhai score`` runs every evaluator stage in one process,
+its ``--workers`` being threads of a stage, so it splits the cores
+between evaluators and workers to make any of the budgets a sensible
+process-wide setting. Strictly separate budgets need separate
+processes, e.g. one ``mhai score`` run per evaluator.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import threading
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from mhai.utils import env_flag
+
+DEVICE_AUTO = 'auto'
+
+_interop_lock = threading.Lock()
+_interop_threads: Optional[int] = None
+_applied = threading.local()
+
+
+def _torch() -> Any:
+    """Return the torch module, or None when it is not installed."""
+    try:
+        import torch
+    except ImportError:
+        return None
+    return torch
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    if not value:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(
+            f'{name} must be an integer, got {value!r}.'
+        ) from None
+    if number < 1:
+        raise ValueError(f'{name} must be at least 1, got {number}.')
+    return number
+
+
+def split_threads(count: int, total: Optional[int] = None) -> list[int]:
+    """
+    Split `total` cores (default: all) between `count` evaluators.
+
+    Every evaluator gets at least one thread; the remainder goes to the
+    first ones.
+    """
+    if count < 1:
+        raise ValueError('count must be at least 1.')
+    total = total or os.cpu_count() or 1
+    share, extra = divmod(total, count)
+    return [max(share + (i < extra), 1) for i in range(count)]
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    """
+    How an evaluator runs its torch model.
+
+    `device` is ``auto`` (CUDA, then Apple MPS, then CPU), or any torch
+    device string such as ``cpu`` or ``cuda:1``. `threads` sets torch's
+    intra-op thread count from the first inference call of each thread
+    on (``None`` keeps torch's default of one per core; see the module
+    docstring for why it is not per evaluator); `interop_threads` is
+    process-wide and applied once, before the first inference.
+    `inference_mode` runs calls under ``torch.inference_mode`` instead of
+    ``torch.no_grad``; `compile` wraps the model with ``torch.compile``
+    when torch provides it.
+    """
+
+    device: str = DEVICE_AUTO
+    threads: Optional[int] = None
+    interop_threads: Optional[int] = None
+    inference_mode: bool = True
+    compile: bool = False
+
+    def __post_init__(self) -> None:
+        """Validate the thread counts."""
+        for name in ('threads', 'interop_threads'):
+            value = getattr(self, name)
+            if value is not None and value < 1:
+                raise ValueError(f'{name} must be at least 1, got {value}.')
+
+    @classmethod
+    def from_env(cls) -> RuntimeConfig:
+        """
+        Build a configuration from environment variables.
+
+        Reads ``MHAI_DEVICE``, ``MHAI_THREADS``, ``MHAI_INTEROP_THREADS``,
+        ``MHAI_INFERENCE_MODE`` (on by default) and ``MHAI_COMPILE`` (off
+        by default).
+        """
+        return cls(
+            device=os.getenv('MHAI_DEVICE') or DEVICE_AUTO,
+            threads=_env_int('MHAI_THREADS'),
+            interop_threads=_env_int('MHAI_INTEROP_THREADS'),
+            inference_mode=env_flag('MHAI_INFERENCE_MODE', True),
+            compile=env_flag('MHAI_COMPILE', False),
+        )
+
+    def resolve_device(self) -> str:
+        """
+        Return the torch device string to load models on.
+
+        An explicit accelerator that is not available raises RuntimeError
+        instead of silently running on the CPU.
+        """
+        torch = _torch()
+        device = self.device.strip().lower()
+        if device == DEVICE_AUTO:
+            if torch is None:
+                return 'cpu'
+            if torch.cuda.is_available():
+                return 'cuda:0'
+            mps = getattr(torch.backends, 'mps', None)
+            if mps is not None and mps.is_available():
+                return 'mps'
+            return 'cpu'
+        if device.startswith('cuda') and (
+            torch is None or not torch.cuda.is_available()
+        ):
+            raise RuntimeError(f'Device {self.device!r} is not available.')
+        return device
+
+    def prepare(self, model: Any) -> Any:
+        """Return `model` (a pipeline), compiled when `compile` is set."""
+        torch = _torch()
+        if not self.compile or torch is None or not hasattr(torch, 'compile'):
+            return model
+        inner = getattr(model, 'model', None)
+        if isinstance(inner, torch.nn.Module):
+            model.model = torch.compile(inner)
+        return model
+
+    @contextlib.contextmanager
+    def session(self) -> Iterator[None]:
+        """Apply the thread budget (once) and inference mode to a call."""
+        torch = _torch()
+        if torch is None:
+            yield
+            return
+        self._apply_interop(torch)
+        self._apply_threads(torch)
+        grad = torch.inference_mode if self.inference_mode else torch.no_grad
+        with grad():
+            yield
+
+    def _apply_threads(self, torch: Any) -> None:
+        """Set the intra-op thread count unless this thread already did."""
+        if self.threads is None:
+            return
+        if getattr(_applied, 'threads', None) != self.threads:
+            torch.set_num_threads(self.threads)
+            _applied.threads = self.threads
+
+    def _apply_interop(self, torch: Any) -> None:
+        """Set the process-wide inter-op pool once, before it starts."""
+        global _interop_threads
+        if self.interop_threads is None or _interop_threads is not None:
+            return
+        with _interop_lock:
+            if _interop_threads is None:
+                # torch refuses once inter-op work has started
+                with contextlib.suppress(RuntimeError):
+                    torch.set_num_interop_threads(self.interop_threads)
+                _interop_threads = torch.get_num_interop_threads()
@@ -7,7 +7,8 @@ Defines:
 - SentimentEvaluator: binary sentiment evaluator
 """
 
-from typing import Any
+from collections.abc import Sequence
+from typing import Any, Optional
 
 from transformers import pipeline  # type: ignore[attr-defined]
 
@@ -33,12 +34,15 @@ class SentimentEvaluator(ModelBase):
     """Binary sentiment evaluator using SST-2 by default."""
 
     default_model_name = 'distilbert-base-uncased-finetuned-sst-2-english'
-    default_temperature = 0.0
+    default_temperature = 1.0
     default_output_max_length = 2
+    column_prefix = 'sentiment'
 
     def _load_model(self) -> Any:
         """Instantiate the sentiment pipeline."""
-        return get_sentiment_pipeline(self.model_name, **self.api_params)
+        return get_sentiment_pipeline(
+            self.model_source, **self.pipeline_params()
+        )
 
     def evaluate(self, text: str) -> dict[str, Any]:
         """
@@ -48,8 +52,14 @@ class SentimentEvaluator(ModelBase):
         - label: 'POSITIVE' or 'NEGATIVE'
         - score: confidence score
         """
-        raw = self._model(text)
-        if isinstance(raw, list) and raw and isinstance(raw[0], list):
-            raw = raw[0]
-        result = raw[0] if isinstance(raw, list) else raw
-        return {'label': result['label'], 'score': result['score']}
+        return self.evaluate_batch([text])[0]
+
+    def evaluate_batch(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> list[dict[str, Any]]:
+        """Evaluate sentiment of many texts in batched pipeline calls."""
+        results = []
+        for row in self.ranked_scores(texts, batch_size=batch_size):
+            label, score = next(iter(row.items()))
+            results.append({'label': label, 'score': score})
+        return results
@@ -0,0 +1,316 @@
+"""
+Language identification module.
+
+A fast, dependency-free detector for routing posts to language-specific
+evaluators. Detection is done per batch with NumPy:
+
+1. Every letter of the batch is binned into a script (Latin, Cyrillic,
+   Arabic, Han, Kana, Hangul, ...) in one ``searchsorted`` pass over the
+   concatenated code points; non-Latin scripts map directly to a language.
+2. Latin-script texts are scored against short function-word lists; the
+   per-language hit counts of the whole batch are accumulated with one
+   ``np.add.at``.
+
+Texts with too little evidence (e.g. "lol 👍") or whose best language
+barely beats the runner-up (e.g. "no hope left", where ``no`` is English,
+Spanish and Portuguese) are reported as ``und`` (undetermined). Latin
+texts long enough to tell, but in none of the known languages and with
+too few English function words to be English (e.g. Swahili, Polish or
+Tagalog), are reported as ``und-Latn`` instead: English-only evaluators
+accept ``und`` but not ``und-Latn``, so those texts are not sent to
+English models.
+
+Defines:
+- UNDETERMINED: code of texts whose language cannot be told
+- OTHER_LATIN: code of Latin texts in none of the known languages
+- LanguageDetector: batch language identification
+- language_stage: pipeline stage adding ``lang``/``lang_score`` columns
+"""
+
+from __future__ import annotations
+
+import re
+
+from collections.abc import Mapping, Sequence
+from typing import Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from mhai.pipeline import Batch, Stage
+
+UNDETERMINED = 'und'
+OTHER_LATIN = 'und-Latn'
+
+# (first, last) code points of each script; 'latin' is resolved by words
+_SCRIPTS: tuple[tuple[str, tuple[tuple[int, int], ...]], ...] = (
+    ('latin', ((0x41, 0x5A), (0x61, 0x7A), (0xC0, 0x24F), (0x1E00, 0x1EFF))),
+    ('el', ((0x370, 0x3FF),)),
+    ('ru', ((0x400, 0x4FF),)),
+    ('he', ((0x590, 0x5FF),)),
+    ('ar', ((0x600, 0x6FF), (0x750, 0x77F))),
+    ('hi', ((0x900, 0x97F),)),
+    ('th', ((0xE00, 0xE7F),)),
+    ('ko', ((0x1100, 0x11FF), (0x3130, 0x318F), (0xAC00, 0xD7AF))),
+    ('kana', ((0x3040, 0x30FF),)),
+    ('han', ((0x3400, 0x4DBF), (0x4E00, 0x9FFF))),
+)
+
+FUNCTION_WORDS: dict[str, tuple[str, ...]] = {
+    'en': (
+        'the', 'and', 'is', 'are', 'was', 'to', 'of', 'in', 'it', 'that',
+        'this', 'with', 'for', 'you', 'not', 'have', 'be', 'on', 'my', 'me',
+        'i', 'just', 'so', 'but', 'what', 'all', 'can', 'will', 'they',
+        'we', 'at', 'from', 'feel', 'im', "i'm", 'been', 'am', 'do', 'dont',
+        "don't", 'get', 'about', 'like', 'your', 'today', 'no', 'one',
+        'nobody', 'nothing', 'never', 'anymore', 'anyone', 'everyone',
+        'someone', 'or', 'if', 'he', 'she', 'her', 'his', 'there', 'why',
+        'how', 'who', 'want', 'know', 'cant', "can't", 'has', 'had',
+        'would', 'out', 'up',
+    ),
+    'es': (
+        'el', 'la', 'los', 'las', 'de', 'que', 'y', 'en', 'un', 'una', 'es',
+        'por', 'con', 'para', 'no', 'lo', 'se', 'del', 'al', 'como', 'pero',
+        'muy', 'yo', 'mi', 'estoy', 'hoy', 'esta', 'está', 'todo', 'más',
+        'también', 'cuando', 'porque', 'hay', 'ser', 'tengo',
+    ),
+    'pt': (
+        'o', 'a', 'os', 'as', 'de', 'que', 'e', 'em', 'um', 'uma', 'é',
+        'do', 'da', 'dos', 'das', 'no', 'na', 'não', 'com', 'para', 'por',
+        'eu', 'meu', 'minha', 'mais', 'mas', 'muito', 'hoje', 'estou',
+        'também', 'quando', 'porque', 'tenho', 'isso', 'você', 'está',
+    ),
+    'fr': (
+        'le', 'la', 'les', 'de', 'des', 'et', 'est', 'un', 'une', 'du',
+        'en', 'que', 'qui', 'pas', 'ne', 'je', 'il', 'elle', 'nous',
+        'vous', 'sur', 'pour', 'dans', 'avec', 'mais', 'très', 'suis',
+        'ce', 'cette', 'au', 'aux', 'mon', "aujourd'hui", 'tout', "c'est",
+        "j'ai",
+    ),
+    'de': (
+        'der', 'die', 'das', 'und', 'ist', 'nicht', 'ich', 'ein', 'eine',
+        'zu', 'mit', 'den', 'dem', 'von', 'auf', 'für', 'sich', 'auch',
+        'es', 'wir', 'sie', 'aber', 'bin', 'heute', 'sehr', 'mein',
+        'noch', 'wie', 'wenn', 'nur', 'habe', 'so', 'was', 'im',
+    ),
+    'it': (
+        'il', 'lo', 'la', 'gli', 'le', 'di', 'che', 'e', 'è', 'un', 'una',
+        'per', 'non', 'con', 'del', 'della', 'sono', 'mi', 'ma', 'anche',
+        'molto', 'oggi', 'io', 'ho', 'questo', 'questa', 'come', 'più',
+        'nel', 'nella', 'sto', 'perché', 'tutto',
+    ),
+    'nl': (
+        'de', 'het', 'een', 'en', 'van', 'is', 'niet', 'ik', 'dat', 'op',
+        'te', 'zijn', 'met', 'voor', 'ook', 'maar', 'je', 'wat', 'er',
+        'nog', 'mijn', 'vandaag', 'heel', 'wel', 'naar', 'om', 'ben',
+        'hebben', 'dit', 'als',
+    ),
+}  # fmt: skip
+
+_WORD_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+
+def _script_table() -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """Return range edges and the script index of each bin (-1: none)."""
+    ranges = sorted(
+        (start, end, idx)
+        for idx, (_, spans) in enumerate(_SCRIPTS)
+        for start, end in spans
+    )
+    edges: list[int] = []
+    bins: list[int] = [-1]
+    for start, end, idx in ranges:
+        edges += [start, end + 1]
+        bins += [idx, -1]
+    return np.asarray(edges, dtype=np.int64), np.asarray(bins, np.int64)
+
+
+class LanguageDetector:
+    """
+    Detect the language of many texts at once.
+
+    `languages` restricts the Latin-script candidates (keys of
+    `function_words`). A Latin text is assigned a language when at least
+    `min_hits` of its words are function words of that language, they
+    make up `min_share` of its words and the language leads the runner-up
+    by at least `min_margin` of its hits (ties never win); English, which
+    shares short words with many languages, also needs `min_english_share`.
+    Otherwise it is ``und``, or ``und-Latn`` when it has at least
+    `min_words` words and less than `min_english_share` of them are English
+    function words. Scripts other than Latin identify their language
+    directly (Han without Kana is ``zh``, Kana is ``ja``, Cyrillic ``ru``).
+    """
+
+    def __init__(
+        self,
+        languages: Optional[Sequence[str]] = None,
+        function_words: Optional[Mapping[str, Sequence[str]]] = None,
+        min_hits: int = 1,
+        min_share: float = 0.1,
+        min_margin: float = 0.25,
+        min_words: int = 3,
+        min_english_share: float = 0.25,
+    ) -> None:
+        words = function_words or FUNCTION_WORDS
+        self.languages = list(languages or words)
+        unknown = set(self.languages) - set(words)
+        if unknown:
+            raise ValueError(f'No function words for: {sorted(unknown)}.')
+        self.min_hits = min_hits
+        self.min_share = min_share
+        self.min_margin = min_margin
+        self.min_words = min_words
+        self.min_english_share = min_english_share
+
+        vocab: dict[str, list[int]] = {}
+        for idx, lang in enumerate(self.languages):
+            for word in words[lang]:
+                vocab.setdefault(word.lower(), []).append(idx)
+        # word -> row of a (n_words, n_languages) membership matrix
+        self._word_ids = {word: i for i, word in enumerate(vocab)}
+        self._membership = np.zeros(
+            (len(vocab) + 1, len(self.languages)), dtype=np.int32
+        )
+        for word, langs in vocab.items():
+            self._membership[self._word_ids[word], langs] = 1
+        self._edges, self._bins = _script_table()
+
+    def script_counts(self, texts: Sequence[str]) -> npt.NDArray[np.int64]:
+        """Return a ``(n_texts, n_scripts)`` matrix of letter counts."""
+        n, k = len(texts), len(_SCRIPTS)
+        # surrogatepass keeps one code unit per character for lone surrogates
+        data = ''.join(texts).encode('utf-32-le', 'surrogatepass')
+        codes = np.frombuffer(data, np.uint32)
+        owner = np.repeat(
+            np.arange(n, dtype=np.int64), [len(t) for t in texts]
+        )
+        script = self._bins[np.searchsorted(self._edges, codes, 'right')]
+        keep = script >= 0
+        flat = np.bincount(
+            owner[keep] * k + script[keep], minlength=n * k
+        ).astype(np.int64)
+        return flat.reshape(n, k)
+
+    def word_hits(
+        self, texts: Sequence[str]
+    ) -> tuple[npt.NDArray[np.int32], npt.NDArray[np.int64]]:
+        """Return function-word hits per language and word counts."""
+        ids = self._word_ids
+        miss = len(ids)
+        rows: list[int] = []
+        words: list[int] = []
+        counts = np.zeros(len(texts), dtype=np.int64)
+        for i, text in enumerate(texts):
+            tokens = _WORD_RE.findall(text.lower())
+            counts[i] = len(tokens)
+            words.extend(ids.get(token, miss) for token in tokens)
+            rows.extend([i] * len(tokens))
+        hits = np.zeros((len(texts), len(self.languages)), dtype=np.int32)
+        np.add.at(hits, np.asarray(rows, np.int64), self._membership[words])
+        return hits, counts
+
+    def detect(
+        self, texts: Sequence[Optional[str]]
+    ) -> tuple[npt.NDArray[np.object_], npt.NDArray[np.float64]]:
+        """
+        Return the language code and a confidence in [0, 1] of each text.
+
+        The confidence is the share of letters in the winning script, or
+        for Latin texts the share of words that are function words of the
+        winning language.
+        """
+        items = ['' if t is None else str(t) for t in texts]
+        n = len(items)
+        # object dtype: configured codes may be longer than 3 ('pt-BR')
+        out = np.full(n, UNDETERMINED, dtype=object)
+        confidence = np.zeros(n, dtype=np.float64)
+        if not n:
+            return out, confidence
+
+        scripts = self.script_counts(items)
+        letters = scripts.sum(axis=1)
+        names = [name for name, _ in _SCRIPTS]
+        kana, han = names.index('kana'), names.index('han')
+        # Japanese mixes Kana with Han; count both towards Kana
+        scripts[:, kana] += np.where(scripts[:, kana] > 0, scripts[:, han], 0)
+        scripts[:, han] = np.where(scripts[:, kana] > 0, 0, scripts[:, han])
+        best = scripts.argmax(axis=1)
+        has_letters = letters > 0
+        share = np.divide(
+            scripts[np.arange(n), best],
+            letters,
+            out=np.zeros(n),
+            where=has_letters,
+        )
+        codes = np.asarray(names, dtype='<U5')[best]
+        codes[codes == 'kana'] = 'ja'
+        codes[codes == 'han'] = 'zh'
+        other = has_letters & (codes != 'latin')
+        out[other] = codes[other]
+        confidence[other] = share[other]
+
+        latin = np.flatnonzero(has_letters & (codes == 'latin'))
+        if latin.size:
+            hits, counts = self.word_hits([items[i] for i in latin])
+            winner = hits.argmax(axis=1)
+            top = hits[np.arange(latin.size), winner]
+            runner_up = (
+                np.partition(hits, -2, axis=1)[:, -2]
+                if hits.shape[1] > 1
+                else np.zeros(latin.size, dtype=hits.dtype)
+            )
+            lead = top - runner_up
+            ratio = np.divide(
+                top, counts, out=np.zeros(latin.size), where=counts > 0
+            )
+            en = self.languages.index('en') if 'en' in self.languages else -1
+            english = np.divide(
+                hits[:, en] if en >= 0 else np.zeros(latin.size),
+                counts,
+                out=np.zeros(latin.size),
+                where=counts > 0,
+            )
+            ok = (
+                (top >= self.min_hits)
+                & (ratio >= self.min_share)
+                & (lead > 0)
+                & (lead >= self.min_margin * top)
+                & ((winner != en) | (english >= self.min_english_share))
+            )
+            # enough words to tell, yet too little English evidence
+            foreign = (
+                ~ok
+                & (counts >= self.min_words)
+                & (english < self.min_english_share)
+            )
+            langs = np.asarray(self.languages, dtype=object)
+            out[latin[ok]] = langs[winner[ok]]
+            out[latin[foreign]] = OTHER_LATIN
+            confidence[latin[ok]] = ratio[ok]
+        return out, confidence
+
+
+def language_stage(
+    detector: Optional[LanguageDetector] = None,
+    column: str = 'text',
+    target: str = 'lang',
+    workers: int = 1,
+) -> Stage:
+    """
+    Return a stage writing the language of `column` to `target`.
+
+    The confidence is written to ``{target}_score``. Place it before
+    evaluator stages created with ``languages=`` to route records.
+    """
+    detector = detector or LanguageDetector()
+
+    def _detect(batch: Batch) -> Batch:
+        langs, scores = detector.detect(
+            [record.get(column) for record in batch]
+        )
+        return [
+            {**record, target: lang, f'{target}_score': round(float(s), 4)}
+            for record, lang, s in zip(batch, langs.tolist(), scores)
+        ]
+
+    return Stage(name='langid', fn=_detect, workers=workers)
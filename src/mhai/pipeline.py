@@ -0,0 +1,485 @@
+"""
+Streaming pipeline module.
+
+Composes harvesting, cleaning, scoring and writing into one graph of
+threads connected by bounded queues, so network I/O and model inference
+overlap and peak memory is bounded by the queue sizes instead of the
+dataset size.
+
+Defines:
+- iter_async: consume an async iterable from synchronous code
+- Stage: a named batch transformation run by one or more worker threads
+- StageMetrics: per-stage throughput counters
+- Pipeline: source → stages → sink graph with backpressure
+- clean_stage / evaluator_stage: stages for the common steps
+- run_column: column holding the run id of an evaluator stage
+- ListSink: sink that collects records in memory
+
+``clean_text`` is re-exported from ``mhai.utils``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+import time
+
+from collections.abc import AsyncIterable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union, cast
+
+import pandas as pd
+
+from mhai.utils import clean_text
+
+if TYPE_CHECKING:
+    from mhai.evaluations.base import Evaluator
+
+Record = dict[str, Any]
+Batch = list[Record]
+StageFn = Callable[[Batch], Batch]
+SinkFn = Callable[[Batch], None]
+
+_POLL_SECONDS = 0.1
+
+
+class _Done:
+    """End-of-stream marker passed through the queues."""
+
+
+_DONE = _Done()
+
+
+def iter_async(source: AsyncIterable[Any]) -> Iterator[Any]:
+    """
+    Iterate over an async iterable on a private event loop.
+
+    Lets the pipeline's source thread drain ``aiter_posts`` or ``aharvest``
+    without the caller running an event loop.
+    """
+    loop = asyncio.new_event_loop()
+    iterator = source.__aiter__()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(iterator.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        aclose = getattr(iterator, 'aclose', None)
+        if aclose is not None:
+            loop.run_until_complete(aclose())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+@dataclass
+class StageMetrics:
+    """Throughput counters of one pipeline stage."""
+
+    name: str
+    records: int = 0
+    batches: int = 0
+    busy_seconds: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def add(self, records: int, seconds: float) -> None:
+        """Record one processed batch."""
+        with self._lock:
+            self.records += records
+            self.batches += 1
+            self.busy_seconds += seconds
+
+    @property
+    def wall_seconds(self) -> float:
+        """Return the time between the stage start and its end."""
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at or time.perf_counter()
+        return end - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Return records processed per second of busy time."""
+        if not self.busy_seconds:
+            return 0.0
+        return self.records / self.busy_seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a plain dict."""
+        return {
+            'stage': self.name,
+            'records': self.records,
+            'batches': self.batches,
+            'busy_seconds': round(self.busy_seconds, 4),
+            'wall_seconds': round(self.wall_seconds, 4),
+            'records_per_second': round(self.throughput, 2),
+        }
+
+
+@dataclass
+class Stage:
+    """
+    A named batch transformation.
+
+    `fn` receives a list of records and returns the (possibly filtered or
+    enriched) list to forward. With ``workers > 1`` batches may leave the
+    stage out of order.
+    """
+
+    name: str
+    fn: StageFn
+    workers: int = 1
+
+    def __post_init__(self) -> None:
+        """Validate the number of workers."""
+        if self.workers < 1:
+            raise ValueError('Stage workers must be >= 1.')
+
+
+class Pipeline:
+    """
+    Source → stages → sink graph connected by bounded queues.
+
+    The source is consumed on its own thread, each stage runs on its own
+    worker threads and the sink on the calling thread, so a slow network
+    fetch overlaps with inference on previously fetched posts. Every queue
+    holds at most `max_queue` batches: a slow stage blocks its producers
+    (backpressure) instead of letting memory grow.
+
+    The source may be a sync or async iterable (e.g. an extractor's
+    ``aiter_posts``) and may yield single records (dicts), lists of records
+    or DataFrame pages. Pages are split into batches of at most `batch_size`
+    and forwarded immediately; single records are accumulated until a
+    batch is full.
+    """
+
+    def __init__(
+        self,
+        source: Union[Iterable[Any], AsyncIterable[Any]],
+        stages: Sequence[Stage],
+        sink: SinkFn,
+        batch_size: int = 32,
+        max_queue: int = 4,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError('batch_size must be >= 1.')
+        if max_queue < 1:
+            raise ValueError('max_queue must be >= 1.')
+        names = ['source', *(stage.name for stage in stages), 'sink']
+        duplicates = sorted({n for n in names if names.count(n) > 1})
+        if duplicates:
+            # metrics are keyed by name: duplicates would be merged
+            raise ValueError(
+                f'Duplicate stage names: {", ".join(duplicates)}.'
+            )
+        self.source = source
+        self.stages = list(stages)
+        self.sink = sink
+        self.batch_size = batch_size
+        self.max_queue = max_queue
+        self.metrics: dict[str, StageMetrics] = {
+            'source': StageMetrics('source'),
+            **{stage.name: StageMetrics(stage.name) for stage in stages},
+            'sink': StageMetrics('sink'),
+        }
+        self._stop = threading.Event()
+        self._errors: list[BaseException] = []
+        self._error_lock = threading.Lock()
+
+    def stop(self) -> None:
+        """
+        Request a graceful shutdown.
+
+        The source stops pulling new items; batches already queued are
+        discarded and every thread exits at its next queue operation.
+        """
+        self._stop.set()
+
+    @property
+    def stopped(self) -> bool:
+        """Return True once a shutdown was requested or a stage failed."""
+        return self._stop.is_set()
+
+    def run(self) -> dict[str, StageMetrics]:
+        """
+        Run the pipeline to completion and return per-stage metrics.
+
+        The first exception raised by the source, a stage or the sink stops
+        the whole graph and is re-raised here once every thread has exited.
+        """
+        queues: list[queue.Queue[Any]] = [
+            queue.Queue(maxsize=self.max_queue)
+            for _ in range(len(self.stages) + 1)
+        ]
+        readers = [stage.workers for stage in self.stages] + [1]
+
+        threads = [
+            threading.Thread(
+                target=self._run_source,
+                args=(queues[0], readers[0]),
+                name='mhai-source',
+                daemon=True,
+            )
+        ]
+        for idx, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for worker in range(stage.workers):
+                threads.append(
+                    threading.Thread(
+                        target=self._run_stage,
+                        args=(
+                            stage,
+                            queues[idx],
+                            queues[idx + 1],
+                            readers[idx + 1],
+                            remaining,
+                            lock,
+                        ),
+                        name=f'mhai-{stage.name}-{worker}',
+                        daemon=True,
+                    )
+                )
+
+        for thread in threads:
+            thread.start()
+        try:
+            self._run_sink(queues[-1])
+        except BaseException as exc:
+            self._fail(exc)
+        finally:
+            for thread in threads:
+                thread.join()
+
+        if self._errors:
+            raise self._errors[0]
+        return self.metrics
+
+    def _fail(self, exc: BaseException) -> None:
+        with self._error_lock:
+            self._errors.append(exc)
+        self._stop.set()
+
+    def _put(self, q: queue.Queue[Any], item: Any) -> bool:
+        """Block until `item` is queued; return False on shutdown."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue[Any]) -> Any:
+        """Block until an item is available; return _DONE on shutdown."""
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _batches(self) -> Iterator[Batch]:
+        pending: Batch = []
+        source = (
+            iter_async(self.source)
+            if isinstance(self.source, AsyncIterable)
+            else self.source
+        )
+        for item in source:
+            if self._stop.is_set():
+                return
+            if isinstance(item, dict):
+                pending.append(item)
+                if len(pending) >= self.batch_size:
+                    yield pending
+                    pending = []
+                continue
+            if isinstance(item, pd.DataFrame):
+                records = cast(Batch, item.to_dict('records'))
+            else:
+                records = list(item)
+            for start in range(0, len(records), self.batch_size):
+                yield records[start : start + self.batch_size]
+        if pending:
+            yield pending
+
+    def _run_source(self, out: queue.Queue[Any], readers: int) -> None:
+        metrics = self.metrics['source']
+        metrics.started_at = time.perf_counter()
+        try:
+            batches = self._batches()
+            while True:
+                start = time.perf_counter()
+                batch = next(batches, None)
+                if batch is None:
+                    break
+                metrics.add(len(batch), time.perf_counter() - start)
+                if not self._put(out, batch):
+                    return
+        except BaseException as exc:
+            self._fail(exc)
+        finally:
+            metrics.finished_at = time.perf_counter()
+            for _ in range(readers):
+                self._put(out, _DONE)
+
+    def _run_stage(
+        self,
+        stage: Stage,
+        inbox: queue.Queue[Any],
+        out: queue.Queue[Any],
+        readers: int,
+        remaining: list[int],
+        lock: threading.Lock,
+    ) -> None:
+        metrics = self.metrics[stage.name]
+        with lock:
+            if metrics.started_at is None:
+                metrics.started_at = time.perf_counter()
+        try:
+            while True:
+                batch = self._get(inbox)
+                if batch is _DONE:
+                    break
+                start = time.perf_counter()
+                result = stage.fn(batch)
+                metrics.add(len(batch), time.perf_counter() - start)
+                if result and not self._put(out, result):
+                    break
+        except BaseException as exc:
+            self._fail(exc)
+        finally:
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                metrics.finished_at = time.perf_counter()
+                for _ in range(readers):
+                    self._put(out, _DONE)
+
+    def _run_sink(self, inbox: queue.Queue[Any]) -> None:
+        metrics = self.metrics['sink']
+        metrics.started_at = time.perf_counter()
+        try:
+            while True:
+                batch = self._get(inbox)
+                if batch is _DONE:
+                    break
+                start = time.perf_counter()
+                self.sink(batch)
+                metrics.add(len(batch), time.perf_counter() - start)
+        finally:
+            metrics.finished_at = time.perf_counter()
+
+
+def clean_stage(
+    source: str = 'text', target: str = 'text', workers: int = 1
+) -> Stage:
+    """
+    Return a stage that writes ``clean_text(record[source])`` to `target`.
+
+    Records whose cleaned text is empty are dropped.
+    """
+
+    def _clean(batch: Batch) -> Batch:
+        out: Batch = []
+        for record in batch:
+            text = clean_text(record.get(source))
+            if text:
+                out.append({**record, target: text})
+        return out
+
+    return Stage(name='clean', fn=_clean, workers=workers)
+
+
+def run_column(stage_name: str) -> str:
+    """Return the column recording which run scored `stage_name`."""
+    return f'run_{stage_name}'
+
+
+def evaluator_stage(
+    evaluator: Evaluator,
+    column: str = 'text',
+    batch_size: Optional[int] = None,
+    name: Optional[str] = None,
+    workers: int = 1,
+    languages: Optional[Sequence[str]] = None,
+    lang_column: str = 'lang',
+    run_id: Optional[int] = None,
+) -> Stage:
+    """
+    Return a stage that scores `column` with `evaluator`.
+
+    Each batch goes through ``evaluator.evaluate_batch`` and the results
+    are merged into the records via ``evaluator.to_columns``. By default
+    inference runs on a single worker, since the model already parallelizes
+    internally; more `workers` share the evaluator to keep several batches
+    in flight (useful when kernels leave cores idle between batches).
+
+    With `languages`, only records whose `lang_column` (see
+    ``mhai.langid.language_stage``) is one of them are scored; the others
+    are forwarded unscored. The stage name is appended to the ``routed``
+    column of every record it scored, so the output records the decision.
+
+    With `run_id` (see ``mhai.provenance.RunTable``), every record that
+    went through the stage, scored or routed away, gets it in its
+    ``run_column(name)``.
+    """
+    stage_name = name or evaluator.column_prefix or type(evaluator).__name__
+    accepted = None if languages is None else frozenset(languages)
+    run = {} if run_id is None else {run_column(stage_name): run_id}
+
+    def _score(batch: Batch) -> Batch:
+        if accepted is None:
+            chosen = batch
+        else:
+            # records that went through no language stage are scored
+            chosen = [
+                record
+                for record in batch
+                if lang_column not in record or record[lang_column] in accepted
+            ]
+        texts = [str(record[column]) for record in chosen]
+        results = (
+            evaluator.evaluate_batch(texts, batch_size=batch_size)
+            if texts
+            else []
+        )
+        scored = {
+            id(record): {**record, **evaluator.to_columns(result)}
+            for record, result in zip(chosen, results)
+        }
+        out: Batch = []
+        for record in batch:
+            new = scored.get(id(record))
+            if accepted is not None:
+                routed = record.get('routed', '')
+                if new is not None:
+                    routed = f'{routed};{stage_name}' if routed else stage_name
+                new = {**(new or record), 'routed': routed}
+            out.append({**(new or record), **run} if run else new or record)
+        return out
+
+    return Stage(name=stage_name, fn=_score, workers=workers)
+
+
+class ListSink:
+    """Sink that keeps every record in memory."""
+
+    def __init__(self) -> None:
+        self.records: Batch = []
+
+    def __call__(self, batch: Batch) -> None:
+        """Append a batch of records."""
+        self.records.extend(batch)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Return the collected records as a DataFrame."""
+        return pd.DataFrame(self.records)
@@ -0,0 +1,195 @@
+"""
+Result provenance module.
+
+Scored rows record which run produced each evaluator's columns as a
+small integer ``run_<stage>`` column (see ``evaluator_stage``). The run
+table maps run ids to the evaluator class, model name, revision hash and
+scoring-parameters hash (``ModelBase.provenance``) and is stored as JSON
+next to the output, so it costs one entry per distinct configuration
+instead of one per row.
+
+``rescore`` compares the stored runs with the current evaluators and
+re-scores only the rows whose provenance changed: after updating one
+model, the work is that model's rows, not the whole corpus times every
+evaluator.
+
+Defines:
+- RUNS_SUFFIX: suffix of the run table next to an output
+- RunTable: append-only table of evaluation runs
+- stale_mask: rows whose stored run differs from the current one
+- rescore: re-score the stale rows of a scored DataFrame
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+
+from collections.abc import Mapping, Sequence
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from mhai.evaluations.base import Evaluator, digest
+from mhai.pipeline import evaluator_stage, run_column
+
+RUNS_SUFFIX = '.runs.json'
+
+
+class RunTable:
+    """
+    Append-only table of evaluation runs.
+
+    A run is one distinct provenance; registering the same provenance
+    again returns its existing id. With a `path`, the table is loaded
+    from and saved (atomically) to that JSON file.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        self.path = Path(path) if path is not None else None
+        self.runs: list[dict[str, Any]] = []
+        if self.path is not None and self.path.is_file():
+            self.runs = json.loads(self.path.read_text())['runs']
+        self._ids: dict[str, int] = {
+            run['key']: run['id'] for run in self.runs
+        }
+
+    @classmethod
+    def for_output(cls, out: Union[str, Path]) -> RunTable:
+        """Return the run table stored next to output `out`."""
+        out = Path(out)
+        return cls(out.with_name(out.name + RUNS_SUFFIX))
+
+    def __len__(self) -> int:
+        """Return the number of runs."""
+        return len(self.runs)
+
+    def register(self, provenance: Mapping[str, Any]) -> int:
+        """Return the run id of `provenance`, adding it when new."""
+        key = digest(dict(provenance))
+        run_id = self._ids.get(key)
+        if run_id is not None:
+            return run_id
+        run_id = len(self.runs)
+        self.runs.append(
+            {
+                'id': run_id,
+                'key': key,
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                **provenance,
+            }
+        )
+        self._ids[key] = run_id
+        self.save()
+        return run_id
+
+    def get(self, run_id: int) -> dict[str, Any]:
+        """Return the entry of `run_id`."""
+        return self.runs[run_id]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the runs as a DataFrame indexed by run id."""
+        return pd.DataFrame(self.runs).set_index('id')
+
+    def save(self) -> None:
+        """Write the table to its path, if any."""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+            json.dump({'runs': self.runs}, fh, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+def stale_mask(
+    frame: pd.DataFrame, stage_name: str, run_id: int
+) -> npt.NDArray[np.bool_]:
+    """Return True for rows not scored by run `run_id` of `stage_name`."""
+    column = run_column(stage_name)
+    if column not in frame:
+        return np.ones(len(frame), dtype=bool)
+    stored = pd.to_numeric(frame[column], errors='coerce')
+    return np.asarray(stored != run_id)
+
+
+def _strip_stage(routed: Any, stage_name: str) -> str:
+    """Remove `stage_name` from a ``routed`` value."""
+    if not isinstance(routed, str):
+        return ''
+    return ';'.join(s for s in routed.split(';') if s and s != stage_name)
+
+
+def rescore(
+    frame: pd.DataFrame,
+    evaluators: Mapping[str, Evaluator],
+    runs: RunTable,
+    column: str = 'text',
+    batch_size: Optional[int] = None,
+    languages: Optional[Mapping[str, Optional[Sequence[str]]]] = None,
+) -> tuple[pd.DataFrame, dict[str, int]]:
+    """
+    Re-score the rows of `frame` whose provenance is stale.
+
+    `evaluators` maps stage names (as used when scoring) to the current
+    evaluators. For each stage, rows whose ``run_<stage>`` differs from
+    the run of the current evaluator have that evaluator's columns
+    cleared and scored again; other rows and columns are left untouched.
+    `languages` routes stages as in ``evaluator_stage``.
+
+    Missing texts are scored as ``''``, as when the rows were first
+    scored. Returns the updated frame (same row order) and the number of
+    rows re-scored per stage.
+    """
+    frame = frame.reset_index(drop=True)
+    if column in frame:
+        frame[column] = frame[column].fillna('').astype(str)
+    languages = languages or {}
+    counts: dict[str, int] = {}
+    for stage_name, evaluator in evaluators.items():
+        run_id = runs.register(evaluator.provenance())
+        stale = stale_mask(frame, stage_name, run_id)
+        counts[stage_name] = int(stale.sum())
+        if not stale.any():
+            continue
+
+        prefixes = evaluator.output_prefixes()
+        owned = [
+            c for c in frame.columns if prefixes and c.startswith(prefixes)
+        ]
+        records = frame.loc[stale].drop(columns=owned).to_dict('records')
+        if 'routed' in frame:
+            for record in records:
+                record['routed'] = _strip_stage(record['routed'], stage_name)
+        stage = evaluator_stage(
+            evaluator,
+            column=column,
+            batch_size=batch_size,
+            name=stage_name,
+            languages=languages.get(stage_name),
+            run_id=run_id,
+        )
+        size = batch_size or evaluator.default_batch_size
+        scored: list[dict[str, Any]] = []
+        for start in range(0, len(records), size):
+            scored.extend(stage.fn(records[start : start + size]))
+
+        updated = pd.DataFrame(scored, index=frame.index[stale])
+        for name in updated.columns.difference(frame.columns):
+            frame[name] = pd.Series(np.nan, index=frame.index, dtype=object)
+        for name in owned:
+            if name not in updated:
+                frame[name] = frame[name].astype(object)
+                frame.loc[stale, name] = np.nan
+        for name in updated.columns:
+            values = updated[name]
+            if frame[name].dtype != values.dtype:
+                frame[name] = frame[name].astype(object)
+            frame.loc[stale, name] = values
+        frame = frame.infer_objects()
+    return frame, counts
@@ -1 +1,24 @@
 """sns (social networking service) module."""
+
+from .base import (
+    PLATFORMS,
+    POST_SCHEMA,
+    SocialMediaExtractorBase,
+    aharvest,
+    harvest,
+    to_post_frame,
+)
+from .graph import FollowCrawler, FollowGraph, IdSet, crawl
+
+__all__ = [
+    'PLATFORMS',
+    'POST_SCHEMA',
+    'FollowCrawler',
+    'FollowGraph',
+    'IdSet',
+    'SocialMediaExtractorBase',
+    'aharvest',
+    'crawl',
+    'harvest',
+    'to_post_frame',
+]
@@ -0,0 +1,155 @@
+"""
+Common interface and post schema for SNS extractors.
+
+Defines:
+- PLATFORMS: platforms of the ``platform`` categorical
+- POST_SCHEMA: normalized post columns and their compact dtypes
+- to_post_frame: build a normalized DataFrame from post records
+- SocialMediaExtractorBase: async iterator contract shared by extractors
+- aharvest / harvest: fan out many (extractor, query) jobs concurrently
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Iterable, Mapping
+from typing import Any, Callable, Optional, TypeVar
+
+import pandas as pd
+
+T = TypeVar('T')
+
+PLATFORMS = ('mastodon', 'twitter')
+
+# one fixed categorical, so frames of different platforms concatenate
+# without falling back to object dtype
+POST_SCHEMA: dict[str, Any] = {
+    'platform': pd.CategoricalDtype(list(PLATFORMS)),
+    'post_id': 'string',
+    'user': 'string',
+    'created_at': 'datetime64[ns, UTC]',
+    'text': 'string',
+    'likes': 'int32',
+    'shares': 'int32',
+    'replies': 'int32',
+    'url': 'string',
+}
+
+_COUNT_COLUMNS = ('likes', 'shares', 'replies')
+
+
+def to_post_frame(records: Iterable[Mapping[str, Any]]) -> pd.DataFrame:
+    """
+    Return `records` as a DataFrame following POST_SCHEMA.
+
+    Missing columns are filled (counts with 0, strings with NA) and extra
+    keys are dropped, so frames from every platform concatenate cleanly.
+    A platform missing from PLATFORMS raises ValueError.
+    """
+    frame = pd.DataFrame(list(records)).reindex(columns=list(POST_SCHEMA))
+    unknown = set(frame['platform'].dropna()) - set(PLATFORMS)
+    if unknown:
+        raise ValueError(f'Unknown platforms {sorted(unknown)}.')
+    for column in _COUNT_COLUMNS:
+        frame[column] = (
+            pd.to_numeric(frame[column], errors='coerce')
+            .fillna(0)
+            .astype('int64')
+        )
+    frame['created_at'] = pd.to_datetime(frame['created_at'], utc=True)
+    return frame.astype(POST_SCHEMA)
+
+
+class SocialMediaExtractorBase(ABC):
+    """
+    Base class for social media extractors.
+
+    Subclasses implement ``aiter_posts(query)``, an async iterator of post
+    records following POST_SCHEMA. Blocking client calls are run in worker
+    threads (``_call``), so many queries and platforms can be harvested
+    concurrently on one event loop.
+    """
+
+    platform: str = ''
+    page_size: int = 40
+
+    def __init__(self) -> None:
+        pass
+
+    @abstractmethod
+    def aiter_posts(
+        self, query: str, limit: Optional[int] = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield normalized posts matching `query`, newest first."""
+        ...
+
+    async def afetch_posts(
+        self, query: str, limit: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Collect ``aiter_posts(query)`` into a normalized DataFrame."""
+        return to_post_frame([p async for p in self.aiter_posts(query, limit)])
+
+    @staticmethod
+    async def _call(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking client call without blocking the event loop."""
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+async def aharvest(
+    jobs: Iterable[tuple[SocialMediaExtractorBase, str]],
+    limit: Optional[int] = None,
+    max_concurrency: int = 8,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Yield posts from every ``(extractor, query)`` job as they arrive.
+
+    At most `max_concurrency` jobs run at once; `limit` caps the posts of
+    each job. Posts of different jobs are interleaved; the first failing
+    job cancels the others and its exception is raised.
+    """
+    if max_concurrency < 1:
+        raise ValueError('max_concurrency must be >= 1.')
+
+    done = object()
+    out: asyncio.Queue[Any] = asyncio.Queue(maxsize=max_concurrency * 4)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(extractor: SocialMediaExtractorBase, query: str) -> None:
+        async with semaphore:
+            async for post in extractor.aiter_posts(query, limit):
+                await out.put(post)
+
+    async def run_all(tasks: list[asyncio.Task[None]]) -> None:
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            await out.put(done)
+
+    tasks = [asyncio.create_task(run(ex, q)) for ex, q in jobs]
+    supervisor = asyncio.create_task(run_all(tasks))
+    try:
+        while True:
+            item = await out.get()
+            if item is done:
+                break
+            yield item
+        await supervisor
+    finally:
+        for task in [*tasks, supervisor]:
+            task.cancel()
+        await asyncio.gather(*tasks, supervisor, return_exceptions=True)
+
+
+def harvest(
+    jobs: Iterable[tuple[SocialMediaExtractorBase, str]],
+    limit: Optional[int] = None,
+    max_concurrency: int = 8,
+) -> pd.DataFrame:
+    """Run ``aharvest`` to completion and return a normalized DataFrame."""
+
+    async def collect() -> list[dict[str, Any]]:
+        return [p async for p in aharvest(jobs, limit, max_concurrency)]
+
+    return to_post_frame(asyncio.run(collect()))
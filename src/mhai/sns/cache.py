@@ -0,0 +1,287 @@
+"""
+HTTP response cache for SNS extractors.
+
+Both ``Mastodon.py`` and ``tweepy`` talk to their APIs through a
+``requests.Session``; mounting a CachingAdapter on that session caches GET
+responses on disk without touching the client libraries.
+
+Defines:
+- CachePolicy: per-endpoint TTLs matched by URL path
+- HTTPCache: SQLite-backed response store with hit/miss counters
+- CachingAdapter: requests transport adapter with TTL and revalidation
+- install_cache: mount a cache on a requests session
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional, Union
+from urllib.parse import urlsplit
+
+import requests
+
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DEFAULT_CACHE_PATH = Path.home() / '.cache' / 'mhai' / 'http.sqlite'
+
+# (path regex, ttl in seconds); the first match wins, 0 disables caching
+MASTODON_TTLS: tuple[tuple[str, float], ...] = (
+    (r'/api/v1/accounts/verify_credentials$', 3600),
+    (r'/api/v1/accounts/lookup$', 86400),
+    (r'/api/v1/accounts/[^/]+/(followers|following)$', 3600),
+    (r'/api/v1/accounts/[^/]+/statuses$', 300),
+    (r'/api/v1/accounts/[^/]+$', 86400),
+    (r'/api/v1/timelines/', 60),
+    (r'/api/v1/notifications', 0),
+)
+TWITTER_TTLS: tuple[tuple[str, float], ...] = (
+    (r'/2/users/by/username/[^/]+$', 86400),
+    (r'/2/users/[^/]+/tweets$', 3600),
+    (r'/2/tweets/search/recent$', 300),
+)
+
+# the body is stored decoded, and rate-limit state must never be replayed
+_DROPPED_HEADERS = (
+    'x-ratelimit-',
+    'content-encoding',
+    'content-length',
+    'transfer-encoding',
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    stored_at REAL NOT NULL
+)
+"""
+
+
+@dataclass
+class CachePolicy:
+    """Map URL paths to time-to-live values, in seconds."""
+
+    rules: list[tuple[str, float]] = field(
+        default_factory=lambda: [*MASTODON_TTLS, *TWITTER_TTLS]
+    )
+    default_ttl: float = 0.0
+
+    def __post_init__(self) -> None:
+        """Compile the path patterns."""
+        self._compiled = [(re.compile(p), ttl) for p, ttl in self.rules]
+
+    def ttl(self, url: str) -> float:
+        """Return the TTL of `url`; 0 means the response is not cached."""
+        path = urlsplit(url).path
+        for pattern, ttl in self._compiled:
+            if pattern.search(path):
+                return ttl
+        return self.default_ttl
+
+
+@dataclass
+class CacheEntry:
+    """A stored response."""
+
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    stored_at: float
+
+    @property
+    def validators(self) -> dict[str, str]:
+        """Return conditional request headers for this entry."""
+        headers = CaseInsensitiveDict(self.headers)
+        out = {}
+        if 'ETag' in headers:
+            out['If-None-Match'] = headers['ETag']
+        if 'Last-Modified' in headers:
+            out['If-Modified-Since'] = headers['Last-Modified']
+        return out
+
+
+class HTTPCache:
+    """
+    SQLite-backed store of GET responses.
+
+    Keys combine the URL with a hash of the ``Authorization`` header, so
+    different accounts never share cached responses. Counters record how
+    many requests were answered locally (``hits``), revalidated with a 304
+    (``revalidated``) or sent in full (``misses``).
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        self.path = Path(path) if path is not None else DEFAULT_CACHE_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(_SCHEMA)
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(request: requests.PreparedRequest) -> str:
+        """Return the cache key of `request`."""
+        auth = request.headers.get('Authorization', '')
+        digest = hashlib.sha256(str(auth).encode()).hexdigest()[:16]
+        return f'{request.method} {request.url} {digest}'
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry stored under `key`, if any."""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT status, headers, body, stored_at FROM responses '
+                'WHERE key = ?',
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(row[0], json.loads(row[1]), bytes(row[2]), row[3])
+
+    def put(self, key: str, url: str, entry: CacheEntry) -> None:
+        """Store `entry` under `key`."""
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    key,
+                    url,
+                    entry.status,
+                    json.dumps(entry.headers),
+                    entry.body,
+                    entry.stored_at,
+                ),
+            )
+
+    def touch(self, key: str, stored_at: float) -> None:
+        """Mark the entry under `key` as fresh again."""
+        with self._lock, self._db:
+            self._db.execute(
+                'UPDATE responses SET stored_at = ? WHERE key = ?',
+                (stored_at, key),
+            )
+
+    def clear(self) -> None:
+        """Remove every stored response and reset the counters."""
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM responses')
+        self.hits = self.revalidated = self.misses = 0
+
+    def record(self, outcome: str) -> None:
+        """Increment the `outcome` counter (hits, revalidated, misses)."""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self) -> dict[str, int]:
+        """Return the request counters."""
+        return {
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+        }
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        with self._lock:
+            self._db.close()
+
+
+class CachingAdapter(HTTPAdapter):
+    """
+    Transport adapter answering cacheable GETs from an HTTPCache.
+
+    Fresh entries are served without a request. Stale entries that carry
+    an ``ETag`` or ``Last-Modified`` header are revalidated with a
+    conditional request; a 304 answer renews them.
+    """
+
+    def __init__(
+        self,
+        cache: HTTPCache,
+        policy: Optional[CachePolicy] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.cache = cache
+        self.policy = policy or CachePolicy()
+
+    def send(  # type: ignore[override]
+        self, request: requests.PreparedRequest, **kwargs: Any
+    ) -> requests.Response:
+        """Send `request`, or answer it from the cache."""
+        ttl = self.policy.ttl(request.url or '')
+        if request.method != 'GET' or ttl <= 0:
+            return super().send(request, **kwargs)
+
+        key = self.cache.key(request)
+        entry = self.cache.get(key)
+        now = time.time()
+        if entry is not None and now - entry.stored_at < ttl:
+            self.cache.record('hits')
+            return self._build(request, entry)
+
+        if entry is not None:
+            request.headers.update(entry.validators)
+        response = super().send(request, **kwargs)
+
+        if entry is not None and response.status_code == 304:
+            self.cache.record('revalidated')
+            self.cache.touch(key, now)
+            response.close()
+            return self._build(request, entry)
+
+        self.cache.record('misses')
+        if response.status_code == 200:
+            headers = {
+                k: v
+                for k, v in response.headers.items()
+                if not k.lower().startswith(_DROPPED_HEADERS)
+            }
+            self.cache.put(
+                key,
+                request.url or '',
+                CacheEntry(200, headers, response.content, now),
+            )
+        return response
+
+    def _build(
+        self, request: requests.PreparedRequest, entry: CacheEntry
+    ) -> requests.Response:
+        response = requests.Response()
+        response.status_code = entry.status
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response._content = entry.body
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url or ''
+        response.reason = 'OK'
+        response.request = request
+        response.connection = self
+        return response
+
+
+def install_cache(
+    session: requests.Session,
+    cache: Optional[HTTPCache] = None,
+    policy: Optional[CachePolicy] = None,
+) -> HTTPCache:
+    """Mount a caching adapter on `session` and return its cache."""
+    cache = cache or HTTPCache()
+    adapter = CachingAdapter(cache, policy)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return cache
@@ -0,0 +1,247 @@
+"""
+Follower/following graph crawler.
+
+Edges are stored as an int64 ``(n, 2)`` array of ``(follower, followee)``
+account ids and visited accounts as a sorted int64 array, so a crawl
+holds 16 bytes per edge and 8 bytes per account instead of the full
+account dicts returned by the API.
+
+Defines:
+- IdSet: compact set of account ids
+- FollowGraph: append-only directed edge list with ``.npz`` persistence
+- FollowCrawler: paginated, N-hop, concurrency-limited crawl
+- crawl: synchronous wrapper around ``FollowCrawler.acrawl``
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from mhai.utils import grow
+
+IdArray = npt.NDArray[np.int64]
+
+
+class IdSet:
+    """Set of int64 ids backed by one sorted array."""
+
+    def __init__(self, ids: npt.ArrayLike = ()) -> None:
+        self.ids: IdArray = np.unique(np.asarray(ids, dtype=np.int64))
+
+    def __len__(self) -> int:
+        """Return the number of ids."""
+        return int(self.ids.shape[0])
+
+    def __contains__(self, value: Any) -> bool:
+        """Return True if `value` is in the set."""
+        i = int(np.searchsorted(self.ids, value))
+        return i < len(self) and int(self.ids[i]) == int(value)
+
+    def add(self, ids: npt.ArrayLike) -> IdArray:
+        """Insert `ids` and return the ones not seen before, sorted."""
+        new = np.setdiff1d(
+            np.asarray(ids, dtype=np.int64), self.ids, assume_unique=False
+        )
+        if new.size:
+            self.ids = np.union1d(self.ids, new)
+        return new
+
+    def discard(self, ids: npt.ArrayLike) -> None:
+        """Remove `ids` that are in the set."""
+        self.ids = np.setdiff1d(
+            self.ids, np.asarray(ids, dtype=np.int64), assume_unique=True
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory held by the set."""
+        return int(self.ids.nbytes)
+
+
+class FollowGraph:
+    """Directed follow edges; ``(a, b)`` means account `a` follows `b`."""
+
+    def __init__(self) -> None:
+        self._edges: IdArray = np.empty((0, 2), dtype=np.int64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of edges."""
+        return self._size
+
+    def add(self, src: npt.ArrayLike, dst: npt.ArrayLike) -> None:
+        """Append edges ``src -> dst``; scalars are broadcast."""
+        src, dst = np.broadcast_arrays(
+            np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)
+        )
+        n = src.size
+        if not n:
+            return
+        self._edges = grow(self._edges, self._size + n, 0)
+        self._edges[self._size : self._size + n, 0] = src.ravel()
+        self._edges[self._size : self._size + n, 1] = dst.ravel()
+        self._size += n
+
+    @property
+    def edges(self) -> IdArray:
+        """Return the ``(n, 2)`` edge array (a view, not a copy)."""
+        return self._edges[: self._size]
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory held by the edge buffer."""
+        return int(self._edges.nbytes)
+
+    def nodes(self) -> IdArray:
+        """Return every account id appearing in an edge, sorted."""
+        return np.unique(self.edges)
+
+    def unique(self) -> FollowGraph:
+        """Return a graph without duplicate edges."""
+        graph = FollowGraph()
+        graph._edges = np.unique(self.edges, axis=0)
+        graph._size = graph._edges.shape[0]
+        return graph
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the edges as a ``follower``/``followee`` DataFrame."""
+        edges = self.edges
+        return pd.DataFrame({'follower': edges[:, 0], 'followee': edges[:, 1]})
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Persist the edges as a compressed ``.npz``."""
+        np.savez_compressed(path, edges=self.edges)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> FollowGraph:
+        """Restore a graph written by ``save``."""
+        graph = cls()
+        with np.load(path) as data:
+            graph._edges = data['edges'].astype(np.int64)
+        graph._size = graph._edges.shape[0]
+        return graph
+
+
+class FollowCrawler:
+    """
+    Breadth-first crawl of follow relations.
+
+    `extractor` provides ``aiter_follow_ids(account_id, direction, limit)``
+    (see ``MastodonExtractor``). Each hop expands every newly discovered
+    account, with at most `max_concurrency` accounts fetched at once;
+    `max_follows` caps the ids read per account and direction.
+
+    ``visited`` holds the accounts already expanded and ``pending`` those
+    found but cut by `max_accounts`; pending accounts are expanded first
+    by the next ``acrawl`` call.
+    """
+
+    def __init__(
+        self,
+        extractor: Any,
+        directions: Sequence[str] = ('followers', 'following'),
+        max_concurrency: int = 8,
+        max_follows: Optional[int] = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be >= 1.')
+        for direction in directions:
+            if direction not in ('followers', 'following'):
+                raise ValueError(f"Unsupported direction '{direction}'.")
+        self.extractor = extractor
+        self.directions = tuple(directions)
+        self.max_concurrency = max_concurrency
+        self.max_follows = max_follows
+        self.visited = IdSet()
+        self.pending = IdSet()
+        self.expanded = 0
+
+    async def acrawl(
+        self,
+        seeds: Iterable[int],
+        hops: int = 0,
+        max_accounts: Optional[int] = None,
+        graph: Optional[FollowGraph] = None,
+    ) -> FollowGraph:
+        """
+        Crawl the follows of `seeds` and `hops` further levels.
+
+        ``hops=0`` fetches the seeds' own follow lists; ``hops=1`` also
+        those of every account found there, and so on. `max_accounts`
+        caps the number of accounts expanded over the whole crawl; the
+        accounts it cuts are kept in ``self.pending`` and crawled along
+        with the seeds of the next call. Edges are appended to `graph` (a
+        new one by default) and accounts already in ``self.visited`` are
+        not expanded again.
+        """
+        if hops < 0:
+            raise ValueError('hops must be >= 0.')
+        graph = graph if graph is not None else FollowGraph()
+        seeds = np.fromiter(seeds, dtype=np.int64)
+        frontier = np.setdiff1d(
+            np.union1d(seeds, self.pending.ids), self.visited.ids
+        )
+        for hop in range(hops + 1):
+            if max_accounts is not None:
+                budget = max(0, max_accounts - self.expanded)
+                self.pending.add(frontier[budget:])
+                frontier = frontier[:budget]
+            if not frontier.size:
+                break
+            # only accounts actually expanded count as visited
+            self.visited.add(frontier)
+            self.pending.discard(frontier)
+            start = len(graph)
+            await self._expand(frontier, graph)
+            self.expanded += int(frontier.size)
+            if hop < hops:
+                frontier = np.setdiff1d(graph.edges[start:], self.visited.ids)
+        return graph
+
+    async def _expand(self, accounts: IdArray, graph: FollowGraph) -> None:
+        """Fetch the follow lists of `accounts` with bounded concurrency."""
+        pending = iter(accounts.tolist())
+
+        async def worker() -> None:
+            for account in pending:
+                for direction in self.directions:
+                    async for ids in self.extractor.aiter_follow_ids(
+                        account, direction, self.max_follows
+                    ):
+                        if direction == 'followers':
+                            graph.add(ids, account)
+                        else:
+                            graph.add(account, ids)
+
+        workers = min(self.max_concurrency, int(accounts.size))
+        tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def crawl(
+    extractor: Any,
+    seeds: Iterable[int],
+    hops: int = 0,
+    directions: Sequence[str] = ('followers', 'following'),
+    max_concurrency: int = 8,
+    max_follows: Optional[int] = None,
+    max_accounts: Optional[int] = None,
+) -> FollowGraph:
+    """Run ``FollowCrawler.acrawl`` to completion and return the graph."""
+    crawler = FollowCrawler(
+        extractor, directions, max_concurrency, max_follows
+    )
+    return asyncio.run(crawler.acrawl(seeds, hops, max_accounts))
@@ -2,31 +2,48 @@
 
 import os
 
-from typing import Any
+from collections.abc import AsyncIterator
+from typing import Any, Optional
 
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
+import requests
 
 from mastodon import Mastodon, MastodonNotFoundError
 
+from mhai.sns.base import SocialMediaExtractorBase
+from mhai.sns.cache import HTTPCache, install_cache
+from mhai.utils import clean_text
 
-class SocialMediaExtractorBase:
-    """Base class for social media extractors."""
 
-    def __init__(self) -> None:
-        pass
+class MastodonExtractor(SocialMediaExtractorBase):
+    """
+    Mastodon extractor class.
 
+    ``aiter_posts`` queries:
+    - ``#tag``: hashtag timeline
+    - ``@user`` or ``@user@instance``: statuses of an account
+    - ``public``: public timeline
+    """
 
-class MastodonExtractor(SocialMediaExtractorBase):
-    """Mastodon extractor class."""
+    platform = 'mastodon'
+    follow_page_size = 80
 
     def __init__(self, client: Mastodon) -> None:
         """Initialize Mastodon extractor."""
         super().__init__()
         self.client = client
+        self._me: Optional[dict[str, Any]] = None
 
     @classmethod
-    def connect(cls) -> 'MastodonExtractor':
-        """Connect to Mastodon using environment-based configuration."""
+    def connect(cls, cache: Optional[HTTPCache] = None) -> 'MastodonExtractor':
+        """
+        Connect to Mastodon using environment-based configuration.
+
+        With `cache`, GET responses are cached on disk and revalidated per
+        endpoint TTL (see ``mhai.sns.cache``).
+        """
         access_token = os.getenv('MASTODON_TOKEN')
         instance_url = os.getenv(
             'MASTODON_INSTANCE', 'https://mastodon.social'
@@ -37,12 +54,21 @@ class MastodonExtractor(SocialMediaExtractorBase):
                 'MASTODON_TOKEN environment variable is not set.'
             )
 
-        client = Mastodon(access_token=access_token, api_base_url=instance_url)
+        session = requests.Session()
+        if cache is not None:
+            install_cache(session, cache)
+        client = Mastodon(
+            access_token=access_token,
+            api_base_url=instance_url,
+            session=session,
+        )
         return cls(client=client)
 
     def get_me(self) -> dict[str, Any]:
-        """Return authenticated user metadata."""
-        return dict(self.client.me())
+        """Return authenticated user metadata (fetched once per instance)."""
+        if self._me is None:
+            self._me = dict(self.client.me())
+        return dict(self._me)
 
     def get_user(self, handle: str) -> dict[str, Any]:
         """Return metadata for a given user handle."""
@@ -76,12 +102,20 @@ class MastodonExtractor(SocialMediaExtractorBase):
         return self._to_dataframe(statuses)
 
     def get_followers(self) -> list[dict[str, Any]]:
-        """Return list of followers of the authenticated user."""
+        """
+        Return the first page of followers of the authenticated user.
+
+        See ``mhai.sns.graph.FollowCrawler`` for complete follow lists.
+        """
         user = self.get_me()
         return [dict(f) for f in self.client.account_followers(user['id'])]
 
     def get_following(self) -> list[dict[str, Any]]:
-        """Return list of accounts followed by the authenticated user."""
+        """
+        Return the first page of accounts followed by the authenticated user.
+
+        See ``mhai.sns.graph.FollowCrawler`` for complete follow lists.
+        """
         user = self.get_me()
         return [dict(f) for f in self.client.account_following(user['id'])]
 
@@ -90,6 +124,96 @@ class MastodonExtractor(SocialMediaExtractorBase):
         notifications = self.client.notifications(limit=limit)
         return [dict(n) for n in notifications]
 
+    async def aiter_posts(
+        self, query: str, limit: Optional[int] = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield normalized statuses for `query`, following pagination."""
+        query = query.strip()
+        page_size = min(self.page_size, limit) if limit else self.page_size
+        if query.startswith('#'):
+            page = await self._call(
+                self.client.timeline_hashtag, query[1:], limit=page_size
+            )
+        elif query.startswith('@'):
+            user = await self._call(self.get_user, query[1:])
+            page = await self._call(
+                self.client.account_statuses, user['id'], limit=page_size
+            )
+        elif query == 'public':
+            page = await self._call(
+                self.client.timeline_public, limit=page_size
+            )
+        else:
+            raise ValueError(
+                f"Unsupported Mastodon query '{query}': "
+                "use '#tag', '@handle' or 'public'."
+            )
+
+        count = 0
+        while page:
+            for status in page:
+                yield self.normalize_status(status)
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+            page = await self._call(self.client.fetch_next, page)
+
+    async def aiter_follow_ids(
+        self,
+        account_id: int,
+        direction: str = 'followers',
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[npt.NDArray[np.int64]]:
+        """
+        Yield the ids of an account's followers or followees, page by page.
+
+        Pagination is followed to the end (or `limit` ids); only the ids are
+        kept, as int64 arrays, so large accounts stay cheap in memory.
+        """
+        if direction == 'followers':
+            fetch = self.client.account_followers
+        elif direction == 'following':
+            fetch = self.client.account_following
+        else:
+            raise ValueError(
+                f"Unsupported direction '{direction}': "
+                "use 'followers' or 'following'."
+            )
+
+        page_size = self.follow_page_size
+        if limit is not None:
+            page_size = min(page_size, limit)
+        page = await self._call(fetch, account_id, limit=page_size)
+        count = 0
+        while page:
+            ids = np.fromiter(
+                (int(account['id']) for account in page),
+                dtype=np.int64,
+                count=len(page),
+            )
+            if limit is not None:
+                ids = ids[: limit - count]
+            count += len(ids)
+            yield ids
+            if limit is not None and count >= limit:
+                return
+            page = await self._call(self.client.fetch_next, page)
+
+    def normalize_status(self, status: dict[str, Any]) -> dict[str, Any]:
+        """Convert a status into a POST_SCHEMA record."""
+        account = status.get('account') or {}
+        return {
+            'platform': self.platform,
+            'post_id': str(status['id']),
+            'user': account.get('acct', ''),
+            'created_at': status['created_at'],
+            'text': clean_text(status['content']),
+            'likes': status['favourites_count'],
+            'shares': status['reblogs_count'],
+            'replies': status['replies_count'],
+            'url': status.get('url') or '',
+        }
+
     def _to_dataframe(self, statuses: list[dict[str, Any]]) -> pd.DataFrame:
         """Convert a list of statuses into a pandas DataFrame."""
         return pd.DataFrame(
@@ -2,22 +2,27 @@
 
 import time
 
+from collections.abc import AsyncIterator
 from datetime import datetime
 from typing import Any, Optional
 
 import pandas as pd
 import tweepy
 
+from mhai.sns.base import SocialMediaExtractorBase
+from mhai.sns.cache import HTTPCache, install_cache
 
-class SocialMediaExtractorBase:
-    """Base class for social media extractors."""
 
-    def __init__(self) -> None:
-        pass
+class Twitter(SocialMediaExtractorBase):
+    """
+    Twitter extractor class (app-only Bearer Token support).
 
+    ``aiter_posts`` takes a recent-search query in Twitter syntax, e.g.
+    ``from:esloch`` or ``#mentalhealth -is:retweet``.
+    """
 
-class Twitter(SocialMediaExtractorBase):
-    """Twitter extractor class (app-only Bearer Token support)."""
+    platform = 'twitter'
+    page_size = 100
 
     def __init__(
         self,
@@ -35,11 +40,19 @@ class Twitter(SocialMediaExtractorBase):
         cls,
         token: str,
         username: str,
+        cache: Optional[HTTPCache] = None,
     ) -> 'Twitter':
-        """Connect to the Twitter API using an app-only Bearer Token."""
+        """
+        Connect to the Twitter API using an app-only Bearer Token.
+
+        With `cache`, GET responses are cached on disk and revalidated per
+        endpoint TTL (see ``mhai.sns.cache``).
+        """
         if not token:
             raise ValueError('Bearer token is required.')
         client = tweepy.Client(bearer_token=token)
+        if cache is not None:
+            install_cache(client.session, cache)
         return cls(client=client, username=username)
 
     def get_user_id(self) -> int:
@@ -108,3 +121,53 @@ class Twitter(SocialMediaExtractorBase):
                 'quotes',
             ],
         )
+
+    async def aiter_posts(
+        self, query: str, limit: Optional[int] = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield normalized recent tweets matching `query`."""
+        count = 0
+        next_token: Optional[str] = None
+        while True:
+            remaining = self.page_size if limit is None else limit - count
+            page = await self._call(
+                self.client.search_recent_tweets,
+                query,
+                tweet_fields=['created_at', 'public_metrics', 'author_id'],
+                expansions=['author_id'],
+                user_fields=['username'],
+                # the API rejects pages of fewer than 10 tweets
+                max_results=max(10, min(self.page_size, remaining)),
+                next_token=next_token,
+            )
+            includes = page.includes or {}
+            users = {u.id: u.username for u in includes.get('users', [])}
+            for tweet in page.data or []:
+                yield self.normalize_tweet(tweet, users)
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+            next_token = (page.meta or {}).get('next_token')
+            if not next_token:
+                return
+
+    def normalize_tweet(
+        self, tweet: Any, users: Optional[dict[Any, str]] = None
+    ) -> dict[str, Any]:
+        """Convert a tweet into a POST_SCHEMA record."""
+        metrics = tweet.public_metrics or {}
+        author = getattr(tweet, 'author_id', None)
+        username = (users or {}).get(author) or (
+            str(author) if author is not None else self.username
+        )
+        return {
+            'platform': self.platform,
+            'post_id': str(tweet.id),
+            'user': username,
+            'created_at': tweet.created_at,
+            'text': tweet.text,
+            'likes': metrics.get('like_count', 0),
+            'shares': metrics.get('retweet_count', 0),
+            'replies': metrics.get('reply_count', 0),
+            'url': f'https://x.com/{username}/status/{tweet.id}',
+        }
@@ -0,0 +1,56 @@
+"""
+Shared helpers module.
+
+Defines:
+- clean_text: strip HTML markup and normalize whitespace in a post
+- env_flag: read a boolean flag from the environment
+- grow: enlarge an array-backed state, doubling its capacity
+"""
+
+from __future__ import annotations
+
+import html
+import os
+import re
+
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+_TRUE_VALUES = ('1', 'true', 'yes', 'on')
+_TAG_RE = re.compile(r'<[^>]+>')
+_BREAK_RE = re.compile(r'<\s*(br|/p)\s*/?>', re.IGNORECASE)
+_SPACE_RE = re.compile(r'\s+')
+
+
+def clean_text(text: Any) -> str:
+    """
+    Return `text` without HTML tags, entities or repeated whitespace.
+
+    Mastodon statuses carry HTML (``<p>``, ``<br>``, links); paragraph and
+    line breaks are kept as single spaces so words do not run together.
+    """
+    if text is None or (isinstance(text, float) and text != text):
+        return ''
+    text = _BREAK_RE.sub(' ', str(text))
+    text = html.unescape(_TAG_RE.sub('', text))
+    return _SPACE_RE.sub(' ', text).strip()
+
+
+def env_flag(name: str, default: bool) -> bool:
+    """Return the environment flag `name` (``1/true/yes/on``), or `default`."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in _TRUE_VALUES
+
+
+def grow(array: npt.NDArray[Any], size: int, fill: Any) -> npt.NDArray[Any]:
+    """Return `array` with at least `size` rows, doubling its capacity."""
+    if size <= array.shape[0]:
+        return array
+    capacity = max(size, 2 * array.shape[0], 16)
+    grown = np.full((capacity, *array.shape[1:]), fill, dtype=array.dtype)
+    grown[: array.shape[0]] = array
+    return grown
@@ -0,0 +1,153 @@
+"""Test suite for the per-user aggregation module."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mhai.aggregation import UserAggregator, UserIndex
+
+
+def _posts(seed: int = 0, n: int = 300) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2024-01-01', tz='UTC')
+    offsets = np.sort(rng.integers(0, 20 * 24 * 3600, n))
+    return pd.DataFrame(
+        {
+            'user': rng.choice(['ana', 'bob', 'cai'], n),
+            'created_at': start + pd.to_timedelta(offsets, unit='s'),
+            'core_anxiety': rng.random(n),
+            'core_depression': rng.random(n),
+        }
+    )
+
+
+def test_user_index_assigns_stable_rows() -> None:
+    """Users keep their rows and unknown users map to -1."""
+    index = UserIndex(['a', 'b'])
+    assert index.rows(['b', 'c', 'a']).tolist() == [1, 2, 0]
+    assert index.get(['c', 'zzz']).tolist() == [2, -1]
+    assert 'a' in index
+    assert len(index) == 3
+
+
+def test_incremental_ewm_matches_pandas() -> None:
+    """Splitting the history into updates matches a full pandas ewm."""
+    posts = _posts()
+    agg = UserAggregator(fast_alpha=0.3, slow_alpha=0.05)
+    agg.update(posts.sample(frac=1, random_state=1))
+    half = len(posts) // 2
+    incremental = UserAggregator(fast_alpha=0.3, slow_alpha=0.05)
+    incremental.update(posts.iloc[:half])
+    incremental.update(posts.iloc[half:])
+
+    features = incremental.features()
+    for user, group in posts.groupby('user'):
+        series = group.sort_values('created_at')['core_anxiety']
+        fast = series.ewm(alpha=0.3, adjust=False).mean().iloc[-1]
+        slow = series.ewm(alpha=0.05, adjust=False).mean().iloc[-1]
+        row = features.loc[user]
+        assert row['ewm_core_anxiety'] == pytest.approx(fast, rel=1e-4)
+        assert row['trend_core_anxiety'] == pytest.approx(
+            fast - slow, abs=1e-4
+        )
+        assert row['n_posts'] == len(group)
+
+    np.testing.assert_allclose(
+        agg.features().sort_index()['ewm_core_depression'],
+        features.sort_index()['ewm_core_depression'],
+        rtol=1e-4,
+    )
+
+
+def test_rolling_mean_matches_brute_force() -> None:
+    """Rolling means cover exactly the last `window` daily buckets."""
+    posts = _posts(seed=3)
+    agg = UserAggregator(window=5)
+    for start in range(0, len(posts), 75):
+        agg.update(posts.iloc[start : start + 75])
+
+    as_of = posts['created_at'].max()
+    features = agg.features(as_of=as_of)
+    first_day = as_of.floor('1D') - pd.Timedelta(days=4)
+    recent = posts[posts['created_at'] >= first_day]
+    expected = recent.groupby('user')['core_anxiety'].mean()
+    counts = recent.groupby('user').size()
+
+    for user, value in expected.items():
+        assert features.loc[user, 'rolling_mean_core_anxiety'] == (
+            pytest.approx(value, rel=1e-5)
+        )
+        assert features.loc[user, 'posts_in_window'] == counts[user]
+
+
+def test_rolling_window_fades_for_inactive_users() -> None:
+    """Users with no posts in the window get empty rolling features."""
+    posts = pd.DataFrame(
+        {
+            'user': ['ana', 'ana', 'bob'],
+            'created_at': pd.to_datetime(
+                ['2024-01-01', '2024-01-02', '2024-01-20']
+            ),
+            'core_anxiety': [0.2, 0.4, 0.9],
+            'core_depression': [0.1, 0.1, 0.1],
+        }
+    )
+    agg = UserAggregator(window=3)
+    agg.update(posts)
+
+    features = agg.features()
+    assert np.isnan(features.loc['ana', 'rolling_mean_core_anxiety'])
+    assert features.loc['ana', 'posts_in_window'] == 0
+    assert features.loc['bob', 'rolling_mean_core_anxiety'] == (
+        pytest.approx(0.9)
+    )
+
+    early = agg.features(as_of='2024-01-02', users=['ana'])
+    assert early.loc['ana', 'rolling_mean_core_anxiety'] == (
+        pytest.approx(0.3)
+    )
+
+
+def test_frequency_change() -> None:
+    """The newest bucket is compared with the mean of the previous ones."""
+    days = ['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-03']
+    posts = pd.DataFrame(
+        {
+            'user': 'ana',
+            'created_at': pd.to_datetime(days),
+            'core_anxiety': 0.5,
+            'core_depression': 0.5,
+        }
+    )
+    agg = UserAggregator(window=3)
+    agg.update(posts)
+
+    row = agg.features().loc['ana']
+    assert row['posts_in_bucket'] == 2
+    assert row['frequency_change'] == pytest.approx(1.0)
+    assert row['volatility_core_anxiety'] == pytest.approx(0.0, abs=1e-6)
+
+
+def test_missing_values_are_skipped() -> None:
+    """Rows without a score are ignored."""
+    posts = _posts(n=10)
+    posts.loc[0, 'core_anxiety'] = np.nan
+    agg = UserAggregator()
+    assert agg.update(posts) == 9
+
+
+def test_save_and_load_roundtrip(tmp_path) -> None:
+    """Persisted state resumes exactly where it stopped."""
+    posts = _posts(seed=5)
+    half = len(posts) // 2
+    agg = UserAggregator(window=4, freq='12h')
+    agg.update(posts.iloc[:half])
+    path = tmp_path / 'state.npz'
+    agg.save(path)
+
+    restored = UserAggregator.load(path)
+    restored.update(posts.iloc[half:])
+    agg.update(posts.iloc[half:])
+
+    pd.testing.assert_frame_equal(restored.features(), agg.features())
+    assert restored.freq == pd.Timedelta('12h')
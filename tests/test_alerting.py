@@ -0,0 +1,120 @@
+"""Test suite for the incremental alerting module."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mhai.alerting import Alert, ChangeDetector
+
+
+def _stable_then_shift(n_stable: int = 30, n_shift: int = 10) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    stable = 0.1 + 0.02 * rng.standard_normal((n_stable, 3))
+    shifted = stable[:n_shift].copy()
+    shifted[:, 1] += 0.6
+    return np.clip(np.vstack([stable, shifted]), 0.0, 1.0)
+
+
+def test_shift_raises_single_category_alert() -> None:
+    """A jump in depression is flagged for that category only."""
+    scores = _stable_then_shift()
+    detector = ChangeDetector()
+
+    alerts = detector.update(['ana'] * len(scores), scores)
+
+    assert alerts
+    assert {a.category for a in alerts} == {'depression'}
+    assert {a.direction for a in alerts} == {'up'}
+    assert all(isinstance(a, Alert) and a.user == 'ana' for a in alerts)
+
+
+def test_stable_scores_raise_nothing() -> None:
+    """Noise around a stable baseline stays quiet."""
+    rng = np.random.default_rng(1)
+    scores = 0.3 + 0.02 * rng.standard_normal((200, 3))
+    detector = ChangeDetector()
+    assert detector.update(['bob'] * 200, scores) == []
+
+
+def test_batched_equals_streamed() -> None:
+    """Interleaved users in one batch match one-post-at-a-time updates."""
+    rng = np.random.default_rng(2)
+    users = rng.choice(['a', 'b', 'c', 'd'], 400).tolist()
+    scores = rng.random((400, 3))
+    scores[300:, 0] += 1.0
+
+    batched = ChangeDetector()
+    batch_alerts = batched.update(users, scores)
+
+    streamed = ChangeDetector()
+    stream_alerts = []
+    for user, row in zip(users, scores):
+        stream_alerts += streamed.update([user], row[None, :])
+
+    assert batch_alerts and len(batch_alerts) == len(stream_alerts)
+    pd.testing.assert_frame_equal(
+        batched.state().sort_index(), streamed.state().sort_index()
+    )
+
+
+def test_update_one_and_frame() -> None:
+    """Core-category dicts and scored frames feed the same state."""
+    detector = ChangeDetector(warmup=0)
+    detector.update_one('ana', {'anxiety': 0.2, 'other': 0.8})
+    frame = pd.DataFrame(
+        {
+            'user': ['ana', 'bob'],
+            'created_at': pd.to_datetime(['2024-01-02', '2024-01-01']),
+            'core_anxiety': [0.25, 0.9],
+            'core_depression': [0.1, None],
+        }
+    )
+    detector.update_frame(frame)
+
+    state = detector.state()
+    assert state.loc['ana', 'posts'] == 2
+    assert state.loc['bob', 'mean_anxiety'] == pytest.approx(0.9)
+    assert state.loc['bob', 'mean_psychosis'] == 0.0
+
+
+def test_timestamps_are_attached() -> None:
+    """Alerts carry the timestamp of the post that triggered them."""
+    scores = _stable_then_shift()
+    stamps = list(range(len(scores)))
+    alerts = ChangeDetector().update(['ana'] * len(scores), scores, stamps)
+    assert all(a.timestamp >= 30 for a in alerts)
+
+
+def test_compact_state_and_roundtrip(tmp_path) -> None:
+    """State is a few bytes per user and survives save/load."""
+    detector = ChangeDetector()
+    users = [f'user{i}' for i in range(1000)]
+    detector.update(users, np.full((1000, 3), 0.1))
+    index = detector.index.nbytes
+    assert index > 0
+    assert detector.nbytes == 1000 * (4 * 3 * 4 + 4) + index
+    # the grown capacity counts, not only the rows in use
+    detector.update(['late'], [[0.1, 0.1, 0.1]])
+    assert detector.nbytes == 2000 * (4 * 3 * 4 + 4) + detector.index.nbytes
+
+    path = tmp_path / 'detector.npz'
+    detector.save(path)
+    restored = ChangeDetector.load(path)
+    pd.testing.assert_frame_equal(restored.state(), detector.state())
+
+
+def test_invalid_shape() -> None:
+    """Scores must have one column per category."""
+    with pytest.raises(ValueError):
+        ChangeDetector().update(['a'], [[0.1, 0.2]])
+
+
+def test_mismatched_lengths() -> None:
+    """Users and timestamps must match the score rows."""
+    detector = ChangeDetector()
+    scores = [[0.1, 0.2, 0.3]] * 2
+    with pytest.raises(ValueError, match='users'):
+        detector.update(['a'], scores)
+    with pytest.raises(ValueError, match='timestamps'):
+        detector.update(['a', 'b'], scores, ['2024-01-01'])
+    assert len(detector.index) == 0
@@ -0,0 +1,170 @@
+"""Test suite for the ArtifactStore class."""
+
+import json
+import os
+
+from typing import Any
+
+import pytest
+
+from mhai.evaluations import artifacts
+from mhai.evaluations.artifacts import (
+    MANIFEST_NAME,
+    ArtifactError,
+    ArtifactStore,
+)
+from mhai.evaluations.base import ModelBase
+from mhai.evaluations.runtime import RuntimeConfig
+
+MODEL_NAME = 'org/tiny-model'
+
+
+class DummyEvaluator(ModelBase):
+    """Evaluator that records how its model would be loaded."""
+
+    default_model_name = MODEL_NAME
+
+    def _load_model(self) -> Any:
+        return (self.model_source, self.pipeline_params())
+
+    def evaluate(self, text: str) -> Any:
+        """Echo the input text."""
+        return text
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    """Fake saved model directory."""
+    src = tmp_path / 'saved'
+    src.mkdir()
+    (src / 'config.json').write_text(json.dumps({'num_labels': 2}))
+    (src / 'model.safetensors').write_bytes(b'\x00' * 64)
+    (src / 'tokenizer.json').write_text('{}')
+    return src
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Empty artifact store."""
+    return ArtifactStore(root=tmp_path / 'artifacts')
+
+
+def test_register_writes_manifest(store, source_dir) -> None:
+    """Register copies files and records their checksums."""
+    path = store.register(MODEL_NAME, source_dir, revision='abc123')
+
+    assert path == store.model_root(MODEL_NAME) / 'abc123'
+    assert store.current_revision(MODEL_NAME) == 'abc123'
+    manifest = json.loads((path / MANIFEST_NAME).read_text())
+    assert set(manifest['files']) == {
+        'config.json',
+        'model.safetensors',
+        'tokenizer.json',
+    }
+    assert store.verify_snapshot(MODEL_NAME) == []
+
+
+def test_resolve_missing_snapshot(store) -> None:
+    """Resolve falls back to None online and raises offline."""
+    assert store.resolve(MODEL_NAME) is None
+
+    store.offline = True
+    with pytest.raises(ArtifactError):
+        store.resolve(MODEL_NAME)
+
+
+def test_resolve_detects_corruption(store, source_dir) -> None:
+    """A modified weight file fails verification."""
+    path = store.register(MODEL_NAME, source_dir)
+    (path / 'model.safetensors').write_bytes(b'\x01' * 64)
+
+    assert store.verify_snapshot(MODEL_NAME) == ['model.safetensors']
+    with pytest.raises(ArtifactError):
+        store.resolve(MODEL_NAME)
+
+    store.verify = False
+    assert store.resolve(MODEL_NAME) == path
+
+
+def test_register_new_revision_moves_current(store, source_dir) -> None:
+    """The latest registered revision becomes the default one."""
+    store.register(MODEL_NAME, source_dir, revision='v1')
+    store.register(MODEL_NAME, source_dir, revision='v2')
+
+    assert store.resolve(MODEL_NAME) == store.model_root(MODEL_NAME) / 'v2'
+    assert (
+        store.resolve(MODEL_NAME, revision='v1')
+        == store.model_root(MODEL_NAME) / 'v1'
+    )
+
+
+def test_from_env(monkeypatch, tmp_path) -> None:
+    """Environment variables configure the store."""
+    monkeypatch.setenv('MHAI_ARTIFACTS_DIR', str(tmp_path))
+    monkeypatch.setenv('MHAI_ARTIFACTS_VERIFY', '0')
+    monkeypatch.setenv('MHAI_OFFLINE', '1')
+
+    store = ArtifactStore.from_env()
+    assert store.root == tmp_path
+    assert store.verify is False
+    assert store.offline is True
+
+
+def test_evaluator_uses_local_snapshot(store, source_dir) -> None:
+    """Evaluators load a registered snapshot offline from safetensors."""
+    cpu = RuntimeConfig(device='cpu')
+    hub = DummyEvaluator(artifacts=store, token='secret', runtime=cpu)
+    assert hub._model == (MODEL_NAME, {'token': 'secret', 'device': 'cpu'})
+
+    path = store.register(MODEL_NAME, source_dir)
+    local = DummyEvaluator(artifacts=store, token='secret', runtime=cpu)
+    source, params = local._model
+    assert source == str(path)
+    assert params['model_kwargs'] == {
+        'use_safetensors': True,
+        'local_files_only': True,
+    }
+    assert 'token' not in params
+
+
+def test_resolve_hashes_only_changed_files(
+    store, source_dir, monkeypatch
+) -> None:
+    """Resolve trusts verified stamps; verify_snapshot always hashes."""
+    path = store.register(MODEL_NAME, source_dir)
+    hashed: list[str] = []
+    sha256 = artifacts._sha256
+    monkeypatch.setattr(
+        artifacts,
+        '_sha256',
+        lambda p: hashed.append(p.name) or sha256(p),
+    )
+
+    assert store.resolve(MODEL_NAME) == path
+    assert hashed == []
+
+    weights = path / 'model.safetensors'
+    weights.write_bytes(b'\x00' * 64)
+    os.utime(weights, ns=(1, 1))
+    assert store.resolve(MODEL_NAME) == path
+    assert hashed == ['model.safetensors']
+    assert store.resolve(MODEL_NAME) == path
+    assert hashed == ['model.safetensors']
+
+    hashed.clear()
+    assert store.verify_snapshot(MODEL_NAME) == []
+    assert len(hashed) == 3
+
+
+def test_register_replaces_revision_in_place(store, source_dir) -> None:
+    """Re-registering a revision swaps it in and leaves no debris."""
+    store.register(MODEL_NAME, source_dir, revision='v1')
+    (source_dir / 'tokenizer.json').write_text('{"v": 2}')
+    path = store.register(MODEL_NAME, source_dir, revision='v1')
+
+    assert (path / 'tokenizer.json').read_text() == '{"v": 2}'
+    assert store.verify_snapshot(MODEL_NAME) == []
+    assert sorted(p.name for p in store.model_root(MODEL_NAME).iterdir()) == [
+        'current',
+        'v1',
+    ]
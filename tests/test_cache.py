@@ -0,0 +1,165 @@
+"""Test suite for the SNS HTTP cache."""
+
+import json
+import threading
+
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, ClassVar
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from mhai.sns.cache import CachePolicy, HTTPCache, install_cache
+from mhai.sns.mastodon import MastodonExtractor
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Serve JSON with an ETag and answer conditional requests with 304."""
+
+    requests: ClassVar[list[dict[str, Any]]] = []
+    etag = '"v1"'
+
+    def do_GET(self) -> None:
+        """Record the request and answer it."""
+        type(self).requests.append(
+            {'path': self.path, 'headers': dict(self.headers)}
+        )
+        if self.headers.get('If-None-Match') == type(self).etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps({'path': self.path}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', type(self).etag)
+        self.send_header('X-RateLimit-Remaining', '299')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        """Answer every POST with an empty JSON object."""
+        type(self).requests.append({'path': self.path, 'headers': {}})
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, *args: Any) -> None:
+        """Silence request logging."""
+
+
+@pytest.fixture
+def server() -> Iterator[str]:
+    """Run the stand-in API on a free local port."""
+    StandIn.requests = []
+    StandIn.etag = '"v1"'
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path) -> Iterator[HTTPCache]:
+    """On-disk cache in a temporary directory."""
+    store = HTTPCache(tmp_path / 'http.sqlite')
+    yield store
+    store.close()
+
+
+def _session(cache: HTTPCache, ttl: float = 60.0) -> requests.Session:
+    session = requests.Session()
+    install_cache(session, cache, CachePolicy([(r'^/api/', ttl)]))
+    return session
+
+
+def test_policy_matches_endpoints() -> None:
+    """The default policy knows both APIs; unknown paths are not cached."""
+    policy = CachePolicy()
+    assert policy.ttl('https://m.social/api/v1/accounts/lookup?acct=a') > 0
+    assert policy.ttl('https://m.social/api/v1/accounts/7/statuses') == 300
+    assert policy.ttl('https://api.x.com/2/tweets/search/recent?q=a') > 0
+    assert policy.ttl('https://m.social/api/v1/notifications') == 0
+    assert policy.ttl('https://m.social/oauth/token') == 0
+
+
+def test_fresh_entries_skip_the_network(server, cache) -> None:
+    """A second GET within the TTL is answered locally."""
+    session = _session(cache)
+    first = session.get(f'{server}/api/a')
+    second = session.get(f'{server}/api/a')
+
+    assert second.json() == first.json() == {'path': '/api/a'}
+    assert second.headers['ETag'] == '"v1"'
+    assert 'X-RateLimit-Remaining' not in second.headers
+    assert len(StandIn.requests) == 1
+    assert cache.stats() == {'hits': 1, 'revalidated': 0, 'misses': 1}
+
+
+def test_stale_entries_are_revalidated(server, cache) -> None:
+    """Expired entries send If-None-Match and reuse the body on 304."""
+    session = _session(cache, ttl=1e-9)
+    session.get(f'{server}/api/a')
+    again = session.get(f'{server}/api/a')
+
+    assert again.status_code == 200
+    assert again.json() == {'path': '/api/a'}
+    assert StandIn.requests[1]['headers']['If-None-Match'] == '"v1"'
+    assert cache.revalidated == 1
+
+    StandIn.etag = '"v2"'
+    changed = session.get(f'{server}/api/a')
+    assert changed.headers['ETag'] == '"v2"'
+    assert cache.misses == 2
+
+
+def test_uncacheable_requests_pass_through(server, cache) -> None:
+    """POSTs and zero-TTL paths always reach the server."""
+    session = _session(cache)
+    session.post(f'{server}/api/a')
+    session.post(f'{server}/api/a')
+    session.get(f'{server}/other')
+    session.get(f'{server}/other')
+
+    assert len(StandIn.requests) == 4
+    assert cache.stats() == {'hits': 0, 'revalidated': 0, 'misses': 0}
+
+
+def test_entries_are_per_token_and_persist(server, tmp_path) -> None:
+    """Different tokens miss; a new cache on the same file hits."""
+    path = tmp_path / 'http.sqlite'
+    first = HTTPCache(path)
+    session = _session(first)
+    session.get(f'{server}/api/a', headers={'Authorization': 'Bearer a'})
+    session.get(f'{server}/api/a', headers={'Authorization': 'Bearer b'})
+    assert first.misses == 2
+    first.close()
+
+    second = HTTPCache(path)
+    _session(second).get(
+        f'{server}/api/a', headers={'Authorization': 'Bearer a'}
+    )
+    assert second.hits == 1
+    assert len(StandIn.requests) == 2
+    second.close()
+
+
+def test_get_me_is_memoized() -> None:
+    """The authenticated account is fetched once per extractor."""
+    client = MagicMock()
+    client.me.return_value = {'id': 7, 'username': 'ana'}
+    client.account_followers.return_value = []
+    client.account_following.return_value = []
+    extractor = MastodonExtractor(client=client)
+
+    extractor.get_me()['id'] = 0
+    extractor.get_followers()
+    extractor.get_following()
+
+    assert extractor.get_me()['id'] == 7
+    client.me.assert_called_once()
@@ -0,0 +1,227 @@
+"""Test suite for the calibration module."""
+
+import sys
+
+from types import SimpleNamespace
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mhai.evaluations.artifacts import ArtifactStore
+from mhai.evaluations.calibration import (
+    apply_temperature,
+    fit_from_csv,
+    fit_temperature,
+)
+from mhai.evaluations.emotion import EmotionEvaluator
+from mhai.evaluations.mental import MentalEvaluator
+
+LABELS = ['joy', 'sadness', 'fear']
+KEYWORDS = {'happy': 0, 'sad': 1, 'scared': 2}
+
+
+class FakePipeline:
+    """Mimic a HF text-classification pipeline with keyword logits."""
+
+    def __init__(self, problem_type: str = 'single_label_classification'):
+        self.model = SimpleNamespace(
+            config=SimpleNamespace(
+                id2label=dict(enumerate(LABELS)),
+                num_labels=len(LABELS),
+                problem_type=problem_type,
+            )
+        )
+        self.calls: list[dict[str, Any]] = []
+
+    def __call__(self, texts: list[str], **kwargs: Any) -> list[Any]:
+        """Return raw logits for every label of every text."""
+        self.calls.append(kwargs)
+        out = []
+        for text in texts:
+            logits = np.full(len(LABELS), -2.0)
+            for word, idx in KEYWORDS.items():
+                if word in text:
+                    logits[idx] = 4.0
+            out.append(
+                [
+                    {'label': label, 'score': float(logit)}
+                    for label, logit in zip(LABELS, logits)
+                ]
+            )
+        return out
+
+
+class FakeEmotion(EmotionEvaluator):
+    """Emotion evaluator backed by the fake pipeline."""
+
+    def _load_model(self) -> Any:
+        return FakePipeline()
+
+
+class FakeMental(MentalEvaluator):
+    """Multi-label evaluator backed by the fake pipeline."""
+
+    def _load_model(self) -> Any:
+        return FakePipeline('multi_label_classification')
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Empty artifact store so no model is resolved locally."""
+    return ArtifactStore(root=tmp_path / 'artifacts')
+
+
+def test_apply_temperature_softmax_and_sigmoid() -> None:
+    """Temperature flattens softmax outputs; sigmoid is element-wise."""
+    logits = np.array([[2.0, 0.0], [0.0, 0.0]])
+    sharp = apply_temperature(logits, 1.0)
+    flat = apply_temperature(logits, 4.0)
+    np.testing.assert_allclose(sharp.sum(axis=1), 1.0)
+    assert flat[0, 0] < sharp[0, 0]
+
+    probs = apply_temperature(logits, 2.0, bias=[0.0, 1.0], multi_label=True)
+    np.testing.assert_allclose(probs, 1 / (1 + np.exp(-(logits / 2 + [0, 1]))))
+
+    with pytest.raises(ValueError):
+        apply_temperature(logits, 0.0)
+
+
+def test_fit_temperature_recovers_true_value() -> None:
+    """Labels drawn at a known temperature are fitted back."""
+    rng = np.random.default_rng(0)
+    logits = 3.0 * rng.standard_normal((20000, 4))
+    probs = apply_temperature(logits, 2.5)
+    labels = (probs.cumsum(axis=1) > rng.random((20000, 1))).argmax(axis=1)
+
+    fitted = fit_temperature(logits, labels)
+
+    assert fitted.temperature == pytest.approx(2.5, rel=0.05)
+    assert fitted.nll_after < fitted.nll_before
+
+
+def test_fit_multi_label_bias() -> None:
+    """A per-label offset is learned for multi-label targets."""
+    rng = np.random.default_rng(1)
+    logits = rng.standard_normal((20000, 2))
+    true_bias = np.array([-1.0, 0.5])
+    probs = apply_temperature(logits, 1.0, true_bias, multi_label=True)
+    targets = (rng.random(probs.shape) < probs).astype(float)
+
+    fitted = fit_temperature(logits, targets, multi_label=True, fit_bias=True)
+
+    assert fitted.temperature == pytest.approx(1.0, rel=0.1)
+    np.testing.assert_allclose(fitted.bias, true_bias, atol=0.1)
+
+
+def test_temperature_must_be_positive(store) -> None:
+    """Evaluators reject non-positive temperatures."""
+    with pytest.raises(ValueError):
+        FakeEmotion(temperature=0.0, artifacts=store)
+
+
+def test_evaluators_apply_calibration(store) -> None:
+    """Evaluator outputs come from calibrated logits in one batch call."""
+    base = FakeEmotion(artifacts=store)
+    hot = FakeEmotion(temperature=10.0, artifacts=store)
+
+    out = base.evaluate_batch(['so happy', 'so sad'])
+    assert [r[0]['label'] for r in out] == ['joy', 'sadness']
+    assert base._model.calls[-1]['function_to_apply'] == 'none'
+    assert len(base._model.calls) == 1
+    assert hot.evaluate('so happy')[0]['score'] < out[0][0]['score']
+
+    biased = FakeEmotion(artifacts=store, label_bias={'fear': 10.0})
+    assert biased.evaluate('so happy')[0]['label'] == 'fear'
+
+    mental = FakeMental(artifacts=store)
+    scores = mental.evaluate('happy and scared')
+    assert mental.multi_label
+    assert scores['joy'] == pytest.approx(scores['fear'])
+    assert scores['joy'] + scores['fear'] > 1.0
+
+
+def test_fit_from_csv_updates_evaluator(store, tmp_path) -> None:
+    """Fitting from a CSV sets the evaluator's temperature."""
+    rows = []
+    rng = np.random.default_rng(2)
+    for i in range(300):
+        word = list(KEYWORDS)[i % 3]
+        # gold label agrees with the keyword 80% of the time
+        label = LABELS[i % 3] if rng.random() < 0.8 else LABELS[(i + 1) % 3]
+        rows.append({'text': f'feeling {word}', 'label': label})
+    path = tmp_path / 'labels.csv'
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+    evaluator = FakeEmotion(artifacts=store)
+    calibration = fit_from_csv(evaluator, path)
+
+    assert calibration.labels == LABELS
+    assert evaluator.temperature == calibration.temperature
+    # logits of 6 apart are overconfident for 80% accuracy
+    assert calibration.temperature > 1.5
+    top = evaluator.evaluate('feeling happy')[0]
+    assert top['score'] == pytest.approx(0.8, abs=0.05)
+
+
+def test_fit_from_csv_skips_unlabeled_rows(store, tmp_path) -> None:
+    """Rows without a gold label do not pull the temperature."""
+    texts = [f'feeling {word}' for word in KEYWORDS] * 50
+    labeled = pd.DataFrame({'text': texts, 'label': [LABELS[1]] * len(texts)})
+    path = tmp_path / 'labels.csv'
+    labeled.to_csv(path, index=False)
+    expected = fit_from_csv(FakeEmotion(artifacts=store), path).temperature
+
+    unlabeled = pd.DataFrame(
+        {'text': ['feeling sad'] * 100, 'label': [None, '', ' '] * 33 + ['']}
+    )
+    pd.concat([labeled, unlabeled]).to_csv(path, index=False)
+    evaluator = FakeEmotion(artifacts=store)
+    calibration = fit_from_csv(evaluator, path)
+    assert calibration.temperature == pytest.approx(expected)
+
+
+def test_fit_from_csv_keeps_none_label(store, tmp_path, monkeypatch) -> None:
+    """A literal 'None' gold label is a label, not a missing value."""
+    monkeypatch.setattr(
+        sys.modules[__name__], 'LABELS', ['joy', 'sad', 'None']
+    )
+    texts = [f'feeling {word}' for word in KEYWORDS] * 20
+    labels = ['joy', 'sad', 'None'] * 20
+    path = tmp_path / 'labels.csv'
+    pd.DataFrame({'text': texts, 'label': labels}).to_csv(path, index=False)
+
+    evaluator = FakeEmotion(artifacts=store)
+    seen: list[int] = []
+    predict = evaluator.predict_logits
+
+    def _predict(texts: list[str], **kwargs: Any) -> Any:
+        seen.append(len(texts))
+        return predict(texts, **kwargs)
+
+    monkeypatch.setattr(evaluator, 'predict_logits', _predict)
+    calibration = fit_from_csv(evaluator, path)
+    assert seen == [len(texts)]
+    assert calibration.labels == ['joy', 'sad', 'None']
+
+
+def test_fit_from_csv_multi_label(store, tmp_path) -> None:
+    """Multi-label gold labels are separated by semicolons."""
+    path = tmp_path / 'labels.csv'
+    pd.DataFrame(
+        {
+            'text': ['happy scared', 'sad', 'happy'] * 20,
+            'label': ['joy;fear', 'sadness', 'joy'] * 20,
+        }
+    ).to_csv(path, index=False)
+
+    evaluator = FakeMental(artifacts=store)
+    calibration = fit_from_csv(evaluator, path, fit_bias=True)
+
+    assert set(evaluator.label_bias) == set(LABELS)
+    assert calibration.nll_after <= calibration.nll_before
+
+    pd.DataFrame({'text': ['x'], 'label': ['anger']}).to_csv(path)
+    with pytest.raises(ValueError):
+        fit_from_csv(evaluator, path)
@@ -0,0 +1,226 @@
+"""Test suite for the cascade evaluator."""
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from mhai.cli import main
+from mhai.evaluations.artifacts import ArtifactStore
+from mhai.evaluations.cascade import CascadeEvaluator, top_label
+from mhai.evaluations.mental import MentalEvaluator
+from mhai.evaluations.sentiment import SentimentEvaluator
+from mhai.pipeline import ListSink, Pipeline, evaluator_stage
+
+
+class KeywordPipeline:
+    """Fake text-classification pipeline with keyword-driven logits."""
+
+    def __init__(self, keywords: dict[str, list[float]], base: list[float]):
+        labels = list(self.labels)
+        self.keywords = keywords
+        self.base = base
+        self.texts: list[str] = []
+        self.model = SimpleNamespace(
+            config=SimpleNamespace(
+                id2label=dict(enumerate(labels)),
+                num_labels=len(labels),
+                problem_type='single_label_classification',
+            )
+        )
+
+    labels: tuple[str, ...] = ()
+
+    def __call__(self, texts: list[str], **kwargs: Any) -> list[Any]:
+        """Return logits of the first matching keyword, or the base."""
+        self.texts.extend(texts)
+        out = []
+        for text in texts:
+            logits = next(
+                (v for k, v in self.keywords.items() if k in text), self.base
+            )
+            out.append(
+                [
+                    {'label': label, 'score': score}
+                    for label, score in zip(self.labels, logits)
+                ]
+            )
+        return out
+
+
+class GatePipeline(KeywordPipeline):
+    """SST-2 style gate: 'sad' is negative, 'meh' is a coin flip."""
+
+    labels = ('NEGATIVE', 'POSITIVE')
+
+
+class ExpertPipeline(KeywordPipeline):
+    """GoEmotions style expert."""
+
+    labels = ('neutral', 'sadness', 'fear')
+
+
+class FakeGate(SentimentEvaluator):
+    """Sentiment gate backed by the fake pipeline."""
+
+    def _load_model(self) -> Any:
+        return GatePipeline(
+            {'sad': [3.0, -3.0], 'meh': [0.0, 0.1]}, base=[-3.0, 3.0]
+        )
+
+
+class FakeExpert(MentalEvaluator):
+    """Expert backed by the fake pipeline."""
+
+    def _load_model(self) -> Any:
+        return ExpertPipeline(
+            {'sad': [-2.0, 4.0, 0.0], 'scared': [-2.0, 0.0, 4.0]},
+            base=[4.0, -2.0, -2.0],
+        )
+
+
+TEXTS = [
+    'lovely walk today',
+    'so sad and alone',
+    'meh, whatever',
+    'great coffee',
+    'happy but scared of tomorrow',
+    'nice weather',
+]
+
+
+@pytest.fixture
+def cascade(tmp_path) -> CascadeEvaluator:
+    """Cascade of fake models with an empty artifact store."""
+    store = ArtifactStore(root=tmp_path)
+    return CascadeEvaluator(
+        FakeGate(artifacts=store),
+        [FakeExpert(artifacts=store)],
+        skipped_labels=['neutral'],
+    )
+
+
+def test_top_label_handles_result_shapes() -> None:
+    """Every evaluator result shape yields its best label."""
+    assert top_label({'label': 'POSITIVE', 'score': 0.9}) == 'POSITIVE'
+    assert top_label({'joy': 0.1, 'fear': 0.7}) == 'fear'
+    assert (
+        top_label(
+            [[{'label': 'a', 'score': 0.2}, {'label': 'b', 'score': 0.5}]]
+        )
+        == 'b'
+    )
+
+
+def test_only_risky_or_uncertain_texts_reach_experts(cascade) -> None:
+    """Negative and uncertain texts are forwarded; the rest skip experts."""
+    results = cascade.evaluate_batch(TEXTS)
+
+    assert [r['forwarded'] for r in results] == [
+        False,
+        True,
+        True,
+        False,
+        False,
+        False,
+    ]
+    expert = cascade.experts[0]._model
+    assert expert.texts == ['so sad and alone', 'meh, whatever']
+    assert results[0]['experts'] == [None]
+    assert results[1]['experts'][0]['sadness'] > 0.9
+    assert results[1]['gate']['label'] == 'NEGATIVE'
+    assert cascade.stats.as_dict() == {
+        'texts': 6,
+        'forwarded': 2,
+        'forwarded_fraction': 0.3333,
+    }
+
+
+def test_thresholds_control_forwarding(tmp_path) -> None:
+    """Lower thresholds forward more texts; invalid ones are rejected."""
+    store = ArtifactStore(root=tmp_path)
+    gate, expert = FakeGate(artifacts=store), FakeExpert(artifacts=store)
+
+    everything = CascadeEvaluator(gate, [expert], risk_threshold=0.0)
+    assert all(r['forwarded'] for r in everything.evaluate_batch(TEXTS))
+    risk_only = CascadeEvaluator(gate, [expert], uncertainty_threshold=1.0)
+    forwarded = [r['forwarded'] for r in risk_only.evaluate_batch(TEXTS)]
+    assert sum(forwarded) == 1
+
+    with pytest.raises(ValueError):
+        CascadeEvaluator(gate, [expert], risk_threshold=2.0)
+    with pytest.raises(ValueError):
+        CascadeEvaluator(gate, [expert], skipped_labels=['a', 'b'])
+    with pytest.raises(ValueError, match='gate label'):
+        CascadeEvaluator(gate, [expert], risk_labels=['anger']).evaluate('x')
+
+
+def test_agreement_reports_missed_texts(cascade) -> None:
+    """The confident-positive but fearful text is the one miss."""
+    report = cascade.agreement(TEXTS)
+
+    assert report['forwarded'] == 2
+    [expert] = report['experts']
+    assert expert['skipped_label'] == 'neutral'
+    assert expert['flagged'] == 2
+    assert expert['missed'] == 1
+    assert expert['recall'] == pytest.approx(0.5)
+    assert expert['agreement'] == pytest.approx(5 / 6)
+
+
+def test_agreement_without_texts(cascade) -> None:
+    """An empty sample gives a zeroed report instead of raising."""
+    report = cascade.agreement([])
+
+    assert report['texts'] == report['forwarded'] == 0
+    [expert] = report['experts']
+    assert expert['flagged'] == expert['missed'] == 0
+    assert expert['skipped_label'] == 'neutral'
+
+
+def test_cascade_in_pipeline(cascade) -> None:
+    """Columns of skipped texts hold gate and routing data only."""
+    sink = ListSink()
+    Pipeline(
+        [{'text': t} for t in TEXTS], [evaluator_stage(cascade)], sink
+    ).run()
+    frame = sink.to_dataframe()
+
+    assert frame['cascade_forwarded'].sum() == 2
+    assert frame['sentiment_label'].iloc[0] == 'POSITIVE'
+    assert frame['mental_sadness'].notna().sum() == 2
+    assert frame['cascade_risk'].iloc[1] > 0.99
+
+
+def test_cascade_provenance_and_threads(cascade) -> None:
+    """The cascade delegates provenance and thread budgets to its models."""
+    provenance = cascade.provenance()
+    assert provenance['model_name'] == (
+        'distilbert-base-uncased-finetuned-sst-2-english>'
+        + cascade.experts[0].model_name
+    )
+    assert (
+        provenance
+        != CascadeEvaluator(
+            cascade.gate, cascade.experts, risk_threshold=0.9
+        ).provenance()
+    )
+    assert cascade.output_prefixes() == (
+        'sentiment_',
+        'cascade_',
+        'mental_',
+    )
+
+    cascade.set_threads(2)
+    assert cascade.gate.runtime.threads == 2
+    assert cascade.experts[0].runtime.threads == 2
+
+
+def test_cli_cascade_rejects_model_name(tmp_path, capsys) -> None:
+    """The cascade has no single model to override."""
+    src = tmp_path / 'posts.csv'
+    src.write_text('text\nhello\n')
+    args = ['score', str(src), '--out', str(tmp_path / 'out.csv')]
+    args += ['--evaluators', 'cascade', '--model', 'cascade=other/model']
+    assert main(args) == 2
+    assert 'no model name' in capsys.readouterr().err
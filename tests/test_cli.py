@@ -0,0 +1,353 @@
+"""End-to-end tests for the ``mhai`` command line."""
+
+import json
+import subprocess
+import sys
+import threading
+
+from collections.abc import Sequence
+from typing import Any, ClassVar, Optional
+
+import pandas as pd
+import pytest
+
+from mhai import cli
+from mhai.cli import (
+    ROW_COLUMN,
+    FileSink,
+    count_rows,
+    main,
+    read_output,
+    scored_rows,
+)
+from mhai.evaluations.artifacts import ArtifactStore
+from mhai.evaluations.base import ModelBase
+
+FAKE = 'tests.test_cli:KeywordEvaluator'
+
+
+class KeywordEvaluator(ModelBase):
+    """Tiny local evaluator: 'sad' texts are negative."""
+
+    default_model_name = 'test/keyword'
+    column_prefix = 'keyword'
+    seen: ClassVar[list[str]] = []
+    lock = threading.Lock()
+
+    def _load_model(self) -> Any:
+        return None
+
+    def evaluate(self, text: str) -> Any:
+        """Score a single text."""
+        return self.evaluate_batch([text])[0]
+
+    def evaluate_batch(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> list[Any]:
+        """Label texts containing 'sad' as negative."""
+        with self.lock:
+            type(self).seen.extend(texts)
+        return [
+            {'label': 'NEGATIVE' if 'sad' in t else 'POSITIVE', 'score': 0.9}
+            for t in texts
+        ]
+
+
+class LengthEvaluator(KeywordEvaluator):
+    """Second evaluator scoring text length."""
+
+    column_prefix = 'length'
+
+    def evaluate_batch(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> list[Any]:
+        """Return the length of every text."""
+        return [{'label': 'chars', 'score': len(t)} for t in texts]
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    """Use an empty artifact store and reset the seen texts."""
+    monkeypatch.setenv('MHAI_ARTIFACTS_DIR', str(tmp_path / 'artifacts'))
+    KeywordEvaluator.seen = []
+
+
+def _posts(n: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            'user': [f'u{i % 3}' for i in range(n)],
+            'text': [
+                f'post {i} is {"sad" if i % 2 else "fine"}' for i in range(n)
+            ],
+        }
+    )
+
+
+def test_score_csv_with_two_evaluators(tmp_path, capsys) -> None:
+    """Every row is scored by every evaluator, with row ids and progress."""
+    src = tmp_path / 'posts.csv'
+    _posts(50).to_csv(src, index=False)
+    out = tmp_path / 'scores.csv'
+
+    code = main(
+        [
+            'score',
+            str(src),
+            '--evaluators',
+            f'{FAKE},tests.test_cli:LengthEvaluator',
+            '--batch-size',
+            '8',
+            '--chunk-size',
+            '16',
+            '--out',
+            str(out),
+        ]
+    )
+
+    assert code == 0
+    frame = pd.read_csv(out).sort_values('row_id')
+    assert list(frame['row_id']) == list(range(50))
+    assert set(frame.columns) >= {
+        'user',
+        'text',
+        'keyword_label',
+        'keyword_score',
+        'length_score',
+    }
+    assert (frame['keyword_label'] == 'NEGATIVE').sum() == 25
+    assert frame['length_score'].iloc[0] == len('post 0 is fine')
+    err = capsys.readouterr().err
+    assert '50/50 rows (100.0%)' in err
+    assert 'rows/s' in err
+
+
+def test_score_jsonl_with_workers(tmp_path) -> None:
+    """Concurrent workers may reorder rows but never drop or repeat them."""
+    src = tmp_path / 'posts.jsonl'
+    _posts(101).to_json(src, orient='records', lines=True)
+    out = tmp_path / 'scores.jsonl'
+
+    args = ['score', str(src), '--evaluators', FAKE, '--out', str(out)]
+    assert main([*args, '--workers', '3', '--batch-size', '4']) == 0
+
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert sorted(r['row_id'] for r in rows) == list(range(101))
+    assert count_rows(src) == 101
+    assert len(KeywordEvaluator.seen) == 101
+
+
+@pytest.mark.parametrize('suffix', ['csv', 'jsonl'])
+def test_score_keeps_na_like_texts(tmp_path, suffix) -> None:
+    """Posts reading "None", "NA" or "null" are scored as written."""
+    texts = ['None', 'NA', 'null', 'sad', '007']
+    src = tmp_path / f'posts.{suffix}'
+    frame = pd.DataFrame({'text': texts})
+    if suffix == 'csv':
+        frame.to_csv(src, index=False)
+    else:
+        frame.to_json(src, orient='records', lines=True)
+    out = tmp_path / f'scores.{suffix}'
+
+    args = ['score', str(src), '--evaluators', FAKE, '--out', str(out)]
+    assert main(args) == 0
+    assert sorted(KeywordEvaluator.seen) == sorted(texts)
+    result = read_output(out).sort_values(ROW_COLUMN)
+    assert result['text'].tolist() == texts
+
+
+def test_score_resumes_from_partial_output(tmp_path) -> None:
+    """Rows present in the output are skipped; a torn last line is redone."""
+    src = tmp_path / 'posts.csv'
+    _posts(30).to_csv(src, index=False)
+    out = tmp_path / 'scores.csv'
+    args = ['score', str(src), '--evaluators', FAKE, '--out', str(out)]
+    assert main(args) == 0
+
+    full = pd.read_csv(out)
+    lines = out.read_text().splitlines(keepends=True)
+    # keep the header and 10 rows, then half of the next line
+    out.write_text(''.join(lines[:11]) + lines[11][:5])
+    assert scored_rows(out).tolist() == list(range(10))
+
+    KeywordEvaluator.seen = []
+    assert main(args) == 0
+    resumed = pd.read_csv(out)
+    assert len(KeywordEvaluator.seen) == 20
+    assert sorted(resumed['row_id']) == list(range(30))
+    pd.testing.assert_frame_equal(
+        resumed.sort_values('row_id', ignore_index=True),
+        full.sort_values('row_id', ignore_index=True),
+    )
+
+    KeywordEvaluator.seen = []
+    assert main([*args, '--overwrite']) == 0
+    assert len(KeywordEvaluator.seen) == 30
+
+
+def test_scored_rows_skips_blank_jsonl_lines(tmp_path) -> None:
+    """Blank lines in a jsonl output are not parsed as rows."""
+    out = tmp_path / 'scores.jsonl'
+    rows = [json.dumps({ROW_COLUMN: i}) for i in (2, 0)]
+    out.write_text(f'{rows[0]}\n\n  \n{rows[1]}\n')
+    assert scored_rows(out).tolist() == [0, 2]
+
+
+def test_score_parquet(tmp_path) -> None:
+    """Parquet input is streamed and output written as part files."""
+    pytest.importorskip('pyarrow')
+    src = tmp_path / 'posts.parquet'
+    _posts(40).to_parquet(src)
+    out = tmp_path / 'scores.parquet'
+
+    args = ['score', str(src), '--evaluators', FAKE, '--out', str(out)]
+    assert main([*args, '--chunk-size', '7']) == 0
+    assert count_rows(src) == 40
+    assert sorted(pd.read_parquet(out)['row_id']) == list(range(40))
+    assert main(args) == 0
+    assert len(KeywordEvaluator.seen) == 40
+
+
+def test_score_reports_errors(tmp_path, capsys) -> None:
+    """Bad evaluators, columns and file types exit with status 2."""
+    src = tmp_path / 'posts.csv'
+    _posts(3).to_csv(src, index=False)
+    out = str(tmp_path / 'out.csv')
+
+    assert main(['score', str(src), '--evaluators', 'nope', '--out', out]) == 2
+    assert "Unknown evaluator 'nope'" in capsys.readouterr().err
+    assert (
+        main(
+            [
+                'score',
+                str(src),
+                '--evaluators',
+                FAKE,
+                '--text-column',
+                'body',
+                '--out',
+                out,
+            ]
+        )
+        == 2
+    )
+    assert main(['score', str(src), '--out', 'x.txt']) == 2
+    with pytest.raises(SystemExit):
+        main(['score', str(src), '--out', out, '--workers', '0'])
+
+
+TINY_VOCAB = [
+    '[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]',
+    'post', 'is', 'sad', 'fine', 'i', 'feel', 'so', 'today',
+    *map(str, range(40)),
+]  # fmt: skip
+
+
+@pytest.fixture
+def tiny_bert(tmp_path, monkeypatch):
+    """Register a randomly initialized local BERT as the sentiment model."""
+    torch = pytest.importorskip('torch')
+    transformers = pytest.importorskip('transformers')
+    from mhai.evaluations.sentiment import SentimentEvaluator
+
+    saved = tmp_path / 'tiny-bert'
+    saved.mkdir()
+    vocab = saved / 'vocab.txt'
+    vocab.write_text('\n'.join(TINY_VOCAB) + '\n')
+    tokenizer = transformers.BertTokenizerFast(vocab_file=str(vocab))
+    config = transformers.BertConfig(
+        vocab_size=len(TINY_VOCAB),
+        hidden_size=16,
+        num_hidden_layers=1,
+        num_attention_heads=2,
+        intermediate_size=32,
+        max_position_embeddings=64,
+        id2label={0: 'NEGATIVE', 1: 'POSITIVE'},
+        label2id={'NEGATIVE': 0, 'POSITIVE': 1},
+    )
+    torch.manual_seed(0)
+    model = transformers.BertForSequenceClassification(config).eval()
+    model.save_pretrained(saved, safe_serialization=True)
+    tokenizer.save_pretrained(saved)
+
+    ArtifactStore(root=tmp_path / 'artifacts').register(
+        SentimentEvaluator.default_model_name, saved
+    )
+    monkeypatch.setenv('MHAI_OFFLINE', '1')
+    monkeypatch.setenv('HF_HUB_OFFLINE', '1')
+    monkeypatch.setenv('MHAI_DEVICE', 'cpu')
+
+    def probabilities(texts: list[str]) -> Any:
+        encoded = tokenizer(texts, padding=True, return_tensors='pt')
+        with torch.no_grad():
+            return model(**encoded).logits.softmax(-1).numpy()
+
+    return probabilities
+
+
+def test_score_with_local_hf_model(tmp_path, tiny_bert) -> None:
+    """A real pipeline loaded from the artifact store scores in batches."""
+    src = tmp_path / 'posts.csv'
+    posts = _posts(21)
+    posts.to_csv(src, index=False)
+    out = tmp_path / 'scores.csv'
+
+    args = ['score', str(src), '--evaluators', 'sentiment', '--out', str(out)]
+    assert main([*args, '--batch-size', '4']) == 0
+
+    frame = read_output(out).sort_values(ROW_COLUMN)
+    probs = tiny_bert(posts['text'].tolist())
+    labels = ['NEGATIVE', 'POSITIVE']
+    assert frame['sentiment_label'].tolist() == [
+        labels[i] for i in probs.argmax(axis=1)
+    ]
+    assert frame['sentiment_score'].to_numpy() == pytest.approx(
+        probs.max(axis=1), abs=1e-5
+    )
+
+
+def test_help_does_not_import_models() -> None:
+    """``mhai score --help`` starts without transformers or torch."""
+    code = (
+        'import sys\n'
+        'from mhai.cli import main\n'
+        'try:\n'
+        "    main(['score', '--help'])\n"
+        'except SystemExit:\n'
+        '    pass\n'
+        "print(sorted(m for m in ('torch', 'transformers', 'pandas')"
+        ' if m in sys.modules))\n'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert '--evaluators' in result.stdout
+    assert result.stdout.strip().splitlines()[-1] == '[]'
+
+
+def test_csv_sink_widens_header_atomically(tmp_path, monkeypatch) -> None:
+    """A failed header rewrite leaves the rows already written intact."""
+    out = tmp_path / 'out.csv'
+    sink = FileSink(out)
+    sink([{ROW_COLUMN: 0, 'text': 'a'}, {ROW_COLUMN: 1, 'text': 'None'}])
+    before = out.read_text()
+
+    def crash(src: Any, dst: Any) -> None:
+        raise OSError('disk full')
+
+    monkeypatch.setattr(cli.os, 'replace', crash)
+    with pytest.raises(OSError):
+        sink([{ROW_COLUMN: 2, 'text': 'c', 'keyword_label': 'POSITIVE'}])
+    assert out.read_text() == before
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['out.csv']
+
+    monkeypatch.undo()
+    sink = FileSink(out)
+    sink([{ROW_COLUMN: 2, 'text': 'c', 'keyword_label': 'POSITIVE'}])
+    frame = read_output(out)
+    assert list(frame.columns) == [ROW_COLUMN, 'text', 'keyword_label']
+    assert frame['text'].tolist() == ['a', 'None', 'c']
+    assert frame[ROW_COLUMN].tolist() == [0, 1, 2]
+    assert frame['keyword_label'].isna().tolist() == [True, True, False]
@@ -0,0 +1,219 @@
+"""Test suite for embeddings, the embedding store and the IVF index."""
+
+import zlib
+
+from types import SimpleNamespace
+from typing import Any
+
+import numpy as np
+import pytest
+
+from mhai.embeddings import EmbeddingStore, IVFIndex, embedding_stage
+from mhai.evaluations.artifacts import ArtifactStore
+from mhai.evaluations.base import ModelBase, pool_hidden_states
+from mhai.pipeline import ListSink, Pipeline
+
+DIM = 8
+
+
+class WordVectorEvaluator(ModelBase):
+    """Evaluator whose hidden states are fixed random word vectors."""
+
+    default_model_name = 'test/words'
+
+    def _load_model(self) -> Any:
+        return SimpleNamespace(
+            model=SimpleNamespace(config=SimpleNamespace(hidden_size=DIM))
+        )
+
+    def evaluate(self, text: str) -> Any:
+        """Not used."""
+        raise NotImplementedError
+
+    def _hidden_states(self, texts):
+        tokens = [text.split() for text in texts]
+        width = max(len(t) for t in tokens)
+        hidden = np.zeros((len(texts), width, DIM), dtype=np.float32)
+        mask = np.zeros((len(texts), width), dtype=bool)
+        for i, words in enumerate(tokens):
+            for j, word in enumerate(words):
+                rng = np.random.default_rng(zlib.crc32(word.encode()))
+                hidden[i, j] = rng.normal(size=DIM)
+                mask[i, j] = True
+        return hidden, mask
+
+
+def clustered(n: int, dim: int = 16, centers: int = 20, seed: int = 0):
+    """Return `n` unit vectors around random centers."""
+    rng = np.random.default_rng(seed)
+    means = rng.normal(size=(centers, dim))
+    data = means[rng.integers(centers, size=n)] + 0.3 * rng.normal(
+        size=(n, dim)
+    )
+    return (data / np.linalg.norm(data, axis=1, keepdims=True)).astype(
+        np.float32
+    )
+
+
+def test_pooling_ignores_padding() -> None:
+    """Mean pooling averages kept tokens; cls takes the first token."""
+    hidden = np.asarray([[[1.0, 1.0], [3.0, 5.0], [100.0, 100.0]]])
+    mask = np.asarray([[1, 1, 0]])
+    assert pool_hidden_states(hidden, mask).tolist() == [[2.0, 3.0]]
+    assert pool_hidden_states(hidden, mask, 'cls').tolist() == [[1.0, 1.0]]
+    with pytest.raises(ValueError):
+        pool_hidden_states(hidden, mask, 'max')
+
+
+def test_embed_is_batch_independent(tmp_path) -> None:
+    """Embeddings are unit length and do not depend on padding."""
+    evaluator = WordVectorEvaluator(artifacts=ArtifactStore(root=tmp_path))
+    texts = ['so sad', 'so sad and so very alone tonight', 'sad so']
+    together = evaluator.embed(texts, batch_size=3)
+    apart = evaluator.embed(texts, batch_size=1)
+
+    np.testing.assert_allclose(together, apart, atol=1e-6)
+    np.testing.assert_allclose(np.linalg.norm(together, axis=1), 1.0)
+    np.testing.assert_allclose(together[0], together[2], atol=1e-6)
+    assert evaluator.embed([]).shape == (0, DIM)
+
+
+def test_store_appends_and_reopens(tmp_path) -> None:
+    """Rows keep their ids across appends and reopening."""
+    store = EmbeddingStore(tmp_path / 'store', dim=4, model_name='m')
+    first = store.append(np.eye(4))
+    second = store.append(np.ones((2, 4)))
+    assert first.tolist() == [0, 1, 2, 3]
+    assert second.tolist() == [4, 5]
+
+    reopened = EmbeddingStore(tmp_path / 'store')
+    assert len(reopened) == 6
+    assert reopened.vectors.dtype == np.float16
+    assert reopened.read([5, 1]).tolist() == [[1.0] * 4, [0, 1, 0, 0]]
+    with pytest.raises(ValueError):
+        EmbeddingStore(tmp_path / 'store', dim=8)
+    with pytest.raises(ValueError):
+        EmbeddingStore(tmp_path / 'store', model_name='other')
+    with pytest.raises(ValueError):
+        store.append(np.ones((1, 3)))
+
+
+def test_stores_sharing_a_root_append_at_eof(tmp_path) -> None:
+    """Two stores on one root neither overwrite rows nor go stale."""
+    a = EmbeddingStore(tmp_path / 'store', dim=4)
+    b = EmbeddingStore(tmp_path / 'store')
+    assert a.append(np.zeros((2, 4))).tolist() == [0, 1]
+    assert len(b) == 2
+    assert b.append(np.ones((1, 4))).tolist() == [2]
+    assert a.append(np.full((1, 4), 2.0)).tolist() == [3]
+    assert len(a) == len(b) == 4
+    assert b.read([0, 2, 3])[:, 0].tolist() == [0.0, 1.0, 2.0]
+
+    # a row torn by an interrupted append is dropped, not built upon
+    with a.path.open('ab') as fh:
+        fh.write(b'\x00' * 3)
+    assert len(b) == 4
+    assert b.append(np.full((1, 4), 3.0)).tolist() == [4]
+    assert a.read([4]).tolist() == [[3.0] * 4]
+
+
+def test_ivf_search_matches_exact_search(tmp_path) -> None:
+    """Probing every list is exact; a few lists keep high recall."""
+    data = clustered(3000)
+    index = IVFIndex(EmbeddingStore(tmp_path, dim=16), n_lists=32)
+    index.add(data)
+    queries = data[:50]
+
+    exact_ids, exact_scores = index.exact_search(queries, k=10)
+    ids, scores = index.search(queries, k=10, n_probe=32)
+    np.testing.assert_allclose(scores, exact_scores, atol=1e-5)
+    assert (ids[:, 0] == np.arange(50)).all()
+
+    ids, _ = index.search(queries, k=10, n_probe=4)
+    recall = np.mean(
+        [len(set(a) & set(b)) / 10 for a, b in zip(ids, exact_ids)]
+    )
+    assert recall > 0.9
+    assert sum(index.list_ids(j).size for j in range(32)) == len(index)
+
+
+def test_incremental_adds_and_persistence(tmp_path) -> None:
+    """Rows appended later are searchable and survive save/load."""
+    store = EmbeddingStore(tmp_path / 'store', dim=16)
+    index = IVFIndex(store, n_lists=16, n_probe=16)
+    data = clustered(1200, seed=1)
+    index.add(data[:1000])
+    store.append(data[1000:])
+    assert index.sync() == 200
+    assert index.sync() == 0
+
+    ids, _ = index.search(data[1100], k=1)
+    assert ids.tolist() == [[1100]]
+    index.save(tmp_path / 'index.npz')
+    loaded = IVFIndex.load(tmp_path / 'index.npz', store)
+    assert len(loaded) == 1200
+    assert loaded.search(data[1100], k=3)[0].tolist() == (
+        index.search(data[1100], k=3)[0].tolist()
+    )
+
+
+def test_small_first_add_stays_flat_then_trains(tmp_path) -> None:
+    """A small first add does not fix the number of lists for good."""
+    store = EmbeddingStore(tmp_path / 'store', dim=16)
+    index = IVFIndex(store, n_lists=16, n_probe=2, train_per_list=8)
+    data = clustered(2000, seed=2)
+    index.add(data[:5])
+    assert not index.trained
+    assert index.n_lists == 16
+    ids, scores = index.search(data[0], k=8)
+    assert ids[0, 0] == 0
+    assert ids[0, 5:].tolist() == [-1, -1, -1]
+    assert np.isinf(scores[0, 5:]).all()
+
+    index.save(tmp_path / 'flat.npz')
+    flat = IVFIndex.load(tmp_path / 'flat.npz', store)
+    assert not flat.trained
+    assert flat.n_lists == 16
+    assert flat.search(data[3], k=1)[0].tolist() == [[3]]
+
+    index.add(data[5:])
+    assert index.trained
+    assert len(index.centroids) == 16
+    sizes = [index.list_ids(j).size for j in range(16)]
+    assert sum(sizes) == 2000
+    # two probed lists hold a fraction of the corpus, not all of it
+    assert max(sizes) < 1000
+    assert index.search(data[1500], k=1)[0].tolist() == [[1500]]
+
+    # centroids trained on too few rows are replaced once the store grows
+    grown = IVFIndex(EmbeddingStore(tmp_path / 'grown', dim=16), n_lists=16)
+    grown.train(data[:4])
+    grown.add(data[:1024])
+    assert len(grown.centroids) == 16
+
+
+def test_embedding_stage_fills_store(tmp_path) -> None:
+    """Records get the store row of their embedding."""
+    evaluator = WordVectorEvaluator(artifacts=ArtifactStore(root=tmp_path))
+    store = EmbeddingStore(
+        tmp_path / 'store', dim=DIM, model_name=evaluator.model_name
+    )
+    texts = [f'post number {i}' for i in range(25)]
+    sink = ListSink()
+    Pipeline(
+        [{'text': t} for t in texts],
+        [embedding_stage(evaluator, store, workers=2)],
+        sink,
+        batch_size=4,
+    ).run()
+
+    frame = sink.to_dataframe()
+    assert sorted(frame['embedding_id']) == list(range(25))
+    index = IVFIndex(store, n_lists=4, n_probe=4)
+    index.sync()
+    row = frame.loc[frame['text'] == 'post number 7', 'embedding_id'].item()
+    query = evaluator.embed(['post number 7'])
+    assert index.search(query, k=1)[0].tolist() == [[row]]
+
+    with pytest.raises(ValueError):
+        embedding_stage(evaluator, EmbeddingStore(tmp_path / 'o', 8, 'x'))
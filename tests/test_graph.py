@@ -0,0 +1,153 @@
+"""Test suite for the follow graph crawler."""
+
+import asyncio
+import time
+
+from typing import Any, Optional
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from mhai.sns.graph import FollowCrawler, FollowGraph, IdSet, crawl
+from mhai.sns.mastodon import MastodonExtractor
+
+# account -> accounts it follows
+FOLLOWS = {
+    1: [2, 3],
+    2: [3, 4],
+    3: [1],
+    4: [5],
+    5: [],
+}
+
+
+class Page(list):
+    """API page carrying a link to the next one, like Mastodon.py's."""
+
+    next_page: Optional['Page'] = None
+
+
+def _pages(ids: list[int], size: int) -> Page:
+    pages = [
+        Page({'id': str(i)} for i in ids[k : k + size])
+        for k in range(0, len(ids), size)
+    ]
+    for page, following in zip(pages, pages[1:]):
+        page.next_page = following
+    return pages[0] if pages else Page()
+
+
+def _extractor(size: int = 1, delay: float = 0.0) -> MastodonExtractor:
+    followers: dict[int, list[int]] = {a: [] for a in FOLLOWS}
+    for src, dsts in FOLLOWS.items():
+        for dst in dsts:
+            followers[dst].append(src)
+
+    def lister(table: dict[int, list[int]]) -> Any:
+        def fetch(account: int, limit: int) -> Page:
+            time.sleep(delay)
+            return _pages(table[account], min(size, limit))
+
+        return fetch
+
+    client = MagicMock()
+    client.account_followers.side_effect = lister(followers)
+    client.account_following.side_effect = lister(FOLLOWS)
+    client.fetch_next.side_effect = lambda page: page.next_page
+    return MastodonExtractor(client=client)
+
+
+def _edges(graph: FollowGraph) -> set[tuple[int, int]]:
+    return {(int(a), int(b)) for a, b in graph.edges}
+
+
+def test_id_set_is_sorted_and_reports_new_ids() -> None:
+    """Adding returns only unseen ids; membership uses binary search."""
+    ids = IdSet([5, 1, 5])
+    assert len(ids) == 2
+    np.testing.assert_array_equal(ids.add([3, 1, 3, 9]), [3, 9])
+    np.testing.assert_array_equal(ids.ids, [1, 3, 5, 9])
+    assert 3 in ids and 4 not in ids and 10 not in ids
+    assert ids.nbytes == 4 * 8
+    ids.discard([3, 7])
+    np.testing.assert_array_equal(ids.ids, [1, 5, 9])
+
+
+def test_follow_ids_follow_pagination() -> None:
+    """Every page is read and only int64 ids are yielded."""
+    extractor = _extractor(size=1)
+
+    async def collect(direction: str, limit: Optional[int] = None) -> Any:
+        pages = [
+            p async for p in extractor.aiter_follow_ids(1, direction, limit)
+        ]
+        return pages
+
+    pages = asyncio.run(collect('following'))
+    assert [p.tolist() for p in pages] == [[2], [3]]
+    assert pages[0].dtype == np.int64
+    assert asyncio.run(collect('following', limit=1))[0].tolist() == [2]
+    assert asyncio.run(collect('followers'))[0].tolist() == [3]
+    with pytest.raises(ValueError):
+        asyncio.run(collect('mutuals'))
+
+
+def test_crawl_hops() -> None:
+    """Zero hops reads the seed's lists; more hops expand new accounts."""
+    seed_only = crawl(_extractor(), [1])
+    assert _edges(seed_only) == {(1, 2), (1, 3), (3, 1)}
+
+    full = crawl(_extractor(), [1], hops=3).unique()
+    expected = {(a, b) for a, dsts in FOLLOWS.items() for b in dsts}
+    assert _edges(full) == expected
+    np.testing.assert_array_equal(full.nodes(), [1, 2, 3, 4, 5])
+
+
+def test_crawl_limits_accounts_and_directions() -> None:
+    """max_accounts caps expansion; directions restrict the lists read."""
+    crawler = FollowCrawler(_extractor(), directions=('following',))
+    graph = asyncio.run(crawler.acrawl([1], hops=5, max_accounts=2))
+    assert crawler.expanded == 2
+    assert _edges(graph) == {(1, 2), (1, 3), (2, 3), (2, 4)}
+    # accounts cut by max_accounts stay pending, not visited
+    np.testing.assert_array_equal(crawler.visited.ids, [1, 2])
+    np.testing.assert_array_equal(crawler.pending.ids, [3, 4])
+
+    # visited accounts are not expanded again; pending ones are
+    asyncio.run(crawler.acrawl([1, 2], graph=graph))
+    assert _edges(graph) == {(1, 2), (1, 3), (2, 3), (2, 4), (3, 1), (4, 5)}
+    assert len(graph) == 6 and not len(crawler.pending)
+    asyncio.run(crawler.acrawl([1, 2], graph=graph))
+    assert len(graph) == 6
+
+    with pytest.raises(ValueError):
+        FollowCrawler(_extractor(), directions=('mutuals',))
+
+
+def test_crawl_runs_accounts_concurrently() -> None:
+    """Page fetches of different accounts overlap up to max_concurrency."""
+    start = time.perf_counter()
+    crawl(
+        _extractor(size=10, delay=0.1),
+        [1, 2, 3, 4, 5],
+        directions=('following',),
+        max_concurrency=5,
+    )
+    assert time.perf_counter() - start < 0.35
+
+
+def test_graph_save_load(tmp_path) -> None:
+    """Edges round-trip through .npz and a DataFrame."""
+    graph = FollowGraph()
+    graph.add([1, 2], 3)
+    graph.add(3, np.arange(100, dtype=np.int64))
+    path = tmp_path / 'graph.npz'
+    graph.save(path)
+
+    restored = FollowGraph.load(path)
+    np.testing.assert_array_equal(restored.edges, graph.edges)
+    frame = restored.to_frame()
+    assert list(frame.columns) == ['follower', 'followee']
+    assert len(frame) == 102
+    assert frame['follower'].dtype == np.int64
@@ -0,0 +1,155 @@
+"""Test suite for language identification and routing."""
+
+import pandas as pd
+import pytest
+
+from mhai.cli import main
+from mhai.evaluations.artifacts import ArtifactStore
+from mhai.langid import LanguageDetector, language_stage
+from mhai.pipeline import ListSink, Pipeline, evaluator_stage
+
+from tests.test_cli import FAKE, KeywordEvaluator
+
+SAMPLES = {
+    'I feel so tired and sad today': 'en',
+    'Hoy estoy muy cansado y triste': 'es',
+    'Hoje eu estou muito cansado, não aguento mais': 'pt',
+    "Je suis très fatigué aujourd'hui": 'fr',
+    'Ich bin heute sehr müde und traurig': 'de',
+    'Oggi sono molto stanco': 'it',
+    'Ik ben vandaag heel moe': 'nl',
+    'Я очень устал сегодня': 'ru',
+    '今日はとても疲れた': 'ja',
+    '我今天很累': 'zh',
+    '오늘 너무 피곤해': 'ko',
+    'أنا متعب جدا اليوم': 'ar',
+    'lol 👍': 'und',
+    '12345 !!!': 'und',
+    '': 'und',
+}
+
+
+def test_detects_languages_and_scripts() -> None:
+    """Function words resolve Latin texts; other scripts map directly."""
+    langs, scores = LanguageDetector().detect(list(SAMPLES))
+    assert langs.tolist() == list(SAMPLES.values())
+    assert ((scores > 0) == (langs != 'und')).all()
+    assert scores.max() <= 1.0
+
+
+def test_batch_matches_single_texts() -> None:
+    """Detection does not depend on the other texts of the batch."""
+    detector = LanguageDetector()
+    texts = [*SAMPLES, *SAMPLES, None]
+    langs, scores = detector.detect(texts)
+    for text, lang, score in zip(texts, langs, scores):
+        one, one_score = detector.detect([text])
+        assert one[0] == lang
+        assert one_score[0] == pytest.approx(score)
+
+
+def test_detector_configuration() -> None:
+    """Candidate languages and evidence thresholds are configurable."""
+    detector = LanguageDetector(languages=['en', 'es'], min_hits=2)
+    langs, _ = detector.detect(
+        ['the cat', 'the cat is here', 'Ich bin müde', 'el gato y el perro']
+    )
+    # German is not a candidate, but it is clearly not English either
+    assert langs.tolist() == ['und', 'en', 'und-Latn', 'es']
+    with pytest.raises(ValueError):
+        LanguageDetector(languages=['xx'])
+
+
+def test_short_and_ambiguous_texts() -> None:
+    """Short English posts are not lost to a tie with another language."""
+    langs, scores = LanguageDetector().detect(
+        ['no one cares', 'nobody cares about me', 'no hope left', 'no']
+    )
+    assert langs.tolist() == ['en', 'en', 'und', 'und']
+    assert (scores[2:] == 0).all()
+
+
+def test_other_latin_languages_are_not_und() -> None:
+    """Unknown Latin languages get a code English-only models reject."""
+    texts = [
+        'Watu wote wamezaliwa huru',
+        'Bütün insanlar hür doğarlar',
+        'nimechoka',
+        'sijui no hope',
+        # one shared short word ('i', 'at') is not English evidence
+        'Są oni obdarzeni rozumem i sumieniem',
+        'Sila ay pinagkalooban ng katwiran at budhi',
+    ]
+    langs, scores = LanguageDetector().detect(texts)
+    assert (
+        langs.tolist()
+        == ['und-Latn', 'und-Latn', 'und', 'und'] + ['und-Latn'] * 2
+    )
+    assert (scores == 0).all()
+    assert 'und-Latn' not in KeywordEvaluator.languages
+
+
+def test_long_codes_and_surrogates() -> None:
+    """Configured codes are kept whole and lone surrogates never raise."""
+    detector = LanguageDetector(
+        function_words={'pt-BR': ('eu', 'você'), 'en': ('the', 'i')}
+    )
+    langs, _ = detector.detect(['eu e você', 'the end', 'bad \ud800 text'])
+    assert langs.tolist() == ['pt-BR', 'en', 'und']
+
+
+def test_routed_pipeline_skips_other_languages(tmp_path) -> None:
+    """Only English texts reach the English-only evaluator."""
+    evaluator = KeywordEvaluator(artifacts=ArtifactStore(root=tmp_path))
+    KeywordEvaluator.seen = []
+    records = [{'text': text} for text in SAMPLES]
+    sink = ListSink()
+    Pipeline(
+        records,
+        [
+            language_stage(),
+            evaluator_stage(evaluator, languages=evaluator.languages),
+        ],
+        sink,
+        batch_size=4,
+    ).run()
+
+    frame = sink.to_dataframe()
+    scored = frame['routed'] == 'keyword'
+    assert set(frame.loc[scored, 'lang']) == {'en', 'und'}
+    assert frame.loc[~scored, 'keyword_label'].isna().all()
+    assert len(KeywordEvaluator.seen) == scored.sum() == 4
+
+
+def test_cli_route_languages(tmp_path, monkeypatch) -> None:
+    """The CLI records lang, lang_score and routed columns."""
+    monkeypatch.setenv('MHAI_ARTIFACTS_DIR', str(tmp_path / 'artifacts'))
+    src = tmp_path / 'posts.csv'
+    # the first batch is all non-English, so score columns appear late
+    texts = [t for t in SAMPLES if SAMPLES[t] not in ('en', 'und')]
+    pd.DataFrame({'text': [*texts, 'so sad today']}).to_csv(src, index=False)
+    out = tmp_path / 'out.csv'
+    args = ['score', str(src), '--evaluators', FAKE, '--out', str(out)]
+
+    KeywordEvaluator.seen = []
+    assert main([*args, '--route-languages', '--batch-size', '2']) == 0
+    frame = pd.read_csv(out, keep_default_na=False).sort_values('row_id')
+    assert KeywordEvaluator.seen == ['so sad today']
+    assert frame['routed'].tolist() == [''] * len(texts) + ['keyword']
+    assert frame['keyword_label'].iloc[-1] == 'NEGATIVE'
+    assert frame['lang'].iloc[0] == 'es'
+
+    KeywordEvaluator.seen = []
+    assert (
+        main(
+            [
+                *args,
+                '--overwrite',
+                '--route-languages',
+                '--languages',
+                f'{FAKE}=*',
+            ]
+        )
+        == 0
+    )
+    assert len(KeywordEvaluator.seen) == len(texts) + 1
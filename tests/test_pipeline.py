@@ -0,0 +1,188 @@
+"""Test suite for the streaming pipeline module."""
+
+import threading
+import time
+
+from collections.abc import Sequence
+from typing import Any, Optional
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from mhai.evaluations.artifacts import ArtifactStore
+from mhai.evaluations.base import ModelBase
+from mhai.pipeline import (
+    ListSink,
+    Pipeline,
+    Stage,
+    clean_stage,
+    evaluator_stage,
+)
+from mhai.sns.mastodon import MastodonExtractor
+
+
+class LengthEvaluator(ModelBase):
+    """Evaluator scoring a text by its length, without any model."""
+
+    default_model_name = 'fake/length'
+    column_prefix = 'length'
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.batches: list[int] = []
+        super().__init__(**kwargs)
+
+    def _load_model(self) -> Any:
+        return None
+
+    def evaluate(self, text: str) -> dict[str, Any]:
+        """Return the length of `text` as a label-score dict."""
+        return {'label': 'chars', 'score': float(len(text))}
+
+    def evaluate_batch(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> list[Any]:
+        """Record the batch size and evaluate every text."""
+        self.batches.append(len(texts))
+        return [self.evaluate(text) for text in texts]
+
+
+def _statuses(page: int, size: int) -> list[dict[str, Any]]:
+    return [
+        {
+            'id': page * 100 + i,
+            'created_at': '2024-01-01',
+            'content': f'<p>post {page}-{i} &amp; more</p>',
+            'replies_count': 0,
+            'reblogs_count': 0,
+            'favourites_count': 0,
+        }
+        for i in range(size)
+    ]
+
+
+@pytest.fixture
+def evaluator(tmp_path):
+    """Model-free evaluator."""
+    return LengthEvaluator(artifacts=ArtifactStore(root=tmp_path))
+
+
+def test_pipeline_scores_mocked_extractor(evaluator) -> None:
+    """Pages from a mocked extractor flow through clean and score stages."""
+    extractor = MastodonExtractor(client=MagicMock())
+    extractor.client.timeline_hashtag.side_effect = [
+        _statuses(page, 5) for page in range(3)
+    ]
+    pages = (extractor.get_hashtag_timeline('tag') for _ in range(3))
+    sink = ListSink()
+
+    metrics = Pipeline(
+        pages,
+        [clean_stage(source='content'), evaluator_stage(evaluator)],
+        sink,
+        batch_size=2,
+    ).run()
+
+    df = sink.to_dataframe()
+    assert len(df) == 15
+    assert df.loc[0, 'text'] == 'post 0-0 & more'
+    assert df.loc[0, 'length_score'] == len('post 0-0 & more')
+    assert max(evaluator.batches) == 2
+    assert metrics['source'].records == 15
+    assert metrics['length'].records == 15
+    assert metrics['sink'].records == 15
+
+
+def test_single_records_are_batched(evaluator) -> None:
+    """Loose records are grouped into full batches."""
+    source = ({'text': f'post {i}'} for i in range(7))
+    sink = ListSink()
+
+    Pipeline(source, [evaluator_stage(evaluator)], sink, batch_size=3).run()
+
+    assert evaluator.batches == [3, 3, 1]
+    assert len(sink.records) == 7
+
+
+def test_backpressure_bounds_source() -> None:
+    """A slow sink keeps the source at most a few batches ahead."""
+    pulled: list[int] = []
+    sunk: list[int] = []
+    ahead: list[int] = []
+
+    def source():
+        for i in range(30):
+            pulled.append(i)
+            yield [{'i': i}]
+
+    def slow_sink(batch):
+        ahead.append(len(pulled) - len(sunk))
+        time.sleep(0.005)
+        sunk.extend(r['i'] for r in batch)
+
+    Pipeline(
+        source(), [Stage('noop', lambda b: b)], slow_sink, max_queue=2
+    ).run()
+
+    assert len(sunk) == 30
+    # two queues of two batches, plus one batch held by each thread
+    assert max(ahead) <= 8
+
+
+def test_stage_error_propagates() -> None:
+    """An exception in a stage stops the pipeline and is re-raised."""
+
+    def boom(batch):
+        raise RuntimeError('stage failed')
+
+    source = ({'i': i} for i in range(100))
+    with pytest.raises(RuntimeError, match='stage failed'):
+        Pipeline(source, [Stage('boom', boom)], ListSink()).run()
+
+
+def test_stop_shuts_down_gracefully() -> None:
+    """Stop ends an endless source without hanging."""
+
+    def endless():
+        i = 0
+        while True:
+            i += 1
+            yield {'i': i}
+
+    sink = ListSink()
+    pipeline = Pipeline(endless(), [Stage('noop', lambda b: b)], sink)
+
+    def stop_after_records(batch):
+        sink(batch)
+        if len(sink.records) >= 100:
+            pipeline.stop()
+
+    pipeline.sink = stop_after_records
+    runner = threading.Thread(target=pipeline.run)
+    runner.start()
+    runner.join(timeout=5)
+
+    assert not runner.is_alive()
+    assert pipeline.stopped
+    assert len(sink.records) >= 100
+
+
+def test_stage_requires_workers() -> None:
+    """Stages need at least one worker."""
+    with pytest.raises(ValueError):
+        Stage('bad', lambda b: b, workers=0)
+
+
+def test_duplicate_stage_names_rejected() -> None:
+    """Stage names key the metrics, so they must be unique."""
+    stages = [Stage('score', lambda b: b), Stage('score', lambda b: b)]
+    with pytest.raises(ValueError, match='score'):
+        Pipeline([], stages, ListSink())
+    with pytest.raises(ValueError, match='sink'):
+        Pipeline([], [Stage('sink', lambda b: b)], ListSink())
+
+
+def test_list_sink_empty_frame() -> None:
+    """An empty sink yields an empty DataFrame."""
+    assert ListSink().to_dataframe().empty
+    assert isinstance(ListSink().to_dataframe(), pd.DataFrame)
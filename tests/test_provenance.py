@@ -0,0 +1,204 @@
+"""Test suite for result provenance and incremental rescoring."""
+
+import json
+
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pytest
+
+from mhai.cli import main, read_output, write_output
+from mhai.evaluations.artifacts import ArtifactStore
+from mhai.evaluations.runtime import RuntimeConfig
+from mhai.provenance import RunTable, rescore, stale_mask
+
+from tests.test_cli import FAKE, KeywordEvaluator
+
+LENGTH = 'tests.test_cli:LengthEvaluator'
+
+
+@pytest.fixture
+def store(tmp_path) -> ArtifactStore:
+    """Empty artifact store."""
+    return ArtifactStore(root=tmp_path / 'artifacts')
+
+
+def test_provenance_tracks_scoring_configuration(store, tmp_path) -> None:
+    """Model, revision and scoring params matter; the runtime does not."""
+    base = KeywordEvaluator(artifacts=store).provenance()
+    assert base['evaluator'] == 'tests.test_cli.KeywordEvaluator'
+    assert base['model_name'] == 'test/keyword'
+    assert base['revision'] is None
+
+    same = KeywordEvaluator(
+        artifacts=store,
+        runtime=RuntimeConfig(device='cpu', threads=2),
+        api_params={'device': 0, 'batch_size': 8},
+    )
+    assert same.provenance() == base
+    for changed in [
+        KeywordEvaluator(artifacts=store, temperature=2.0),
+        KeywordEvaluator(artifacts=store, label_bias={'NEGATIVE': 0.5}),
+        KeywordEvaluator(artifacts=store, revision='abc'),
+        KeywordEvaluator(artifacts=store, model_name='test/other'),
+    ]:
+        assert changed.provenance() != base
+
+    src = tmp_path / 'saved'
+    src.mkdir()
+    (src / 'model.safetensors').write_bytes(b'\x00' * 8)
+    store.register('test/keyword', src, revision='v1')
+    first = KeywordEvaluator(artifacts=store).revision_hash
+    (src / 'model.safetensors').write_bytes(b'\x01' * 8)
+    store.register('test/keyword', src, revision='v1')
+    assert KeywordEvaluator(artifacts=store).revision_hash != first
+
+    # a directory outside the store is hashed like a registered snapshot
+    local = KeywordEvaluator(model_name=str(src), artifacts=store)
+    assert local.local_path is None
+    assert (
+        local.revision_hash == KeywordEvaluator(artifacts=store).revision_hash
+    )
+    (src / 'config.json').write_text('{}')
+    changed = KeywordEvaluator(model_name=str(src), artifacts=store)
+    assert changed.revision_hash not in (None, local.revision_hash)
+
+
+def test_run_table_is_deduplicated_and_persisted(tmp_path) -> None:
+    """Registering a provenance twice returns the same id across loads."""
+    runs = RunTable.for_output(tmp_path / 'out.csv')
+    a = {'evaluator': 'A', 'model_name': 'm', 'revision': None}
+    b = {**a, 'model_name': 'n'}
+    assert runs.register(a) == 0
+    assert runs.register(b) == 1
+    assert runs.register(a) == 0
+
+    path = tmp_path / 'out.csv.runs.json'
+    assert len(json.loads(path.read_text())['runs']) == 2
+    reloaded = RunTable.for_output(tmp_path / 'out.csv')
+    assert reloaded.register(b) == 1
+    assert reloaded.get(1)['model_name'] == 'n'
+    assert list(reloaded.to_frame().index) == [0, 1]
+
+
+def test_rescore_only_touches_stale_rows(store) -> None:
+    """Rows of an outdated run are re-scored; current rows are not."""
+    runs = RunTable()
+    old = KeywordEvaluator(artifacts=store, temperature=2.0)
+    new = KeywordEvaluator(artifacts=store)
+    old_run = runs.register(old.provenance())
+    frame = pd.DataFrame(
+        {
+            'text': ['so sad', 'fine', 'sad again', 'new row'],
+            'keyword_label': ['STALE', 'STALE', 'POSITIVE', None],
+            'keyword_score': [0.1, 0.1, 0.9, None],
+            'keyword_extra': [1.0, 1.0, 1.0, None],
+            'run_keyword': [old_run, old_run, 1, None],
+        }
+    )
+
+    KeywordEvaluator.seen = []
+    updated, counts = rescore(frame, {'keyword': new}, runs)
+    assert counts == {'keyword': 3}
+    assert KeywordEvaluator.seen == ['so sad', 'fine', 'new row']
+    assert updated['keyword_label'].tolist() == [
+        'NEGATIVE',
+        'POSITIVE',
+        'POSITIVE',
+        'POSITIVE',
+    ]
+    assert updated['run_keyword'].tolist() == [1, 1, 1, 1]
+    # columns the new model no longer writes are cleared on rescored rows
+    assert updated['keyword_extra'].isna().tolist() == [
+        True,
+        True,
+        False,
+        True,
+    ]
+
+    KeywordEvaluator.seen = []
+    _, counts = rescore(updated, {'keyword': new}, runs)
+    assert counts == {'keyword': 0}
+    assert KeywordEvaluator.seen == []
+    assert not stale_mask(updated, 'keyword', 1).any()
+
+
+def test_rescore_scores_missing_text_as_empty(store) -> None:
+    """A missing text is rescored as '', not as the string 'nan'."""
+    runs = RunTable()
+    frame = pd.DataFrame(
+        {'text': ['sad', None, float('nan')], 'run_keyword': [None] * 3}
+    )
+    KeywordEvaluator.seen = []
+    updated, counts = rescore(
+        frame, {'keyword': KeywordEvaluator(artifacts=store)}, runs
+    )
+    assert counts == {'keyword': 3}
+    assert KeywordEvaluator.seen == ['sad', '', '']
+    assert updated['text'].tolist() == ['sad', '', '']
+
+
+def test_cli_rescore_after_model_change(tmp_path, monkeypatch) -> None:
+    """Changing one evaluator's model re-scores only that evaluator."""
+    monkeypatch.setenv('MHAI_ARTIFACTS_DIR', str(tmp_path / 'artifacts'))
+    src = tmp_path / 'posts.csv'
+    texts = [f'post {i} {"sad" if i % 3 else ""}' for i in range(10)]
+    pd.DataFrame({'text': texts}).to_csv(src, index=False)
+    out = tmp_path / 'out.jsonl'
+    evaluators = f'{FAKE},{LENGTH}'
+
+    assert (
+        main(
+            ['score', str(src), '--out', str(out), '--evaluators', evaluators]
+        )
+        == 0
+    )
+    scored = pd.read_json(out, lines=True)
+    assert set(scored['run_keyword']) == {0}
+    assert set(scored['run_length']) == {1}
+
+    KeywordEvaluator.seen = []
+    args = ['rescore', str(out), '--evaluators', evaluators]
+    assert main(args) == 0
+    assert KeywordEvaluator.seen == []
+
+    assert main([*args, '--model', f'{FAKE}=test/keyword-v2']) == 0
+    assert sorted(KeywordEvaluator.seen) == sorted(texts)
+    rescored = pd.read_json(out, lines=True)
+    assert set(rescored['run_keyword']) == {2}
+    assert set(rescored['run_length']) == {1}
+    assert rescored['row_id'].tolist() == scored['row_id'].tolist()
+    pd.testing.assert_series_equal(
+        rescored['keyword_label'], scored['keyword_label']
+    )
+    assert len(RunTable.for_output(out)) == 3
+
+    assert main(['rescore', str(tmp_path / 'missing.csv')]) == 2
+
+
+def test_parquet_rewrite_keeps_output_on_crash(tmp_path, monkeypatch) -> None:
+    """Old parts go only after the new one is in place."""
+    pytest.importorskip('pyarrow')
+    out = tmp_path / 'out.parquet'
+    out.mkdir()
+    old = pd.DataFrame({'row_id': [0, 1, 2], 'score': [0.1, 0.2, 0.3]})
+    old.iloc[:2].to_parquet(out / 'part-00000.parquet', index=False)
+    old.iloc[2:].to_parquet(out / 'part-00001.parquet', index=False)
+    new = old.assign(score=[0.7, 0.8, 0.9])
+
+    def crash(self: Any, missing_ok: bool = False) -> None:
+        raise OSError('interrupted')
+
+    monkeypatch.setattr(Path, 'unlink', crash)
+    with pytest.raises(OSError):
+        write_output(new, out)
+    monkeypatch.undo()
+    assert len(list(out.glob('part-*.parquet'))) == 3
+    pd.testing.assert_frame_equal(read_output(out), new)
+
+    write_output(new, out)
+    assert [p.name for p in out.glob('part-*.parquet')] == [
+        'part-00003.parquet'
+    ]
+    pd.testing.assert_frame_equal(read_output(out), new)
@@ -0,0 +1,266 @@
+"""Test suite for the torch runtime configuration."""
+
+import contextlib
+import threading
+
+from types import SimpleNamespace
+from typing import Any
+
+import pandas as pd
+import pytest
+
+from mhai.cli import main
+from mhai.evaluations import runtime as runtime_module
+from mhai.evaluations.artifacts import ArtifactStore
+from mhai.evaluations.base import ModelBase
+from mhai.evaluations.runtime import RuntimeConfig, split_threads
+
+from tests.test_cli import FAKE, KeywordEvaluator
+
+
+class FakeTorch:
+    """Records the calls the runtime makes to torch."""
+
+    def __init__(self, cuda: bool = False, mps: bool = False) -> None:
+        self.cuda = SimpleNamespace(is_available=lambda: cuda)
+        self.backends = SimpleNamespace(
+            mps=SimpleNamespace(is_available=lambda: mps)
+        )
+        self.nn = SimpleNamespace(Module=FakeModule)
+        self.threads = 8
+        self.interop = 4
+        self.mode: list[str] = []
+
+    def get_num_threads(self) -> int:
+        """Return the intra-op thread count."""
+        return self.threads
+
+    def set_num_threads(self, n: int) -> None:
+        """Set the intra-op thread count."""
+        self.threads = n
+
+    def get_num_interop_threads(self) -> int:
+        """Return the inter-op thread count."""
+        return self.interop
+
+    def set_num_interop_threads(self, n: int) -> None:
+        """Set the inter-op thread count."""
+        self.interop = n
+
+    @contextlib.contextmanager
+    def _mode(self, name: str):
+        self.mode.append(name)
+        try:
+            yield
+        finally:
+            self.mode.pop()
+
+    def inference_mode(self):
+        """Enter inference mode."""
+        return self._mode('inference')
+
+    def no_grad(self):
+        """Disable gradients."""
+        return self._mode('no_grad')
+
+    def compile(self, module: Any) -> Any:
+        """Wrap `module` as if compiled."""
+        return SimpleNamespace(compiled=module, config=module.config)
+
+
+class FakeModule:
+    """Stand-in for a torch module with a classification config."""
+
+    config = SimpleNamespace(
+        id2label={0: 'NEGATIVE', 1: 'POSITIVE'},
+        num_labels=2,
+        problem_type='single_label_classification',
+    )
+
+
+class RecordingPipeline:
+    """Pipeline recording the torch state seen during inference."""
+
+    def __init__(self, torch: FakeTorch) -> None:
+        self.torch = torch
+        self.model = FakeModule()
+        self.calls: list[tuple[int, list[str]]] = []
+
+    def __call__(self, texts: list[str], **kwargs: Any) -> list[Any]:
+        """Record the thread count and grad mode, return fixed logits."""
+        self.calls.append((self.torch.threads, list(self.torch.mode)))
+        return [
+            [
+                {'label': 'NEGATIVE', 'score': 0.0},
+                {'label': 'POSITIVE', 'score': 1.0},
+            ]
+            for _ in texts
+        ]
+
+
+@pytest.fixture
+def torch(monkeypatch) -> FakeTorch:
+    """Install a fake torch for the runtime module."""
+    fake = FakeTorch()
+    monkeypatch.setattr(runtime_module, '_torch', lambda: fake)
+    monkeypatch.setattr(runtime_module, '_interop_threads', None)
+    return fake
+
+
+def test_from_env(monkeypatch) -> None:
+    """Environment variables configure the runtime."""
+    monkeypatch.setenv('MHAI_DEVICE', 'cpu')
+    monkeypatch.setenv('MHAI_THREADS', '3')
+    monkeypatch.setenv('MHAI_INTEROP_THREADS', '1')
+    monkeypatch.setenv('MHAI_INFERENCE_MODE', '0')
+    monkeypatch.setenv('MHAI_COMPILE', 'yes')
+    assert RuntimeConfig.from_env() == RuntimeConfig(
+        device='cpu',
+        threads=3,
+        interop_threads=1,
+        inference_mode=False,
+        compile=True,
+    )
+
+    monkeypatch.setenv('MHAI_THREADS', 'many')
+    with pytest.raises(ValueError, match='MHAI_THREADS'):
+        RuntimeConfig.from_env()
+    with pytest.raises(ValueError):
+        RuntimeConfig(threads=0)
+
+
+def test_split_threads() -> None:
+    """Cores are shared evenly, with at least one thread each."""
+    assert split_threads(3, 8) == [3, 3, 2]
+    assert split_threads(4, 2) == [1, 1, 1, 1]
+    assert sum(split_threads(2)) >= 2
+    with pytest.raises(ValueError):
+        split_threads(0)
+
+
+def test_resolve_device(monkeypatch) -> None:
+    """Auto prefers CUDA, then MPS; missing accelerators fail loudly."""
+    for fake, expected in [
+        (FakeTorch(cuda=True), 'cuda:0'),
+        (FakeTorch(mps=True), 'mps'),
+        (FakeTorch(), 'cpu'),
+        (None, 'cpu'),
+    ]:
+        monkeypatch.setattr(runtime_module, '_torch', lambda f=fake: f)
+        assert RuntimeConfig().resolve_device() == expected
+
+    assert RuntimeConfig(device='CPU').resolve_device() == 'cpu'
+    with pytest.raises(RuntimeError, match='cuda:1'):
+        RuntimeConfig(device='cuda:1').resolve_device()
+
+
+def test_session_applies_budget_and_mode(torch, tmp_path) -> None:
+    """Inference runs within the budget; the previous count is restored."""
+
+    class Evaluator(ModelBase):
+        default_model_name = 'test/recording'
+
+        def _load_model(self) -> Any:
+            return RecordingPipeline(torch)
+
+        def evaluate(self, text: str) -> Any:
+            return self.predict_proba([text])
+
+    config = RuntimeConfig(threads=2, interop_threads=1, compile=True)
+    evaluator = Evaluator(
+        artifacts=ArtifactStore(root=tmp_path), runtime=config
+    )
+    evaluator.evaluate('hi')
+    assert evaluator._model.calls == [(2, ['inference'])]
+    assert torch.interop == 1
+    assert isinstance(evaluator._model.model.compiled, FakeModule)
+
+    evaluator.runtime = RuntimeConfig(inference_mode=False)
+    evaluator.evaluate('hi')
+    assert evaluator._model.calls[-1] == (2, ['no_grad'])
+
+
+def test_threads_applied_once_per_thread(torch, tmp_path) -> None:
+    """Budgets are set on a thread's first call and never restored."""
+    sets: list[tuple[str, int]] = []
+    set_num_threads = torch.set_num_threads
+
+    def record(n: int) -> None:
+        sets.append((threading.current_thread().name, n))
+        set_num_threads(n)
+
+    torch.set_num_threads = record
+    config = RuntimeConfig(threads=3)
+
+    def work() -> None:
+        for _ in range(5):
+            with config.session():
+                pass
+
+    workers = [threading.Thread(target=work, name=f'w{i}') for i in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert sorted(sets) == [('w0', 3), ('w1', 3)]
+    assert torch.threads == 3
+
+
+def test_pipeline_params_device(torch, tmp_path) -> None:
+    """The resolved device is used unless api_params picks one."""
+
+    class Evaluator(ModelBase):
+        default_model_name = 'test/params'
+
+        def _load_model(self) -> Any:
+            return self.pipeline_params()
+
+        def evaluate(self, text: str) -> Any:
+            return text
+
+    store = ArtifactStore(root=tmp_path)
+    assert Evaluator(artifacts=store)._model == {'device': 'cpu'}
+    pinned = Evaluator(artifacts=store, api_params={'device': 0})
+    assert pinned._model == {'device': 0}
+    mapped = Evaluator(artifacts=store, api_params={'device_map': 'auto'})
+    assert mapped._model == {'device_map': 'auto'}
+
+
+def test_cli_thread_budgets(tmp_path, monkeypatch) -> None:
+    """The CLI splits the cores between evaluators and passes the device."""
+    monkeypatch.setenv('MHAI_ARTIFACTS_DIR', str(tmp_path / 'artifacts'))
+    monkeypatch.delenv('MHAI_THREADS', raising=False)
+    monkeypatch.delenv('MHAI_DEVICE', raising=False)
+    monkeypatch.setattr(runtime_module.os, 'cpu_count', lambda: 8)
+    budgets = []
+    monkeypatch.setattr(
+        KeywordEvaluator,
+        'set_threads',
+        lambda self, n: budgets.append((self.runtime.device, n)),
+        raising=False,
+    )
+    src = tmp_path / 'posts.csv'
+    pd.DataFrame({'text': ['a', 'so sad']}).to_csv(src, index=False)
+    args = ['score', str(src), '--out', str(tmp_path / 'out.csv')]
+
+    assert main([*args, '--evaluators', f'{FAKE},{FAKE}']) == 0
+    assert budgets == [('auto', 4), ('auto', 4)]
+    budgets.clear()
+    assert (
+        main(
+            [
+                *args,
+                '--overwrite',
+                '--evaluators',
+                FAKE,
+                '--device',
+                'cpu',
+                '--threads',
+                '3',
+            ]
+        )
+        == 0
+    )
+    assert budgets == [('cpu', 3)]
+    with pytest.raises(SystemExit):
+        main([*args, '--threads', '0'])
@@ -0,0 +1,212 @@
+"""Test suite for the shared SNS extractor interface."""
+
+import asyncio
+import time
+import warnings
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from mhai.pipeline import ListSink, Pipeline, clean_stage
+from mhai.sns import POST_SCHEMA, aharvest, harvest, to_post_frame
+from mhai.sns.mastodon import MastodonExtractor
+from mhai.sns.twitter import Twitter
+
+
+def _status(i: int) -> dict[str, Any]:
+    return {
+        'id': 1000 + i,
+        'created_at': datetime(2024, 1, 1, 12, i, tzinfo=timezone.utc),
+        'content': f'<p>toot <b>{i}</b></p>',
+        'account': {'acct': 'ana@example.social'},
+        'favourites_count': i,
+        'reblogs_count': 1,
+        'replies_count': 0,
+        'url': f'https://example.social/@ana/{1000 + i}',
+    }
+
+
+def _mastodon(pages: int = 3, size: int = 2) -> MastodonExtractor:
+    client = MagicMock()
+    chunks = [
+        [_status(p * size + i) for i in range(size)] for p in range(pages)
+    ]
+    client.timeline_hashtag.return_value = chunks[0]
+    client.timeline_public.return_value = chunks[0]
+    client.account_statuses.return_value = chunks[0]
+    client.account_lookup.return_value = {'id': 7}
+    client.fetch_next.side_effect = [*chunks[1:], None]
+    return MastodonExtractor(client=client)
+
+
+def _tweet(i: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=2000 + i,
+        created_at=datetime(2024, 2, 1, tzinfo=timezone.utc),
+        text=f'tweet {i}',
+        author_id=42,
+        public_metrics={
+            'like_count': 3,
+            'retweet_count': 2,
+            'reply_count': 1,
+            'quote_count': 0,
+        },
+    )
+
+
+def _twitter(pages: int = 2, size: int = 3) -> Twitter:
+    client = MagicMock()
+    users = {'users': [SimpleNamespace(id=42, username='esloch')]}
+    client.search_recent_tweets.side_effect = [
+        SimpleNamespace(
+            data=[_tweet(p * size + i) for i in range(size)],
+            includes=users,
+            meta={'next_token': f'tok{p}'} if p < pages - 1 else {},
+        )
+        for p in range(pages)
+    ]
+    return Twitter(client=client, username='esloch')
+
+
+def test_to_post_frame_uses_compact_schema() -> None:
+    """Frames follow POST_SCHEMA regardless of the input keys."""
+    frame = to_post_frame(
+        [{'platform': 'twitter', 'post_id': '1', 'likes': 3, 'extra': True}]
+    )
+    assert list(frame.columns) == list(POST_SCHEMA)
+    assert dict(frame.dtypes) == POST_SCHEMA
+    assert frame.loc[0, 'shares'] == 0
+    assert to_post_frame([]).empty
+    with pytest.raises(ValueError, match='platforms'):
+        to_post_frame([{'platform': 'x'}])
+
+
+def test_post_frames_concatenate_with_schema_dtypes() -> None:
+    """Frames of different platforms keep the categorical and counts."""
+    frames = [
+        to_post_frame([{'platform': 'mastodon', 'likes': '2'}]),
+        to_post_frame([{'platform': 'twitter', 'likes': None}]),
+    ]
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        frame = pd.concat(frames, ignore_index=True)
+        to_post_frame([{'platform': 'twitter', 'likes': None, 'shares': 1}])
+    assert dict(frame.dtypes) == POST_SCHEMA
+    assert frame['likes'].tolist() == [2, 0]
+
+
+def test_mastodon_aiter_posts_follows_pages() -> None:
+    """Hashtag queries page through fetch_next and normalize statuses."""
+    extractor = _mastodon()
+    frame = asyncio.run(extractor.afetch_posts('#mentalhealth'))
+
+    assert len(frame) == 6
+    assert frame.loc[0, 'text'] == 'toot 0'
+    assert frame.loc[0, 'user'] == 'ana@example.social'
+    assert frame.loc[5, 'likes'] == 5
+    assert frame.loc[0, 'platform'] == 'mastodon'
+    extractor.client.timeline_hashtag.assert_called_once_with(
+        'mentalhealth', limit=40
+    )
+
+
+def test_mastodon_queries_and_limit() -> None:
+    """Account and public queries are supported and limits stop paging."""
+    extractor = _mastodon()
+    frame = asyncio.run(extractor.afetch_posts('@ana', limit=3))
+    assert len(frame) == 3
+    extractor.client.account_statuses.assert_called_once_with(7, limit=3)
+
+    public = asyncio.run(_mastodon().afetch_posts('public', limit=1))
+    assert len(public) == 1
+
+    with pytest.raises(ValueError):
+        asyncio.run(extractor.afetch_posts('mentalhealth'))
+
+
+def test_twitter_aiter_posts_uses_next_token() -> None:
+    """Recent search pages through next_token and resolves usernames."""
+    extractor = _twitter()
+    frame = asyncio.run(extractor.afetch_posts('from:esloch'))
+
+    assert len(frame) == 6
+    assert set(frame['user']) == {'esloch'}
+    assert frame.loc[0, 'shares'] == 2
+    assert frame.loc[0, 'url'] == 'https://x.com/esloch/status/2000'
+    calls = extractor.client.search_recent_tweets.call_args_list
+    assert calls[1].kwargs['next_token'] == 'tok0'
+
+
+def test_twitter_aiter_posts_requests_only_what_is_left() -> None:
+    """Page sizes shrink to the remaining limit, but never below 10."""
+    extractor = _twitter()
+    asyncio.run(extractor.afetch_posts('from:esloch', limit=50))
+    calls = extractor.client.search_recent_tweets.call_args_list
+    assert [c.kwargs['max_results'] for c in calls] == [50, 47]
+
+    extractor = _twitter()
+    asyncio.run(extractor.afetch_posts('from:esloch', limit=2))
+    calls = extractor.client.search_recent_tweets.call_args_list
+    assert [c.kwargs['max_results'] for c in calls] == [10]
+
+
+def test_harvest_fans_out_across_platforms() -> None:
+    """Jobs from both platforms land in one normalized frame."""
+    frame = harvest(
+        [(_mastodon(), '#a'), (_twitter(), 'from:esloch')], limit=4
+    )
+    assert frame['platform'].value_counts().to_dict() == {
+        'mastodon': 4,
+        'twitter': 4,
+    }
+
+
+def test_harvest_runs_jobs_concurrently() -> None:
+    """Blocking client calls of different jobs overlap."""
+
+    def slow_page(*args: Any, **kwargs: Any) -> list[dict[str, Any]]:
+        time.sleep(0.2)
+        return [_status(0)]
+
+    jobs = []
+    for _ in range(5):
+        extractor = _mastodon()
+        extractor.client.timeline_hashtag.side_effect = slow_page
+        extractor.client.fetch_next.side_effect = None
+        extractor.client.fetch_next.return_value = None
+        jobs.append((extractor, '#tag'))
+
+    start = time.perf_counter()
+    frame = harvest(jobs, max_concurrency=5)
+    assert len(frame) == 5
+    assert time.perf_counter() - start < 0.8
+
+
+def test_aharvest_propagates_errors() -> None:
+    """A failing job surfaces its exception."""
+    broken = _mastodon()
+    broken.client.timeline_hashtag.side_effect = RuntimeError('down')
+
+    async def drain() -> None:
+        async for _ in aharvest([(_twitter(), 'q'), (broken, '#x')]):
+            pass
+
+    with pytest.raises(RuntimeError, match='down'):
+        asyncio.run(drain())
+
+
+def test_pipeline_accepts_async_source() -> None:
+    """The streaming pipeline drains an async extractor directly."""
+    sink = ListSink()
+    Pipeline(
+        _mastodon().aiter_posts('#tag'), [clean_stage()], sink, batch_size=4
+    ).run()
+
+    frame = sink.to_dataframe()
+    assert isinstance(frame, pd.DataFrame)
+    assert len(frame) == 6
@@ -0,0 +1,32 @@
+"""Test suite for the shared helpers."""
+
+import numpy as np
+
+from mhai.utils import clean_text, env_flag, grow
+
+
+def test_clean_text() -> None:
+    """HTML markup and entities are removed."""
+    raw = '<p>Hello&nbsp;<a href="x">world</a></p><p>again<br/>now</p>'
+    assert clean_text(raw) == 'Hello world again now'
+    assert clean_text(None) == ''
+    assert clean_text(float('nan')) == ''
+
+
+def test_env_flag(monkeypatch) -> None:
+    """Flags accept the usual truthy spellings."""
+    monkeypatch.delenv('MHAI_TEST_FLAG', raising=False)
+    assert env_flag('MHAI_TEST_FLAG', True) is True
+    for value, expected in [('Yes', True), ('1', True), ('0', False)]:
+        monkeypatch.setenv('MHAI_TEST_FLAG', value)
+        assert env_flag('MHAI_TEST_FLAG', False) is expected
+
+
+def test_grow_doubles_and_fills() -> None:
+    """Growing keeps the rows, fills the rest and amortizes capacity."""
+    array = np.arange(20).reshape(10, 2)
+    assert grow(array, 5, -1) is array
+    grown = grow(array, 11, -1)
+    assert grown.shape == (20, 2)
+    np.testing.assert_array_equal(grown[:10], array)
+    assert (grown[10:] == -1).all()